@@ -0,0 +1,382 @@
+#
+# Copyright (c) 2024 Arm Limited
+# Copyright (c) 2024 Hanno Becker
+# SPDX-License-Identifier: MIT
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Author: Hanno Becker <hannobecker@posteo.de>
+#
+
+"""
+Benchmark suite for SLOTHY itself
+
+Runs a fixed matrix of kernels from examples/naive and paper/clean across
+Cortex-M55, Cortex-M85, Cortex-A55 and Cortex-A72, with pinned solver seed and
+thread count, and writes a JSON report of solve times, model sizes, and the
+achieved cycles/stalls and cycle bounds. A report can be compared against a
+previously stored baseline report to flag speed or quality regressions:
+
+    python3 benchmark.py --output baseline.json
+    ... modify SLOTHY ...
+    python3 benchmark.py --output new.json --baseline baseline.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import ortools
+
+from slothy import Slothy
+from slothy.core.cache import slothy_fingerprint
+
+import slothy.targets.arm_v81m.arch_v81m as Arch_Armv81M
+import slothy.targets.arm_v81m.cortex_m55r1 as Target_CortexM55r1
+import slothy.targets.arm_v81m.cortex_m85r1 as Target_CortexM85r1
+
+import slothy.targets.aarch64.aarch64_neon as AArch64_Neon
+import slothy.targets.aarch64.cortex_a55 as Target_CortexA55
+import slothy.targets.aarch64.cortex_a72_frontend as Target_CortexA72
+
+target_label_dict = {Target_CortexA55: "a55",
+                     Target_CortexA72: "a72",
+                     Target_CortexM55r1: "m55",
+                     Target_CortexM85r1: "m85"}
+
+# Bump this whenever the layout of the report changes
+REPORT_FORMAT_VERSION = 1
+
+
+class BenchmarkException(Exception):
+    """Exception thrown when a benchmark goes wrong"""
+
+
+class Benchmark():
+    """A single entry of the benchmark matrix
+
+    Args:
+        infile: The assembly file to optimize.
+        arch: The architecture model.
+        target: The microarchitecture model.
+        loops: List of loops to optimize, in order. Each entry is either a
+            loop label, or a pair of a loop label and a dictionary of further
+            configuration options to set before optimizing that loop. If empty,
+            the whole file is optimized.
+        config: Dictionary of configuration options to set before
+            optimization, with nested options given as dotted paths.
+        suite: The suite this benchmark belongs to (quick or full).
+    """
+
+    def __init__(self, infile, arch, target, name=None, loops=None,
+                 config=None, suite="quick"):
+        if name is None:
+            name = os.path.splitext(os.path.basename(infile))[0]
+        self.name = f"{name}_{target_label_dict[target]}"
+        self.infile = infile
+        self.arch = arch
+        self.target = target
+        self.loops = loops if loops is not None else []
+        self.config = config if config is not None else {}
+        self.suite = suite
+
+    @staticmethod
+    def _configure(slothy, config):
+        for (attr, val) in config.items():
+            obj = slothy.config
+            attrs = attr.split('.')
+            for a in attrs[:-1]:
+                obj = getattr(obj, a)
+            setattr(obj, attrs[-1], val)
+
+    def run(self, seed, workers, timeout=None, debug=False, silent=True):
+        """Run the benchmark and return a dictionary of measurements"""
+        logger = logging.getLogger(self.name)
+        if silent:
+            logger.setLevel(logging.WARNING)
+        elif debug:
+            logger.setLevel(logging.DEBUG)
+
+        slothy = Slothy(self.arch, self.target, logger=logger)
+        slothy.load_source_from_file(self.infile)
+        Benchmark._configure(slothy, self.config)
+        slothy.config.solver_random_seed = seed
+        slothy.config.solver_num_workers = workers
+        if timeout is not None:
+            slothy.config.timeout = timeout
+
+        fd, profile_file = tempfile.mkstemp(prefix="slothy_bench_", suffix=".jsonl")
+        os.close(fd)
+        slothy.config.profile_file = profile_file
+
+        try:
+            start = time.perf_counter()
+            if len(self.loops) > 0:
+                for l in self.loops:
+                    if isinstance(l, tuple):
+                        l, config = l
+                        Benchmark._configure(slothy, config)
+                    slothy.optimize_loop(l)
+            else:
+                slothy.optimize()
+            total_time = time.perf_counter() - start
+
+            with open(profile_file, "r", encoding="utf-8") as f:
+                runs = [ json.loads(l) for l in f if l.strip() != "" ]
+        finally:
+            os.remove(profile_file)
+
+        return Benchmark._summarize(runs, total_time)
+
+    @staticmethod
+    def _summarize(runs, total_time):
+        # Each optimized region (loop kernel, preamble, postamble, ...) is logged
+        # under its own name. The quality of a region is that of its best solution,
+        # since binary searches and retries produce several solutions per region.
+        regions = {}
+        for r in runs:
+            if "cycles" not in r:
+                continue
+            best = regions.get(r["name"], None)
+            if best is None or r["cycles"] < best["cycles"]:
+                regions[r["name"]] = r
+
+        def total(key):
+            vals = [ r[key] for r in regions.values() ]
+            if len(vals) == 0 or None in vals:
+                return None
+            return sum(vals)
+
+        return {
+            "total_time":    total_time,
+            "solve_time":    sum(r["solve_time"] for r in runs),
+            "build_time":    sum(p["time"] for r in runs for p in r["phases"].values()),
+            "solver_calls":  len(runs),
+            "variables":     max((r["variables"] for r in runs), default=0),
+            "constraints":   max((r["constraints"] for r in runs), default=0),
+            "cycles":        total("cycles"),
+            "stalls":        total("stalls"),
+            "cycles_bound":  total("cycles_bound"),
+            "regions":       { name : { "cycles": r["cycles"],
+                                        "stalls": r["stalls"],
+                                        "cycles_bound": r["cycles_bound"] }
+                               for (name, r) in sorted(regions.items()) },
+        }
+
+
+def _naive(f):
+    return f"examples/naive/{f}"
+
+def _clean(f):
+    return f"paper/clean/{f}"
+
+helium_targets = [Target_CortexM55r1, Target_CortexM85r1]
+neon_targets = [Target_CortexA55, Target_CortexA72]
+
+benchmarks = []
+
+for t in helium_targets:
+    benchmarks += [
+        Benchmark(_naive("simple0.s"), Arch_Armv81M, t),
+        Benchmark(_naive("simple1.s"), Arch_Armv81M, t),
+        Benchmark(_naive("simple0_loop.s"), Arch_Armv81M, t, loops=["start"],
+                  config={"sw_pipelining.enabled": True,
+                          "inputs_are_outputs": True,
+                          "typing_hints": {"const": Arch_Armv81M.RegisterType.GPR}}),
+        Benchmark(_naive("simple1_loop.s"), Arch_Armv81M, t, loops=["start"],
+                  config={"sw_pipelining.enabled": True,
+                          "inputs_are_outputs": True}),
+        Benchmark(_clean("helium/cmplx_mag_sqr/cmplx_mag_sqr_fx.s"), Arch_Armv81M, t,
+                  loops=["start"],
+                  config={"sw_pipelining.enabled": True,
+                          "inputs_are_outputs": True,
+                          "sw_pipelining.minimize_overlapping": False,
+                          "constraints.stalls_first_attempt": 1,
+                          "variable_size": True}),
+        Benchmark(_clean("helium/ntt/ntt_kyber_12_345_67.s"), Arch_Armv81M, t,
+                  loops=["layer12_loop",
+                         ("layer345_loop",
+                          {"variable_size": True,
+                           "constraints.stalls_first_attempt": 16,
+                           "locked_registers": set([ f"QSTACK{i}" for i in [4,5,6] ] +
+                                                   [ "STACK0" ]),
+                           "sw_pipelining.enabled": False}),
+                         ("layer67_loop",
+                          {"sw_pipelining.enabled": True,
+                           "sw_pipelining.halving_heuristic": False,
+                           "sw_pipelining.halving_heuristic_periodic": True,
+                           "constraints.st_ld_hazard": False})],
+                  config={"sw_pipelining.enabled": True,
+                          "inputs_are_outputs": True},
+                  suite="full"),
+    ]
+
+for t in neon_targets:
+    benchmarks += [
+        Benchmark(_naive("aarch64/aarch64_simple0.s"), AArch64_Neon, t,
+                  config={"variable_size": True,
+                          "constraints.stalls_first_attempt": 32}),
+        Benchmark(_naive("aarch64/aarch64_simple0_loop.s"), AArch64_Neon, t,
+                  loops=["start"],
+                  config={"variable_size": True,
+                          "constraints.stalls_first_attempt": 32,
+                          "sw_pipelining.enabled": True,
+                          "sw_pipelining.optimize_preamble": False,
+                          "sw_pipelining.optimize_postamble": False}),
+        Benchmark(_clean("neon/ntt_kyber_123_4567.s"), AArch64_Neon, t,
+                  loops=["layer123_start", "layer4567_start"],
+                  config={"sw_pipelining.enabled": True,
+                          "inputs_are_outputs": True,
+                          "sw_pipelining.minimize_overlapping": False,
+                          "variable_size": True,
+                          "reserved_regs": [ f"x{i}" for i in range(0, 7) ] + ["x30", "sp"],
+                          "constraints.stalls_first_attempt": 64},
+                  suite="full"),
+    ]
+
+
+def compare(report, baseline, time_tolerance, time_slack, logger):
+    """Compare a benchmark report against a baseline report
+
+    Returns the list of regressions found. Slowdowns are only reported if
+    they exceed both the given relative tolerance and the given absolute
+    slack in seconds; any increase in cycle count is reported as a quality
+    regression."""
+    regressions = []
+    if baseline.get("version") != report.get("version"):
+        raise BenchmarkException("Incompatible baseline report format")
+    for key in ["seed", "workers", "slothy", "ortools"]:
+        if baseline["meta"].get(key) != report["meta"].get(key):
+            logger.warning("Baseline differs in %s: %s vs. %s", key,
+                           baseline["meta"].get(key), report["meta"].get(key))
+
+    for (name, new) in report["benchmarks"].items():
+        old = baseline["benchmarks"].get(name, None)
+        if old is None:
+            logger.info("%s: no baseline", name)
+            continue
+        if new["total_time"] > old["total_time"] * (1 + time_tolerance) + time_slack:
+            regressions.append(f"{name}: time {old['total_time']:.2f}s -> "
+                               f"{new['total_time']:.2f}s")
+        for key in ["cycles", "stalls"]:
+            if old[key] is not None and new[key] is not None and new[key] > old[key]:
+                regressions.append(f"{name}: {key} {old[key]} -> {new[key]}")
+        for key in ["cycles_bound", "variables", "constraints"]:
+            if old[key] != new[key]:
+                logger.info("%s: %s changed %s -> %s", name, key, old[key], new[key])
+    for name in baseline["benchmarks"]:
+        if name not in report["benchmarks"]:
+            logger.info("%s: not run", name)
+    return regressions
+
+
+def main():
+    all_benchmark_names = [b.name for b in benchmarks]
+
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--benchmarks", type=str, default=None,
+        help=f"Comma-separated list of benchmarks to run, from {all_benchmark_names}. "
+        "Overrides --suite.")
+    parser.add_argument("--suite", type=str, default="quick", choices=["quick", "full"],
+        help="The benchmark suite to run. The full suite includes the quick one.")
+    parser.add_argument("--seed", type=int, default=42,
+        help="The random seed for the constraint solver")
+    parser.add_argument("--workers", type=int, default=8,
+        help="The number of worker threads for the constraint solver")
+    parser.add_argument("--timeout", type=int, default=None,
+        help="Timeout in seconds for each solver invocation")
+    parser.add_argument("-o", "--output", type=str, default="benchmark.json",
+        help="The file to write the JSON report to")
+    parser.add_argument("--baseline", type=str, default=None,
+        help="A previous report to compare against")
+    parser.add_argument("--time-tolerance", type=float, default=0.25,
+        help="Relative slowdown against the baseline which is tolerated")
+    parser.add_argument("--time-slack", type=float, default=1.0,
+        help="Absolute slowdown in seconds against the baseline which is tolerated")
+    parser.add_argument("--debug", default=False, action="store_true")
+    parser.add_argument("--verbose", default=False, action="store_true",
+        help="Show SLOTHY's output for each benchmark")
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, handlers=[logging.StreamHandler(sys.stdout)])
+    logger = logging.getLogger("benchmark")
+
+    if args.benchmarks is not None:
+        todo = args.benchmarks.split(",")
+        for name in todo:
+            if name not in all_benchmark_names:
+                raise BenchmarkException(f"Could not find benchmark {name}")
+    elif args.suite == "quick":
+        todo = [b.name for b in benchmarks if b.suite == "quick"]
+    else:
+        todo = all_benchmark_names
+
+    report = {
+        "version": REPORT_FORMAT_VERSION,
+        "meta": {
+            "slothy": slothy_fingerprint(),
+            "ortools": ortools.__version__,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "seed": args.seed,
+            "workers": args.workers,
+            "timeout": args.timeout,
+        },
+        "benchmarks": {},
+    }
+
+    for b in benchmarks:
+        if b.name not in todo:
+            continue
+        logger.info("* Benchmark: %s ...", b.name)
+        res = b.run(args.seed, args.workers, timeout=args.timeout,
+                    debug=args.debug, silent=not (args.verbose or args.debug))
+        logger.info("  time %.2fs (solve %.2fs, build %.2fs), %d variables, "
+                    "%d constraints, cycles %s, stalls %s, cycle bound %s",
+                    res["total_time"], res["solve_time"], res["build_time"],
+                    res["variables"], res["constraints"], res["cycles"],
+                    res["stalls"], res["cycles_bound"])
+        report["benchmarks"][b.name] = res
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    logger.info("Report written to %s", args.output)
+
+    if args.baseline is not None:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.time_tolerance,
+                              args.time_slack, logger)
+        if len(regressions) > 0:
+            for r in regressions:
+                logger.error("Regression: %s", r)
+            sys.exit(1)
+        logger.info("No regressions against %s", args.baseline)
+
+if __name__ == "__main__":
+    main()
@@ -28,6 +28,7 @@
 import argparse
 import logging
 import sys
+import tempfile
 
 from slothy import Slothy, Config
 
@@ -187,6 +188,33 @@ class Example3(Example):
         slothy.optimize_loop("start")
 
 
+class Example2Draft(Example):
+    """simple0_loop, scheduled greedily via list scheduling instead of the solver"""
+    def __init__(self):
+        super().__init__("simple0_loop", name="simple0_loop_draft", suffix="draft")
+
+    def core(self, slothy):
+        slothy.config.inputs_are_outputs = True
+        slothy.config.typing_hints = { r : Arch_Armv81M.RegisterType.GPR
+                                       for r in ["const", "inA", "inB"] }
+        slothy.config.draft = True
+        slothy.optimize_loop("start")
+
+
+class Example2Modulo(Example):
+    """simple0_loop, software pipelined via iterative modulo scheduling"""
+    def __init__(self):
+        super().__init__("simple0_loop", name="simple0_loop_modulo", suffix="modulo")
+
+    def core(self, slothy):
+        slothy.config.inputs_are_outputs = True
+        slothy.config.typing_hints = { r : Arch_Armv81M.RegisterType.GPR
+                                       for r in ["const", "inA", "inB"] }
+        slothy.config.sw_pipelining.enabled = True
+        slothy.config.sw_pipelining.modulo_scheduling = True
+        slothy.optimize_loop("start")
+
+
 class CRT(Example):
     def __init__(self):
         super().__init__("crt")
@@ -323,6 +351,27 @@ class ntt_kyber_1_23_45_67(Example):
         slothy.optimize_loop("layer67_loop")
 
 
+class ntt_kyber_1_23_45_67_adaptive(Example):
+    """Last layer of ntt_kyber_1_23_45_67, optimized via the split heuristic
+    with windows placed according to the stall map"""
+    def __init__(self, arch=Arch_Armv81M, target=Target_CortexM55r1):
+        name = "ntt_kyber_1_23_45_67_adaptive"
+        infile = "ntt_kyber_1_23_45_67"
+        name += f"_{target_label_dict[target]}"
+        super().__init__(infile, name=name, suffix="adaptive", arch=arch, target=target,
+                         rename=True)
+
+    def core(self, slothy):
+        slothy.config.inputs_are_outputs = True
+        slothy.config.variable_size = True
+        slothy.config.constraints.stalls_first_attempt = 8
+        slothy.config.split_heuristic = True
+        slothy.config.split_heuristic_factor = 4
+        slothy.config.split_heuristic_repeat = 2
+        slothy.config.split_heuristic_adaptive = True
+        slothy.optimize_loop("layer67_loop")
+
+
 class ntt_kyber_1(Example):
     def __init__(self, arch=Arch_Armv81M, target=Target_CortexM55r1):
         name = "ntt_kyber_1"
@@ -555,6 +604,73 @@ class AArch64Example1(Example):
         slothy.optimize(start="start", end="end")
 
 
+class AArch64Reoptimize(Example):
+    """Re-optimize an edited version of aarch64_simple0, starting from the
+    optimization result for the original version"""
+    def __init__(self, arch=AArch64_Neon, target=Target_CortexA55):
+        name = "aarch64_simple0_reoptimize"
+        infile = "aarch64_simple0"
+        name += f"_{target_label_dict[target]}"
+
+        super().__init__(infile, name, rename=True, outfile="aarch64_simple0_reoptimize",
+                         arch=arch, target=target)
+
+    def core(self,slothy):
+        slothy.config.constraints.stalls_first_attempt=32
+        prev_source = slothy.get_source_as_string()
+        slothy.optimize()
+        prev_opt = slothy.get_source_as_string()
+
+        # Swap the operands of one subtraction, and only re-optimize around it
+        source = prev_source.replace("sub     v11.8h,    v10.8h, v24.8h",
+                                     "sub     v11.8h,    v24.8h, v10.8h")
+        assert source != prev_source
+        slothy.load_source_raw(source)
+
+        warnings = []
+        handler = logging.Handler(logging.WARNING)
+        handler.emit = warnings.append
+        slothy.logger.addHandler(handler)
+        try:
+            slothy.optimize(previous=(prev_source, prev_opt))
+        finally:
+            slothy.logger.removeHandler(handler)
+        if any("Could not reuse previous optimization" in r.getMessage() for r in warnings):
+            raise ExampleException("Failed to re-optimize previous optimization result")
+
+
+class AArch64Cache(Example):
+    """Optimize aarch64_simple0 twice with a result cache, and check that the
+    second optimization is replayed from the cache"""
+    def __init__(self, arch=AArch64_Neon, target=Target_CortexA55):
+        name = "aarch64_simple0_cache"
+        infile = "aarch64_simple0"
+        name += f"_{target_label_dict[target]}"
+
+        super().__init__(infile, name, rename=True, outfile="aarch64_simple0_cache",
+                         arch=arch, target=target)
+
+    def core(self,slothy):
+        slothy.config.constraints.stalls_first_attempt=32
+        source = slothy.get_source_as_string()
+        with tempfile.TemporaryDirectory() as cache_dir:
+            slothy.config.cache_dir = cache_dir
+            slothy.optimize()
+            slothy.load_source_raw(source)
+
+            infos = []
+            handler = logging.Handler(logging.INFO)
+            handler.emit = infos.append
+            slothy.logger.addHandler(handler)
+            try:
+                slothy.optimize()
+            finally:
+                slothy.logger.removeHandler(handler)
+            slothy.config.cache_dir = None
+        if not any("Replaying cached result" in r.getMessage() for r in infos):
+            raise ExampleException("Optimization result was not replayed from the cache")
+
+
 class AArch64Example2(Example):
     def __init__(self, var="", arch=AArch64_Neon, target=Target_CortexA55):
         name = "aarch64_simple0_loop"
@@ -577,6 +693,45 @@ class AArch64Example2(Example):
 
 
 
+class AArch64Example2Draft(Example):
+    """aarch64_simple0_loop, scheduled greedily via list scheduling instead of the solver"""
+    def __init__(self, arch=AArch64_Neon, target=Target_CortexA55):
+        name = f"aarch64_simple0_loop_draft_{target_label_dict[target]}"
+        super().__init__("aarch64_simple0_loop", name, suffix="draft", rename=True,
+                         arch=arch, target=target)
+
+    def core(self,slothy):
+        slothy.config.draft = True
+        slothy.optimize_loop("start")
+
+
+class AArch64Example2Modulo(Example):
+    """aarch64_simple0_loop, software pipelined via iterative modulo scheduling"""
+    def __init__(self, arch=AArch64_Neon, target=Target_CortexA55):
+        name = f"aarch64_simple0_loop_modulo_{target_label_dict[target]}"
+        super().__init__("aarch64_simple0_loop", name, suffix="modulo", rename=True,
+                         arch=arch, target=target)
+
+    def core(self,slothy):
+        slothy.config.inputs_are_outputs = True
+        slothy.config.sw_pipelining.enabled = True
+        slothy.config.sw_pipelining.modulo_scheduling = True
+        slothy.optimize_loop("start")
+
+
+class AArch64Example2ListScheduleHint(Example):
+    """aarch64_simple0_loop, optimized by the solver starting from a list schedule"""
+    def __init__(self, arch=AArch64_Neon, target=Target_CortexA55):
+        name = f"aarch64_simple0_loop_list_hint_{target_label_dict[target]}"
+        super().__init__("aarch64_simple0_loop", name, suffix="list_hint", rename=True,
+                         arch=arch, target=target)
+
+    def core(self,slothy):
+        slothy.config.variable_size=True
+        slothy.config.hints.list_schedule_hint = True
+        slothy.optimize_loop("start")
+
+
 class ntt_kyber_123_4567(Example):
     def __init__(self, var="", arch=AArch64_Neon, target=Target_CortexA55, timeout=None):
         name = "ntt_kyber_123_4567"
@@ -1357,6 +1512,8 @@ def main():
                  Example1(),
                  Example2(),
                  Example3(),
+                 Example2Draft(),
+                 Example2Modulo(),
 
                  AArch64Example0(),
                  AArch64Example0(target=Target_CortexA72),
@@ -1364,6 +1521,13 @@ def main():
                  AArch64Example1(target=Target_CortexA72),
                  AArch64Example2(),
                  AArch64Example2(target=Target_CortexA72),
+                 AArch64Reoptimize(),
+                 AArch64Cache(),
+                 AArch64Example2Draft(),
+                 AArch64Example2Draft(target=Target_CortexA72),
+                 AArch64Example2Modulo(),
+                 AArch64Example2Modulo(target=Target_CortexA72),
+                 AArch64Example2ListScheduleHint(),
 
                  CRT(),
 
@@ -1381,6 +1545,7 @@ def main():
                  ntt_kyber_1_23_45_67(),
                  ntt_kyber_1_23_45_67(var="no_trans"),
                  ntt_kyber_1_23_45_67(var="no_trans_vld4", timeout=600),
+                 ntt_kyber_1_23_45_67_adaptive(),
                  ntt_kyber_12_345_67(False),
                  ntt_kyber_12_345_67(True),
                  # Cortex-M85
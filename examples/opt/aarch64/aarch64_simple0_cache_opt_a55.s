@@ -0,0 +1,91 @@
+                                                // Instructions:    20
+                                                // Expected cycles: 28
+                                                // Expected IPC:    0.71
+                                                // Static bound:    25
+                                                //
+                                                // Wall time:     0.64s
+                                                // User time:     0.64s
+                                                //
+                                                // ----- original position ----->
+                                                // 0                        25
+                                                // |------------------------|----
+        ldr q2, [x0, #16]                       // ...*..........................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        ldr q13, [x1, #0]                       // *.............................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        ldr q11, [x0, #48]                      // .....*........................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        sqrdmulh v3.8H, v2.8H, v13.H[1]         // .......*......................
+        // gap                                  // ..............................
+        mul v14.8H, v2.8H, v13.H[0]             // ......*.......................
+        // gap                                  // ..............................
+        ldr q10, [x2, #0]                       // .*............................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        sqrdmulh v8.8H, v11.8H, v13.H[1]        // ............*.................
+        // gap                                  // ..............................
+        mul v15.8H, v11.8H, v13.H[0]            // ...........*..................
+        // gap                                  // ..............................
+        mls v14.8H, v3.8H, v10.H[0]             // ........*.....................
+        // gap                                  // ..............................
+        ldr q4, [x0]                            // ..*...........................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        ldr q9, [x0, #32]                       // ....*.........................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        add v20.8H, v4.8H, v14.8H               // ..........*...................
+        // gap                                  // ..............................
+        mls v15.8H, v8.8H, v10.H[0]             // .............*................
+        // gap                                  // ..............................
+        sub v7.8H, v4.8H, v14.8H                // .........*....................
+        // gap                                  // ..............................
+        str q20, [x0], #4*16                    // ................*.............
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        sub v12.8H, v9.8H, v15.8H               // ..............*...............
+        // gap                                  // ..............................
+        str q7, [x0, #-48]                      // .................*............
+        // gap                                  // ..............................
+        add v5.8H, v9.8H, v15.8H                // ...............*..............
+        // gap                                  // ..............................
+        str q12, [x0, #-16]                     // ...................*..........
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        str q5, [x0, #-32]                      // ..................*...........
+        // gap                                  // ..............................
+
+                                                  // -------- new position -------->
+                                                  // 0                        25
+                                                  // |------------------------|-----
+        // ldr q0, [x1, #0]                       // .*.............................
+        // ldr q1, [x2, #0]                       // .....*.........................
+        // ldr q8,  [x0]                          // .........*.....................
+        // ldr q9,  [x0, #1*16]                   // *..............................
+        // ldr q10, [x0, #2*16]                   // ..........*....................
+        // ldr q11, [x0, #3*16]                   // ..*............................
+        // mul v24.8h, v9.8h, v0.h[0]             // ....*..........................
+        // sqrdmulh v9.8h, v9.8h, v0.h[1]         // ...*...........................
+        // mls v24.8h, v9.8h, v1.h[0]             // ........*......................
+        // sub     v9.8h,    v8.8h, v24.8h        // .............*.................
+        // add     v8.8h,    v8.8h, v24.8h        // ...........*...................
+        // mul v24.8h, v11.8h, v0.h[0]            // .......*.......................
+        // sqrdmulh v11.8h, v11.8h, v0.h[1]       // ......*........................
+        // mls v24.8h, v11.8h, v1.h[0]            // ............*..................
+        // sub     v11.8h,    v10.8h, v24.8h      // ...............*...............
+        // add     v10.8h,    v10.8h, v24.8h      // .................*.............
+        // str q8,  [x0], #4*16                   // ..............*................
+        // str q9,  [x0, #-3*16]                  // ................*..............
+        // str q10, [x0, #-2*16]                  // ...................*...........
+        // str q11, [x0, #-1*16]                  // ..................*............
@@ -0,0 +1,126 @@
+qdata0   .req q8
+qdata1   .req q9
+qdata2   .req q10
+qdata3   .req q11
+
+qtwiddle .req q0
+qmodulus .req q1
+
+data0    .req v8
+data1    .req v9
+data2    .req v10
+data3    .req v11
+
+twiddle  .req v0
+modulus  .req v1
+
+tmp      .req v12
+
+data_ptr      .req x0
+twiddle_ptr   .req x1
+modulus_ptr   .req x2
+
+.macro barmul out, in, twiddle, modulus
+    mul      \out.8h,   \in.8h, \twiddle.h[0]
+    sqrdmulh \in.8h,    \in.8h, \twiddle.h[1]
+    mls      \out.8h,   \in.8h, \modulus.h[0]
+.endm
+
+.macro butterfly data0, data1, tmp, twiddle, modulus
+    barmul \tmp, \data1, \twiddle, \modulus
+    sub    \data1.8h, \data0.8h, \tmp.8h
+    add    \data0.8h, \data0.8h, \tmp.8h
+.endm
+
+count .req x2
+ldr qtwiddle, [twiddle_ptr, #0]
+ldr qmodulus, [modulus_ptr, #0]
+mov count, #16
+start:
+                                                // Instructions:    18
+                                                // Expected cycles: 24
+                                                // Expected IPC:    0.75
+                                                //
+                                                // Cycle bound:     24.0
+                                                // IPC bound:       0.75
+                                                // Static bound:    21
+                                                //
+                                                // Wall time:     0.40s
+                                                // User time:     0.40s
+                                                //
+                                                // ----- original position ----->
+                                                // 0                        25
+                                                // |------------------------|----
+        ldr q20, [x0, #16]                      // .*............................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        ldr q26, [x0, #48]                      // ...*..........................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        sqrdmulh v21.8H, v20.8H, v0.H[1]        // .....*........................
+        // gap                                  // ..............................
+        mul v30.8H, v20.8H, v0.H[0]             // ....*.........................
+        // gap                                  // ..............................
+        ldr q29, [x0, #0]                       // *.............................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        sqrdmulh v25.8H, v26.8H, v0.H[1]        // ..........*...................
+        // gap                                  // ..............................
+        mls v30.8H, v21.8H, v1.H[0]             // ......*.......................
+        // gap                                  // ..............................
+        mul v31.8H, v26.8H, v0.H[0]             // .........*....................
+        // gap                                  // ..............................
+        ldr q28, [x0, #32]                      // ..*...........................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        sub v0.8H, v29.8H, v30.8H               // .......*......................
+        // gap                                  // ..............................
+        mls v31.8H, v25.8H, v1.H[0]             // ...........*..................
+        // gap                                  // ..............................
+        add v24.8H, v29.8H, v30.8H              // ........*.....................
+        // gap                                  // ..............................
+        str q0, [x0, #16]                       // ...............*..............
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        add v0.8H, v28.8H, v31.8H               // .............*................
+        // gap                                  // ..............................
+        str q24, [x0], #4*16                    // ..............*...............
+        // gap                                  // ..............................
+        sub v1.8H, v28.8H, v31.8H               // ............*.................
+        // gap                                  // ..............................
+        str q0, [x0, #-32]                      // ................*.............
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        str q1, [x0, #-16]                      // .................*............
+        // gap                                  // ..............................
+
+                                                    // -------- new position -------->
+                                                    // 0                        25
+                                                    // |------------------------|-----
+        // ldr q8, [x0, #0*16]                      // ....*..........................
+        // ldr q9, [x0, #1*16]                      // *..............................
+        // ldr q10, [x0, #2*16]                     // ........*......................
+        // ldr q11, [x0, #3*16]                     // .*.............................
+        // mul      v12.8h,   v9.8h, v0.h[0]        // ...*...........................
+        // sqrdmulh v9.8h,    v9.8h, v0.h[1]        // ..*............................
+        // mls      v12.8h,   v9.8h, v1.h[0]        // ......*........................
+        // sub    v9.8h, v8.8h, v12.8h              // .........*.....................
+        // add    v8.8h, v8.8h, v12.8h              // ...........*...................
+        // mul      v12.8h,   v11.8h, v0.h[0]       // .......*.......................
+        // sqrdmulh v11.8h,    v11.8h, v0.h[1]      // .....*.........................
+        // mls      v12.8h,   v11.8h, v1.h[0]       // ..........*....................
+        // sub    v11.8h, v10.8h, v12.8h            // ...............*...............
+        // add    v10.8h, v10.8h, v12.8h            // .............*.................
+        // str q8, [x0], #4*16                      // ..............*................
+        // str q9, [x0, #-3*16]                     // ............*..................
+        // str q10, [x0, #-2*16]                    // ................*..............
+        // str q11, [x0, #-1*16]                    // .................*.............
+
+        sub count, count, #1
+        cbnz count, start
\ No newline at end of file
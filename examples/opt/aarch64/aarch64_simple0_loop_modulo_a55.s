@@ -0,0 +1,214 @@
+qdata0   .req q8
+qdata1   .req q9
+qdata2   .req q10
+qdata3   .req q11
+
+qtwiddle .req q0
+qmodulus .req q1
+
+data0    .req v8
+data1    .req v9
+data2    .req v10
+data3    .req v11
+
+twiddle  .req v0
+modulus  .req v1
+
+tmp      .req v12
+
+data_ptr      .req x0
+twiddle_ptr   .req x1
+modulus_ptr   .req x2
+
+.macro barmul out, in, twiddle, modulus
+    mul      \out.8h,   \in.8h, \twiddle.h[0]
+    sqrdmulh \in.8h,    \in.8h, \twiddle.h[1]
+    mls      \out.8h,   \in.8h, \modulus.h[0]
+.endm
+
+.macro butterfly data0, data1, tmp, twiddle, modulus
+    barmul \tmp, \data1, \twiddle, \modulus
+    sub    \data1.8h, \data0.8h, \tmp.8h
+    add    \data0.8h, \data0.8h, \tmp.8h
+.endm
+
+count .req x2
+ldr qtwiddle, [twiddle_ptr, #0]
+ldr qmodulus, [modulus_ptr, #0]
+mov count, #16
+                                               // Instructions:    16
+                                               // Expected cycles: 20
+                                               // Expected IPC:    0.80
+                                               // Static bound:    19
+                                               //
+                                               // Wall time:     0.07s
+                                               // User time:     0.07s
+                                               //
+                                               // ----- original position ----->
+                                               // 0                        25
+                                               // |------------------------|----
+        ldr q4, [x0, #16]                      // *.............................
+        // gap                                 // ..............................
+        // gap                                 // ..............................
+        // gap                                 // ..............................
+        ldr q3, [x0, #48]                      // .*............................
+        // gap                                 // ..............................
+        // gap                                 // ..............................
+        // gap                                 // ..............................
+        sqrdmulh v24.8H, v4.8H, v0.H[1]        // ...*..........................
+        // gap                                 // ..............................
+        mul v31.8H, v4.8H, v0.H[0]             // ..*...........................
+        // gap                                 // ..............................
+        mul v30.8H, v3.8H, v0.H[0]             // ....*.........................
+        // gap                                 // ..............................
+        sqrdmulh v3.8H, v3.8H, v0.H[1]         // .....*........................
+        // gap                                 // ..............................
+        ldr q4, [x0, #0]                       // ......*.......................
+        // gap                                 // ..............................
+        // gap                                 // ..............................
+        // gap                                 // ..............................
+        mls v31.8H, v24.8H, v1.H[0]            // ........*.....................
+        // gap                                 // ..............................
+        mls v30.8H, v3.8H, v1.H[0]             // .........*....................
+        // gap                                 // ..............................
+        ldr q25, [x0, #32]                     // .......*......................
+        // gap                                 // ..............................
+        // gap                                 // ..............................
+        // gap                                 // ..............................
+        add v3.8H, v4.8H, v31.8H               // ...........*..................
+        // gap                                 // ..............................
+        sub v27.8H, v4.8H, v31.8H              // ..........*...................
+        // gap                                 // ..............................
+        add v4.8H, v25.8H, v30.8H              // .............*................
+        // gap                                 // ..............................
+        str q3, [x0], #4*16                    // ..............*...............
+        // gap                                 // ..............................
+        sub v3.8H, v25.8H, v30.8H              // ............*.................
+        // gap                                 // ..............................
+        str q27, [x0, #-48]                    // ...............*..............
+        // gap                                 // ..............................
+
+                                                 // -------- new position -------->
+                                                 // 0                        25
+                                                 // |------------------------|-----
+        // ldr q9, [x0, #16]                     // *..............................
+        // ldr q11, [x0, #48]                    // .*.............................
+        // mul v12.8H, v9.8H, v0.H[0]            // ...*...........................
+        // sqrdmulh v9.8H, v9.8H, v0.H[1]        // ..*............................
+        // mul v2.8H, v11.8H, v0.H[0]            // ....*..........................
+        // sqrdmulh v11.8H, v11.8H, v0.H[1]      // .....*.........................
+        // ldr q8, [x0, #0]                      // ......*........................
+        // ldr q10, [x0, #32]                    // .........*.....................
+        // mls v12.8H, v9.8H, v1.H[0]            // .......*.......................
+        // mls v2.8H, v11.8H, v1.H[0]            // ........*......................
+        // sub v9.8H, v8.8H, v12.8H              // ...........*...................
+        // add v8.8H, v8.8H, v12.8H              // ..........*....................
+        // sub v3.8H, v10.8H, v2.8H              // ..............*................
+        // add v4.8H, v10.8H, v2.8H              // ............*..................
+        // str q8, [x0], #4*16                   // .............*.................
+        // str q9, [x0, #-48]                    // ...............*...............
+
+        sub count, count, #1
+start:
+                                                // Instructions:    18
+                                                // Expected cycles: 22
+                                                // Expected IPC:    0.82
+                                                //
+                                                // Wall time:     0.02s
+                                                // User time:     0.02s
+                                                //
+                                                // ----- original position ----->
+                                                // 0                        25
+                                                // |------------------------|----
+        ldr q9, [x0, #16]                       // .e............................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        ldr q11, [x0, #48]                      // ...e..........................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        mul v12.8H, v9.8H, v0.H[0]              // ....e.........................
+        // gap                                  // ..............................
+        sqrdmulh v9.8H, v9.8H, v0.H[1]          // .....e........................
+        // gap                                  // ..............................
+        mul v2.8H, v11.8H, v0.H[0]              // .........e....................
+        // gap                                  // ..............................
+        sqrdmulh v11.8H, v11.8H, v0.H[1]        // ..........e...................
+        // gap                                  // ..............................
+        ldr q8, [x0, #0]                        // e.............................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        ldr q10, [x0, #32]                      // ..e...........................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        // gap                                  // ..............................
+        mls v12.8H, v9.8H, v1.H[0]              // ......e.......................
+        // gap                                  // ..............................
+        mls v2.8H, v11.8H, v1.H[0]              // ...........e..................
+        // gap                                  // ..............................
+        str q4, [x0, #-32]                      // ................*.............
+        // gap                                  // ..............................
+        str q3, [x0, #-16]                      // .................*............
+        // gap                                  // ..............................
+        sub v9.8H, v8.8H, v12.8H                // .......e......................
+        // gap                                  // ..............................
+        add v8.8H, v8.8H, v12.8H                // ........e.....................
+        // gap                                  // ..............................
+        sub v3.8H, v10.8H, v2.8H                // ............e.................
+        // gap                                  // ..............................
+        add v4.8H, v10.8H, v2.8H                // .............e................
+        // gap                                  // ..............................
+        str q8, [x0], #4*16                     // ..............e...............
+        // gap                                  // ..............................
+        str q9, [x0, #-48]                      // ...............e..............
+        // gap                                  // ..............................
+
+                                                    // -------- new position -------->
+                                                    // 0                        25
+                                                    // |------------------------|-----
+        // ldr q8, [x0, #0*16]                      // ......e...........'.....~......
+        // ldr q9, [x0, #1*16]                      // e.................~............
+        // ldr q10, [x0, #2*16]                     // .......e..........'......~.....
+        // ldr q11, [x0, #3*16]                     // .e................'~...........
+        // mul      v12.8h,   v9.8h, v0.h[0]        // ..e...............'.~..........
+        // sqrdmulh v9.8h,    v9.8h, v0.h[1]        // ...e..............'..~.........
+        // mls      v12.8h,   v9.8h, v1.h[0]        // ........e.........'.......~....
+        // sub    v9.8h, v8.8h, v12.8h              // ............e.....'............
+        // add    v8.8h, v8.8h, v12.8h              // .............e....'............
+        // mul      v12.8h,   v11.8h, v0.h[0]       // ....e.............'...~........
+        // sqrdmulh v11.8h,    v11.8h, v0.h[1]      // .....e............'....~.......
+        // mls      v12.8h,   v11.8h, v1.h[0]       // .........e........'........~...
+        // sub    v11.8h, v10.8h, v12.8h            // ..............e...'............
+        // add    v10.8h, v10.8h, v12.8h            // ...............e..'............
+        // str q8, [x0], #4*16                      // ................e.'............
+        // str q9, [x0, #-3*16]                     // .................e'............
+        // str q10, [x0, #-2*16]                    // ..........~.......'.........*..
+        // str q11, [x0, #-1*16]                    // ...........~......'..........*.
+
+        sub count, count, #1
+        cbnz count, start
+                                  // Instructions:    2
+                                  // Expected cycles: 3
+                                  // Expected IPC:    0.67
+                                  // Static bound:    1
+                                  //
+                                  // Wall time:     0.00s
+                                  // User time:     0.00s
+                                  //
+                                  // ----- original position ----->
+                                  // 0                        25
+                                  // |------------------------|----
+        str q3, [x0, #-16]        // .*............................
+        // gap                    // ..............................
+        // gap                    // ..............................
+        // gap                    // ..............................
+        str q4, [x0, #-32]        // *.............................
+        // gap                    // ..............................
+
+                                   // -------- new position -------->
+                                   // 0                        25
+                                   // |------------------------|-----
+        // str q4, [x0, #-32]      // .*.............................
+        // str q3, [x0, #-16]      // *..............................
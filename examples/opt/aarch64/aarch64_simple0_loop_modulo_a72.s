@@ -0,0 +1,226 @@
+qdata0   .req q8
+qdata1   .req q9
+qdata2   .req q10
+qdata3   .req q11
+
+qtwiddle .req q0
+qmodulus .req q1
+
+data0    .req v8
+data1    .req v9
+data2    .req v10
+data3    .req v11
+
+twiddle  .req v0
+modulus  .req v1
+
+tmp      .req v12
+
+data_ptr      .req x0
+twiddle_ptr   .req x1
+modulus_ptr   .req x2
+
+.macro barmul out, in, twiddle, modulus
+    mul      \out.8h,   \in.8h, \twiddle.h[0]
+    sqrdmulh \in.8h,    \in.8h, \twiddle.h[1]
+    mls      \out.8h,   \in.8h, \modulus.h[0]
+.endm
+
+.macro butterfly data0, data1, tmp, twiddle, modulus
+    barmul \tmp, \data1, \twiddle, \modulus
+    sub    \data1.8h, \data0.8h, \tmp.8h
+    add    \data0.8h, \data0.8h, \tmp.8h
+.endm
+
+count .req x2
+ldr qtwiddle, [twiddle_ptr, #0]
+ldr qmodulus, [modulus_ptr, #0]
+mov count, #16
+                                              // Instructions:    8
+                                              // Expected cycles: 11
+                                              // Expected IPC:    0.73
+                                              // Static bound:    7
+                                              //
+                                              // Wall time:     0.02s
+                                              // User time:     0.02s
+                                              //
+                                              // ----- original position ----->
+                                              // 0                        25
+                                              // |------------------------|----
+        ldr q2, [x0, #48]                     // .*............................
+        // gap                                // ..............................
+        // gap                                // ..............................
+        ldr q5, [x0, #16]                     // *.............................
+        // gap                                // ..............................
+        // gap                                // ..............................
+        ldr q10, [x0, #32]                    // ......*.......................
+        // gap                                // ..............................
+        // gap                                // ..............................
+        ldr q8, [x0, #0]                      // ....*.........................
+        // gap                                // ..............................
+        // gap                                // ..............................
+        // gap                                // ..............................
+        // gap                                // ..............................
+        sqrdmulh v3.8H, v2.8H, v0.H[1]        // ...*..........................
+        // gap                                // ..............................
+        // gap                                // ..............................
+        // gap                                // ..............................
+        mul v4.8H, v2.8H, v0.H[0]             // .......*......................
+        // gap                                // ..............................
+        // gap                                // ..............................
+        // gap                                // ..............................
+        // gap                                // ..............................
+        // gap                                // ..............................
+        // gap                                // ..............................
+        // gap                                // ..............................
+        mul v12.8H, v5.8H, v0.H[0]            // .....*........................
+        // gap                                // ..............................
+        // gap                                // ..............................
+        // gap                                // ..............................
+        sqrdmulh v2.8H, v5.8H, v0.H[1]        // ..*...........................
+        // gap                                // ..............................
+        // gap                                // ..............................
+
+                                                // -------- new position -------->
+                                                // 0                        25
+                                                // |------------------------|-----
+        // ldr q9, [x0, #16]                    // .*.............................
+        // ldr q11, [x0, #48]                   // *..............................
+        // sqrdmulh v2.8H, v9.8H, v0.H[1]       // .......*.......................
+        // sqrdmulh v3.8H, v11.8H, v0.H[1]      // ....*..........................
+        // ldr q8, [x0, #0]                     // ...*...........................
+        // mul v12.8H, v9.8H, v0.H[0]           // ......*........................
+        // ldr q10, [x0, #32]                   // ..*............................
+        // mul v4.8H, v11.8H, v0.H[0]           // .....*.........................
+
+        sub count, count, #1
+start:
+                                               // Instructions:    18
+                                               // Expected cycles: 12
+                                               // Expected IPC:    1.50
+                                               //
+                                               // Wall time:     0.02s
+                                               // User time:     0.02s
+                                               //
+                                               // ----- original position ----->
+                                               // 0                        25
+                                               // |------------------------|----
+        ldr q9, [x0, #80]                      // .e............................
+        ldr q11, [x0, #112]                    // ...e..........................
+        mls v12.8H, v2.8H, v1.H[0]             // ......*.......................
+        // gap                                 // ..............................
+        // gap                                 // ..............................
+        // gap                                 // ..............................
+        mls v4.8H, v3.8H, v1.H[0]              // ...........*..................
+        // gap                                 // ..............................
+        // gap                                 // ..............................
+        // gap                                 // ..............................
+        // gap                                 // ..............................
+        // gap                                 // ..............................
+        sqrdmulh v2.8H, v9.8H, v0.H[1]         // .....e........................
+        // gap                                 // ..............................
+        // gap                                 // ..............................
+        sub v5.8H, v8.8H, v12.8H               // .......*......................
+        // gap                                 // ..............................
+        // gap                                 // ..............................
+        sqrdmulh v3.8H, v11.8H, v0.H[1]        // ..........e...................
+        add v6.8H, v8.8H, v12.8H               // ........*.....................
+        ldr q8, [x0, #64]                      // e.............................
+        sub v7.8H, v10.8H, v4.8H               // ............*.................
+        // gap                                 // ..............................
+        // gap                                 // ..............................
+        mul v12.8H, v9.8H, v0.H[0]             // ....e.........................
+        add v9.8H, v10.8H, v4.8H               // .............*................
+        ldr q10, [x0, #96]                     // ..e...........................
+        str q6, [x0], #4*16                    // ..............*...............
+        str q5, [x0, #-48]                     // ...............*..............
+        // gap                                 // ..............................
+        mul v4.8H, v11.8H, v0.H[0]             // .........e....................
+        str q7, [x0, #-16]                     // .................*............
+        // gap                                 // ..............................
+        str q9, [x0, #-32]                     // ................*.............
+        // gap                                 // ..............................
+        // gap                                 // ..............................
+
+                                                    // ---------- new position ----------->
+                                                    // 0                        25
+                                                    // |------------------------|----------
+        // ldr q8, [x0, #0*16]                      // ........e.........'.......~.........
+        // ldr q9, [x0, #1*16]                      // e.................~.................
+        // ldr q10, [x0, #2*16]                     // ............e.....'...........~.....
+        // ldr q11, [x0, #3*16]                     // .e................'~................
+        // mul      v12.8h,   v9.8h, v0.h[0]        // ..........e.......'.........~.......
+        // sqrdmulh v9.8h,    v9.8h, v0.h[1]        // ....e.............'...~.............
+        // mls      v12.8h,   v9.8h, v1.h[0]        // ..~...............'.*...............
+        // sub    v9.8h, v8.8h, v12.8h              // .....~............'....*............
+        // add    v8.8h, v8.8h, v12.8h              // .......~..........'......*..........
+        // mul      v12.8h,   v11.8h, v0.h[0]       // ...............e..'..............~..
+        // sqrdmulh v11.8h,    v11.8h, v0.h[1]      // ......e...........'.....~...........
+        // mls      v12.8h,   v11.8h, v1.h[0]       // ...~..............'..*..............
+        // sub    v11.8h, v10.8h, v12.8h            // .........~........'........*........
+        // add    v10.8h, v10.8h, v12.8h            // ...........~......'..........*......
+        // str q8, [x0], #4*16                      // .............~....'............*....
+        // str q9, [x0, #-3*16]                     // ..............~...'.............*...
+        // str q10, [x0, #-2*16]                    // .................~'................*
+        // str q11, [x0, #-1*16]                    // ................~.'...............*.
+
+        sub count, count, #1
+        cbnz count, start
+                                          // Instructions:    10
+                                          // Expected cycles: 11
+                                          // Expected IPC:    0.91
+                                          // Static bound:    9
+                                          //
+                                          // Wall time:     0.11s
+                                          // User time:     0.11s
+                                          //
+                                          // ----- original position ----->
+                                          // 0                        25
+                                          // |------------------------|----
+        mls v4.8H, v3.8H, v1.H[0]         // .*............................
+        // gap                            // ..............................
+        // gap                            // ..............................
+        // gap                            // ..............................
+        // gap                            // ..............................
+        // gap                            // ..............................
+        // gap                            // ..............................
+        // gap                            // ..............................
+        mls v12.8H, v2.8H, v1.H[0]        // *.............................
+        // gap                            // ..............................
+        // gap                            // ..............................
+        // gap                            // ..............................
+        // gap                            // ..............................
+        // gap                            // ..............................
+        // gap                            // ..............................
+        add v2.8H, v10.8H, v4.8H          // .....*........................
+        sub v3.8H, v10.8H, v4.8H          // ....*.........................
+        // gap                            // ..............................
+        // gap                            // ..............................
+        // gap                            // ..............................
+        // gap                            // ..............................
+        add v4.8H, v8.8H, v12.8H          // ...*..........................
+        sub v8.8H, v8.8H, v12.8H          // ..*...........................
+        // gap                            // ..............................
+        str q2, [x0, #32]                 // .........*....................
+        str q3, [x0, #48]                 // ........*.....................
+        // gap                            // ..............................
+        // gap                            // ..............................
+        // gap                            // ..............................
+        // gap                            // ..............................
+        str q8, [x0, #16]                 // .......*......................
+        str q4, [x0], #4*16               // ......*.......................
+        // gap                            // ..............................
+
+                                           // -------- new position -------->
+                                           // 0                        25
+                                           // |------------------------|-----
+        // mls v12.8H, v2.8H, v1.H[0]      // .*.............................
+        // mls v4.8H, v3.8H, v1.H[0]       // *..............................
+        // sub v5.8H, v8.8H, v12.8H        // .....*.........................
+        // add v6.8H, v8.8H, v12.8H        // ....*..........................
+        // sub v7.8H, v10.8H, v4.8H        // ...*...........................
+        // add v9.8H, v10.8H, v4.8H        // ..*............................
+        // str q6, [x0], #4*16             // .........*.....................
+        // str q5, [x0, #-48]              // ........*......................
+        // str q7, [x0, #-16]              // .......*.......................
+        // str q9, [x0, #-32]              // ......*........................
@@ -0,0 +1,20 @@
+        ldr q2, [x0, #16]                       // *.............................
+        ldr q13, [x1, #0]                       // .*............................
+        ldr q11, [x0, #48]                      // ..*...........................
+        sqrdmulh v3.8H, v2.8H, v13.H[1]         // ...*..........................
+        mul v14.8H, v2.8H, v13.H[0]             // ....*.........................
+        ldr q10, [x2, #0]                       // .....*........................
+        ldr q2, [x0]                            // .........*....................
+        mul v31.8H, v11.8H, v13.H[0]            // .......*......................
+        mls v14.8H, v3.8H, v10.H[0]             // ........*.....................
+        sqrdmulh v8.8H, v11.8H, v13.H[1]        // ......*.......................
+        ldr q11, [x0, #32]                      // ..........*...................
+        add v3.8H, v2.8H, v14.8H                // ...........*..................
+        mls v31.8H, v8.8H, v10.H[0]             // ............*.................
+        sub v2.8H, v2.8H, v14.8H                // .............*................
+        str q3, [x0], #4*16                     // ..............*...............
+        sub v3.8H, v31.8H, v11.8H               // ...............*..............
+        str q2, [x0, #-48]                      // ................*.............
+        add v2.8H, v11.8H, v31.8H               // .................*............
+        str q3, [x0, #-16]                      // ..................*...........
+        str q2, [x0, #-32]                      // ...................*..........
\ No newline at end of file
@@ -0,0 +1,56 @@
+.p2align 2
+start:
+                                         // Instructions:    16
+                                         // Expected cycles: 22
+                                         // Expected IPC:    0.73
+                                         //
+                                         // Wall time:     0.00s
+                                         // User time:     0.00s
+                                         //
+                                         // ----- original position ----->
+                                         // 0                        25
+                                         // |------------------------|----
+        vldrw.u32 q0, [r0]               // *.............................
+        // gap                           // ..............................
+        vldrw.u32 q1, [r0, #16]          // .*............................
+        // gap                           // ..............................
+        vldrw.u32 q2, [r0, #32]          // ..*...........................
+        // gap                           // ..............................
+        vldrw.u32 q7, [r1] , #16         // ...*..........................
+        vmulh.u32 q0, q0, q7             // ....*.........................
+        // gap                           // ..............................
+        vmulh.u32 q1, q1, q7             // .....*........................
+        vadd.u32 q0, q0, q0              // .......*......................
+        vmulh.u32 q2, q2, q7             // ......*.......................
+        vadd.u32 q1, q1, q1              // .........*....................
+        // gap                           // ..............................
+        vadd.u32 q2, q2, q2              // ...........*..................
+        // gap                           // ..............................
+        vadd.u32 q0, q0, q7              // ........*.....................
+        vstrw.u32 q0, [r0] , #48         // ...............*..............
+        vadd.u32 q1, q1, q7              // ..........*...................
+        vstrw.u32 q1, [r0, #-32]         // .............*................
+        vadd.u32 q2, q2, q7              // ............*.................
+        vstrw.u32 q2, [r0, #-16]         // ..............*...............
+
+                                          // -------- new position -------->
+                                          // 0                        25
+                                          // |------------------------|-----
+        // vldrw.u32  q0, [inA]           // *..............................
+        // vldrw.u32  q1, [inA, #16]      // .*.............................
+        // vldrw.u32  q2, [inA, #32]      // ..*............................
+        // vldrw.u32  q7, [inB], #16      // ...*...........................
+        // vmulh.u32  q0, q0, q7          // ....*..........................
+        // vmulh.u32  q1, q1, q7          // .....*.........................
+        // vmulh.u32  q2, q2, q7          // .......*.......................
+        // vadd.u32   q0, q0, q0          // ......*........................
+        // vadd.u32   q0, q0, q7          // ..........*....................
+        // vadd.u32   q1, q1, q1          // ........*......................
+        // vadd.u32   q1, q1, q7          // ............*..................
+        // vadd.u32   q2, q2, q2          // .........*.....................
+        // vadd.u32   q2, q2, q7          // ..............*................
+        // vstrw.u32  q1, [inA, #16]      // .............*.................
+        // vstrw.u32  q2, [inA, #32]      // ...............*...............
+        // vstrw.u32  q0, [inA], #48      // ...........*...................
+
+        le lr, start
\ No newline at end of file
@@ -0,0 +1,117 @@
+                                        // Instructions:    11
+                                        // Expected cycles: 13
+                                        // Expected IPC:    0.85
+                                        // Static bound:    11
+                                        //
+                                        // Wall time:     0.08s
+                                        // User time:     0.08s
+                                        //
+                                        // ----- original position ----->
+                                        // 0                        25
+                                        // |------------------------|----
+        vldrw.u32 q7, [r1] , #16        // ...*..........................
+        // gap                          // ..............................
+        vldrw.u32 q1, [r0, #32]         // ..*...........................
+        vmulh.u32 q0, q1, q7            // .......*......................
+        vldrw.u32 q1, [r0]              // *.............................
+        vadd.u32 q2, q0, q0             // .........*....................
+        vmulh.u32 q0, q1, q7            // ....*.........................
+        vldrw.u32 q3, [r0, #16]         // .*............................
+        vadd.u32 q1, q0, q0             // ......*.......................
+        vmulh.u32 q0, q3, q7            // .....*........................
+        vadd.u32 q3, q1, q7             // ..........*...................
+        // gap                          // ..............................
+        vadd.u32 q1, q0, q0             // ........*.....................
+
+                                         // -------- new position -------->
+                                         // 0                        25
+                                         // |------------------------|-----
+        // vldrw.u32 q0, [r0]            // ...*...........................
+        // vldrw.u32 q1, [r0, #16]       // ......*........................
+        // vldrw.u32 q2, [r0, #32]       // .*.............................
+        // vldrw.u32 q7, [r1] , #16      // *..............................
+        // vmulh.u32 q0, q0, q7          // .....*.........................
+        // vmulh.u32 q1, q1, q7          // ........*......................
+        // vadd.u32 q0, q0, q0           // .......*.......................
+        // vmulh.u32 q2, q2, q7          // ..*............................
+        // vadd.u32 q1, q1, q1           // ..........*....................
+        // vadd.u32 q2, q2, q2           // ....*..........................
+        // vadd.u32 q3, q0, q7           // .........*.....................
+
+        sub lr, lr, #1
+.p2align 2
+start:
+                                        // Instructions:    16
+                                        // Expected cycles: 17
+                                        // Expected IPC:    0.94
+                                        //
+                                        // Wall time:     0.02s
+                                        // User time:     0.02s
+                                        //
+                                        // ----- original position ----->
+                                        // 0                        25
+                                        // |------------------------|----
+        vldrw.u32 q0, [r0, #48]         // e.............................
+        vadd.u32 q4, q1, q7             // ..........*...................
+        vldrw.u32 q1, [r0, #64]         // .e............................
+        vadd.u32 q5, q2, q7             // ............*.................
+        vldrw.u32 q2, [r0, #80]         // ..e...........................
+        // gap                          // ..............................
+        vldrw.u32 q7, [r1] , #16        // ...e..........................
+        vmulh.u32 q0, q0, q7            // ....e.........................
+        vstrw.u32 q4, [r0, #16]         // .............*................
+        vmulh.u32 q1, q1, q7            // .....e........................
+        vadd.u32 q0, q0, q0             // .......e......................
+        vmulh.u32 q2, q2, q7            // ......e.......................
+        vadd.u32 q1, q1, q1             // .........e....................
+        vstrw.u32 q5, [r0, #32]         // ..............*...............
+        vadd.u32 q2, q2, q2             // ...........e..................
+        vstrw.u32 q3, [r0] , #48        // ...............*..............
+        vadd.u32 q3, q0, q7             // ........e.....................
+
+                                          // -------- new position -------->
+                                          // 0                        25
+                                          // |------------------------|-----
+        // vldrw.u32  q0, [inA]           // e...............~..............
+        // vldrw.u32  q1, [inA, #16]      // ..e.............'.~............
+        // vldrw.u32  q2, [inA, #32]      // ....e...........'...~..........
+        // vldrw.u32  q7, [inB], #16      // .....e..........'....~.........
+        // vmulh.u32  q0, q0, q7          // ......e.........'.....~........
+        // vmulh.u32  q1, q1, q7          // ........e.......'.......~......
+        // vmulh.u32  q2, q2, q7          // ..........e.....'.........~....
+        // vadd.u32   q0, q0, q0          // .........e......'........~.....
+        // vadd.u32   q0, q0, q7          // ...............e'..............
+        // vadd.u32   q1, q1, q1          // ...........e....'..........~...
+        // vadd.u32   q1, q1, q7          // .~..............'*.............
+        // vadd.u32   q2, q2, q2          // .............e..'............~.
+        // vadd.u32   q2, q2, q7          // ...~............'..*...........
+        // vstrw.u32  q1, [inA, #16]      // .......~........'......*.......
+        // vstrw.u32  q2, [inA, #32]      // ............~...'...........*..
+        // vstrw.u32  q0, [inA], #48      // ..............~.'.............*
+
+        le lr, start
+                                         // Instructions:    5
+                                         // Expected cycles: 5
+                                         // Expected IPC:    1.00
+                                         // Static bound:    5
+                                         //
+                                         // Wall time:     0.01s
+                                         // User time:     0.01s
+                                         //
+                                         // ----- original position ----->
+                                         // 0                        25
+                                         // |------------------------|----
+        vstrw.u32 q3, [r0] , #48         // ....*.........................
+        vadd.u32 q2, q2, q7              // .*............................
+        vstrw.u32 q2, [r0, #-16]         // ...*..........................
+        vadd.u32 q1, q1, q7              // *.............................
+        vstrw.u32 q1, [r0, #-32]         // ..*...........................
+
+                                         // -------- new position -------->
+                                         // 0                        25
+                                         // |------------------------|-----
+        // vadd.u32 q4, q1, q7           // ...*...........................
+        // vadd.u32 q5, q2, q7           // .*.............................
+        // vstrw.u32 q4, [r0, #16]       // ....*..........................
+        // vstrw.u32 q5, [r0, #32]       // ..*............................
+        // vstrw.u32 q3, [r0] , #48      // *..............................
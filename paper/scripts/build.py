@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+#
+# Copyright (c) 2024 Hanno Becker
+# SPDX-License-Identifier: MIT
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Author: Hanno Becker <hannobecker@posteo.de>
+#
+
+"""Incremental build driver for the optimizations from the SLOTHY paper
+
+The optimizations are described declaratively in a JSON manifest (by default,
+manifest.json next to this script) holding a list of jobs. Paths in the manifest
+are relative to the directory of the manifest. There are two kinds of jobs:
+
+- SLOTHY jobs, with entries name, arch, target, input and output, as well as
+  any of loop, start, end, rename_function and config, which have the same
+  meaning as the corresponding slothy-cli arguments; see slothy.core.server.load_job().
+  Instead of a single optimization, a job can also specify a list of steps, each
+  holding the optimization-specific entries, which are applied one after another.
+
+- Command jobs, with entries name, command, inputs and outputs. The command is
+  run from the directory of the manifest and is expected to produce the outputs.
+
+For every output, the driver records a fingerprint of the job description, the
+contents of its inputs, and the SLOTHY sources. Only jobs whose outputs are missing
+or whose fingerprint changed are rebuilt. A job consuming the output of another
+job is run after it, and independent jobs are run in parallel.
+"""
+
+import argparse, fnmatch, hashlib, json, logging, os, subprocess, sys, time
+
+_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..")
+sys.path.insert(0, _ROOT)
+
+# pylint:disable=wrong-import-position
+from slothy.core.cache import slothy_fingerprint
+from slothy.core.server import load_job, run_job
+from slothy.helper import ForkedTask
+
+class BuildException(Exception):
+    """An exception raised when the manifest is invalid or a job fails"""
+
+class Job:
+    """A single job from the build manifest"""
+
+    _step_keys = [ "loop", "start", "end", "rename_function", "config" ]
+
+    def __init__(self, spec, root):
+        if "name" not in spec:
+            raise BuildException(f"Job without name: {spec}")
+        self.name = spec["name"]
+        self.spec = spec
+        self.root = root
+        if "command" in spec:
+            self.inputs  = spec.get("inputs", [])
+            self.outputs = spec.get("outputs", [])
+        else:
+            for k in [ "arch", "target", "input", "output" ]:
+                if k not in spec:
+                    raise BuildException(f"Job {self.name} lacks entry {k}")
+            self.inputs  = [ spec["input"] ]
+            self.outputs = [ spec["output"] ]
+        if len(self.outputs) == 0:
+            raise BuildException(f"Job {self.name} has no outputs")
+        self.deps = []
+
+    def path(self, f):
+        """Resolve a path relative to the manifest directory"""
+        return os.path.normpath(os.path.join(self.root, f))
+
+    def steps(self):
+        """The list of SLOTHY jobs to be run one after another,
+        without source code, see slothy.core.server.load_job()"""
+        steps = self.spec.get("steps", [ self.spec ])
+        return [ { "arch" : self.spec["arch"], "target" : self.spec["target"],
+                   **{ k : s[k] for k in Job._step_keys if k in s } } for s in steps ]
+
+    def fingerprint(self):
+        """Hash of the job description, the contents of its inputs,
+        and the SLOTHY sources"""
+        h = hashlib.sha256()
+        desc = { k : v for k,v in self.spec.items() if k != "name" }
+        h.update(json.dumps(desc, sort_keys=True).encode())
+        for f in self.inputs:
+            h.update(f.encode())
+            with open(self.path(f), "rb") as fh:
+                h.update(fh.read())
+        h.update(slothy_fingerprint().encode())
+        return h.hexdigest()
+
+    def is_up_to_date(self, state, fingerprint):
+        """Check if all outputs exist and have been built with the given fingerprint"""
+        return all(os.path.exists(self.path(o)) and state.get(o, None) == fingerprint
+                   for o in self.outputs)
+
+    def run(self, logfile, threads=None, verbose=False):
+        """Run the job. This is meant to be called in a forked worker process."""
+        if "command" in self.spec:
+            self._run_command(logfile)
+        else:
+            self._run_slothy(logfile, threads, verbose)
+
+    def _run_command(self, logfile):
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None,
+            [ os.path.abspath(_ROOT), env.get("PYTHONPATH", None) ]))
+        with open(logfile, "w", encoding="utf8") as log:
+            res = subprocess.run(self.spec["command"], cwd=self.root, env=env,
+                                 stdout=log, stderr=subprocess.STDOUT, check=False)
+        if res.returncode != 0:
+            raise BuildException(f"Command {self.spec['command']} failed with "
+                                 f"exit code {res.returncode}, see {logfile}")
+
+    def _run_slothy(self, logfile, threads, verbose):
+        root_logger = logging.getLogger()
+        for h in list(root_logger.handlers):
+            root_logger.removeHandler(h)
+        h_log = logging.FileHandler(logfile, mode="w")
+        h_log.setLevel(logging.DEBUG)
+        root_logger.addHandler(h_log)
+        if verbose:
+            h_out = logging.StreamHandler(sys.stdout)
+            h_out.setFormatter(logging.Formatter(f"[{self.name}] %(name)s: %(message)s"))
+            root_logger.addHandler(h_out)
+        root_logger.setLevel(logging.INFO)
+        logger = logging.getLogger(self.name.replace(".", "_"))
+
+        with open(self.path(self.inputs[0]), "r", encoding="utf8") as f:
+            source = f.read()
+        for step in self.steps():
+            step["source"] = source
+            if threads is not None:
+                step["config"] = step.get("config", []) + [ f"thread_budget={threads}" ]
+            slothy = load_job(step, logger)
+            source = run_job(slothy, step)
+
+        out = self.path(self.outputs[0])
+        os.makedirs(os.path.dirname(out), exist_ok=True)
+        with open(out, "w", encoding="utf8") as f:
+            f.write(source)
+
+class Build:
+    """Incremental build of the jobs from a manifest"""
+
+    def __init__(self, manifest, logger):
+        self.logger = logger
+        self.root = os.path.dirname(os.path.abspath(manifest))
+        with open(manifest, "r", encoding="utf8") as f:
+            specs = json.load(f)["jobs"]
+        self.jobs = [ Job(s, self.root) for s in specs ]
+        self.state_file = os.path.join(self.root, ".build_state.json")
+        self.state = {}
+        if os.path.exists(self.state_file):
+            with open(self.state_file, "r", encoding="utf8") as f:
+                self.state = json.load(f)
+        self._resolve_dependencies()
+
+    def _resolve_dependencies(self):
+        names = set()
+        producers = {}
+        for j in self.jobs:
+            if j.name in names:
+                raise BuildException(f"Duplicate job name {j.name}")
+            names.add(j.name)
+            for o in j.outputs:
+                o = j.path(o)
+                if o in producers:
+                    raise BuildException(f"Output {o} is produced by both "
+                                         f"{producers[o].name} and {j.name}")
+                producers[o] = j
+        for j in self.jobs:
+            for i in j.inputs:
+                p = producers.get(j.path(i), None)
+                if p is j:
+                    raise BuildException(f"Job {j.name} consumes its own output {i}. "
+                                         "Use a list of steps instead.")
+                if p is not None:
+                    j.deps.append(p)
+                elif not os.path.exists(j.path(i)):
+                    raise BuildException(f"Input {i} of job {j.name} does not exist "
+                                         "and is not produced by any job")
+        # Check for cycles
+        visited, active = set(), set()
+        def visit(j):
+            if j.name in active:
+                raise BuildException(f"Cyclic dependency involving job {j.name}")
+            if j.name in visited:
+                return
+            active.add(j.name)
+            for d in j.deps:
+                visit(d)
+            active.remove(j.name)
+            visited.add(j.name)
+        for j in self.jobs:
+            visit(j)
+
+    def select(self, patterns):
+        """Return the jobs matching any of the given patterns, together with the
+        jobs they depend on, in manifest order. A pattern matches a job if it matches
+        the job's name, or the group of jobs before the first '/', as a glob."""
+        if len(patterns) == 0:
+            return list(self.jobs)
+        def matches(j):
+            return any(fnmatch.fnmatch(j.name, p) or fnmatch.fnmatch(j.name, p + "/*")
+                       for p in patterns)
+        selected = set()
+        def add(j):
+            if j.name in selected:
+                return
+            selected.add(j.name)
+            for d in j.deps:
+                add(d)
+        for j in filter(matches, self.jobs):
+            add(j)
+        if len(selected) == 0:
+            raise BuildException(f"No jobs matching {patterns}")
+        return [ j for j in self.jobs if j.name in selected ]
+
+    def _save_state(self):
+        tmp = self.state_file + ".tmp"
+        with open(tmp, "w", encoding="utf8") as f:
+            json.dump(self.state, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.state_file)
+
+    def dry_run(self, jobs, force=False):
+        """Report which of the given jobs would be rebuilt"""
+        stale = set()
+        for j in jobs:
+            if force or any(d.name in stale for d in j.deps) or \
+               not j.is_up_to_date(self.state, j.fingerprint()):
+                stale.add(j.name)
+                self.logger.info("Would build %s", j.name)
+            else:
+                self.logger.info("Up to date: %s", j.name)
+        return stale
+
+    def run(self, jobs, workers=1, force=False, threads=None, logdir="logs",
+            verbose=False):
+        """Build the given jobs, running up to `workers` of them in parallel.
+
+        Jobs whose dependencies fail are skipped, but independent jobs are still built.
+        Returns the list of names of failed or skipped jobs."""
+        logdir = os.path.join(self.root, logdir)
+        os.makedirs(logdir, exist_ok=True)
+        threads_per_job = None
+        if threads is not None:
+            threads_per_job = max(1, threads // workers)
+
+        pending = list(jobs)
+        status = {}
+        running = {}
+        while len(pending) > 0 or len(running) > 0:
+            for j in list(pending):
+                if len(running) >= workers:
+                    break
+                dep_status = [ status.get(d.name, None) for d in j.deps ]
+                if None in dep_status:
+                    continue
+                pending.remove(j)
+                if any(s in [ "failed", "skipped" ] for s in dep_status):
+                    self.logger.error("Skipping %s: Dependency failed", j.name)
+                    status[j.name] = "skipped"
+                    continue
+                fingerprint = j.fingerprint()
+                if not force and j.is_up_to_date(self.state, fingerprint):
+                    self.logger.info("Up to date: %s", j.name)
+                    status[j.name] = "up to date"
+                    continue
+                logfile = os.path.join(logdir, j.name.replace("/", "_") + ".log")
+                self.logger.info("Building %s (log: %s) ...", j.name,
+                                 os.path.relpath(logfile))
+                task = ForkedTask(j.run, logfile, threads=threads_per_job, verbose=verbose)
+                running[task] = (j, fingerprint, time.time())
+
+            if len(running) == 0:
+                continue
+            for task in ForkedTask.wait(list(running.keys())):
+                j, fingerprint, start = running.pop(task)
+                try:
+                    task.result()
+                except Exception as e: # pylint:disable=broad-exception-caught
+                    self.logger.error("FAILED: %s: %s", j.name, e)
+                    status[j.name] = "failed"
+                    continue
+                for o in j.outputs:
+                    self.state[o] = fingerprint
+                self._save_state()
+                status[j.name] = "built"
+                self.logger.info("Built %s in %.1fs", j.name, time.time() - start)
+
+        return [ n for n, s in status.items() if s in [ "failed", "skipped" ] ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("jobs", nargs="*", metavar="JOB",
+        help="""Names or groups of jobs to build, as globs. Dependencies of the
+                selected jobs are built as well. By default, all jobs are built.""")
+    parser.add_argument("-m", "--manifest", type=str,
+        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "manifest.json"),
+        help="The build manifest")
+    parser.add_argument("-j", "--parallel", type=int, default=1,
+        help="The maximum number of jobs to run concurrently")
+    parser.add_argument("--threads", type=int, default=None,
+        help="""The maximum total number of threads to use, split evenly between
+                concurrent jobs (Config.thread_budget). Only applies to SLOTHY jobs.""")
+    parser.add_argument("-f", "--force", default=False, action="store_true",
+        help="Rebuild the selected jobs even if they are up to date")
+    parser.add_argument("-n", "--dry-run", default=False, action="store_true",
+        help="Only report which jobs would be rebuilt")
+    parser.add_argument("--list", default=False, action="store_true",
+        help="List the jobs in the manifest and exit")
+    parser.add_argument("--logdir", type=str, default="logs",
+        help="Directory for the logs of the individual jobs, relative to the manifest")
+    parser.add_argument("-v", "--verbose", default=False, action="store_true",
+        help="Also print the log output of SLOTHY jobs")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    logger = logging.getLogger("build")
+
+    try:
+        build = Build(args.manifest, logger)
+        if args.list:
+            for j in build.jobs:
+                print(j.name)
+            return 0
+        jobs = build.select(args.jobs)
+        if args.dry_run:
+            build.dry_run(jobs, force=args.force)
+            return 0
+        if not ForkedTask.supported():
+            raise BuildException("Builds are not supported on this platform")
+        failed = build.run(jobs, workers=max(1, args.parallel), force=args.force,
+                           threads=args.threads, logdir=args.logdir,
+                           verbose=args.verbose)
+    except BuildException as e:
+        logger.error("ERROR: %s", e)
+        return 1
+
+    if len(failed) > 0:
+        logger.error("%d job(s) failed or skipped: %s", len(failed), ", ".join(failed))
+        return 1
+    logger.info("All done!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
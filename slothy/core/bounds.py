@@ -0,0 +1,232 @@
+#
+# Copyright (c) 2024 Arm Limited
+# Copyright (c) 2024 Hanno Becker
+# SPDX-License-Identifier: MIT
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Author: Hanno Becker <hannobecker@posteo.de>
+#
+
+"""
+Static lower bounds for one-shot SLOTHY optimizations
+
+The bounds are derived from the data flow graph and the microarchitecture model
+without invoking the solver, and can be used to skip stall budgets for which
+an optimization is known to be infeasible.
+
+All bounds are in cycles per iteration, and are lower bounds for the value
+of Result.cycles of any optimization of the same source code.
+"""
+
+import math
+
+from slothy.core.dataflow import DataFlowGraph as DFG
+from slothy.core.dataflow import Config as DFGConfig
+
+class StaticBounds:
+    """Static lower bounds on the number of cycles of a piece of code
+
+    The following bounds are computed:
+
+    - Issue bound: Every instruction occupies an issue slot.
+    - Resource bound: For every set of execution units, the instructions which
+      cannot avoid those units need to fit into them, according to their inverse
+      throughput.
+    - Latency bound: The critical path through the data flow graph. This is only
+      computed if software pipelining is disabled.
+    - Recurrence bound: The minimum initiation interval imposed by dependencies
+      between consecutive loop iterations. This is only computed if software
+      pipelining is enabled.
+
+    The SLOTHY model for software pipelining does not enforce the latency of
+    all dependencies between iterations: Those crossing the loop boundary from
+    or to early or late instructions are ignored. The recurrence bound is
+    therefore only reported, but not included in StaticBounds.cycles."""
+
+    def __init__(self, source, logger, config):
+        """Compute static bounds for a piece of code
+
+        Args:
+            source: The source code to be optimized, as a list of SourceLine.
+            logger: The logger to use.
+            config: The configuration the code is to be optimized with.
+        """
+        self.config = config
+        self.logger = logger
+        self.target = config.target
+
+        dfg = DFG(source, logger.getChild("dfg"), DFGConfig(config.copy()))
+        self._dfg = dfg
+        self._nodes = dfg.nodes
+
+        self.num_instructions = len(self._nodes)
+        self.issue_bound = math.ceil(self.num_instructions / self.target.issue_rate)
+
+        self.resource_bound = None
+        self.latency_bound = None
+        self.recurrence_bound = None
+
+        if config.constraints.functional_only:
+            return
+        if config.constraints.model_functional_units:
+            self.resource_bound = self._compute_resource_bound()
+        if config.constraints.model_latencies:
+            if config.sw_pipelining.enabled:
+                self.recurrence_bound = self._compute_recurrence_bound()
+            else:
+                self.latency_bound = self._compute_latency_bound()
+
+    @property
+    def cycles(self):
+        """The best lower bound for the number of cycles per iteration"""
+        bounds = [ self.issue_bound, self.resource_bound, self.latency_bound ]
+        return max(b for b in bounds if b is not None)
+
+    @property
+    def stalls(self):
+        """The corresponding lower bound on the number of stalls, in the sense
+        of Config.constraints.stalls_allowed"""
+        return max(0, self.cycles - self.issue_bound)
+
+    def log(self, fun):
+        """Log the bounds via the provided logging function"""
+        fun(f"Static bounds for {self.num_instructions} instructions: ")
+        fun(f"- Issue bound:      {self.issue_bound}")
+        if self.resource_bound is not None:
+            fun(f"- Resource bound:   {self.resource_bound}")
+        if self.latency_bound is not None:
+            fun(f"- Latency bound:    {self.latency_bound}")
+        if self.recurrence_bound is not None:
+            fun(f"- Recurrence bound: {self.recurrence_bound} (not enforced by the model)")
+        fun(f"=> At least {self.cycles} cycles, {self.stalls} stalls")
+
+    def _get_latency(self, producer, consumer):
+        # This mirrors SlothyBase._add_constraints_latencies(). If the target
+        # model provides an alternative constraint for the latency, we can only
+        # assume that the consumer does not come before the producer.
+        latency = self.target.get_latency(producer.src.inst, producer.idx, consumer.inst)
+        if not isinstance(latency, int):
+            return 0
+        return max(0, latency)
+
+    def _get_unit_choices(self, t):
+        # This mirrors SlothyBase._add_variables_functional_units(): A single list
+        # of units is occupied at once, while otherwise exactly one unit is chosen.
+        units = self.target.get_units(t.inst)
+        if len(units) == 1:
+            if isinstance(units[0], list):
+                return [ frozenset(units[0]) ]
+            return [ frozenset(units) ]
+        choices = []
+        for unit_choices in units:
+            if not isinstance(unit_choices, list):
+                unit_choices = [unit_choices]
+            choices += [ frozenset([unit]) for unit in unit_choices ]
+        return choices
+
+    def _compute_resource_bound(self):
+        occupancy = []
+        for t in self._nodes:
+            occupancy.append((self.target.get_inverse_throughput(t.inst),
+                              self._get_unit_choices(t)))
+
+        # Candidate sets of units: Single units, all units usable by some
+        # instruction, and all units
+        candidates = set()
+        for (_, choices) in occupancy:
+            candidates.add(frozenset().union(*choices))
+            candidates.update(frozenset([u]) for c in choices for u in c)
+        candidates.add(frozenset().union(*candidates))
+
+        bound = 0
+        for units in candidates:
+            if len(units) == 0:
+                continue
+            occ = sum(cycles * min(len(c & units) for c in choices)
+                      for (cycles, choices) in occupancy)
+            # Instructions are issued no later than the last cycle, but may
+            # occupy their units for one more cycle.
+            if self.config.sw_pipelining.enabled:
+                # The model contains two iterations
+                cur = math.ceil((2 * occ - len(units)) / (2 * len(units)))
+            else:
+                cur = math.ceil(occ / len(units)) - 1
+            bound = max(bound, cur)
+        return bound
+
+    def _is_internal(self, producer):
+        return producer.src.is_not_virtual
+
+    def _compute_latency_bound(self):
+        # The nodes of the data flow graph are topologically sorted
+        earliest = {}
+        for t in self._nodes:
+            earliest[t.id] = max((earliest[p.src.id] + self._get_latency(p, t)
+                                  for p in t.src_in + t.src_in_out
+                                  if self._is_internal(p)), default=0)
+        return max(earliest.values(), default=-1) + 1
+
+    def _compute_recurrence_bound(self):
+        edges = []
+        for t in self._nodes:
+            for p in t.src_in + t.src_in_out:
+                if self._is_internal(p):
+                    edges.append((p.src.id, t.id, self._get_latency(p, t), 0))
+
+        # Dependencies on the previous iteration: Consumers of a loop input
+        # depend on the last producer of the same register in the loop body.
+        producers = {}
+        for t in self._dfg.nodes_output:
+            p = t.src_in[0]
+            if self._is_internal(p):
+                producers[t.inst.orig_reg] = p
+        for t in self._nodes:
+            for p in t.src_in + t.src_in_out:
+                if not p.src.is_virtual_input:
+                    continue
+                q = producers.get(p.src.inst.orig_reg, None)
+                if q is None:
+                    continue
+                edges.append((q.src.id, t.id, self._get_latency(q, t), 1))
+
+        if not any(d == 1 for (_, _, _, d) in edges):
+            return 0
+
+        def has_positive_cycle(ii):
+            dist = { t.id : 0 for t in self._nodes }
+            for _ in range(len(self._nodes)):
+                changed = False
+                for (src, dst, lat, d) in edges:
+                    if dist[src] + lat - ii * d > dist[dst]:
+                        dist[dst] = dist[src] + lat - ii * d
+                        changed = True
+                if not changed:
+                    return False
+            return True
+
+        # Smallest initiation interval admitting a periodic schedule
+        low, high = -1, sum(lat for (_, _, lat, _) in edges)
+        while high - low > 1:
+            mid = (low + high) // 2
+            if has_positive_cycle(mid):
+                low = mid
+            else:
+                high = mid
+        return high
@@ -0,0 +1,333 @@
+#
+# Copyright (c) 2024 Arm Limited
+# Copyright (c) 2024 Hanno Becker
+# SPDX-License-Identifier: MIT
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Author: Hanno Becker <hannobecker@posteo.de>
+#
+
+"""
+Persistent on-disk cache for one-shot SLOTHY optimizations
+
+Results of SlothyBase.optimize() are stored in a content-addressed directory,
+keyed by a hash of the reduced source code, the architecture and target models,
+and a canonical serialization of the configuration. A later optimization of the
+same problem can then replay the stored result instead of invoking the solver.
+
+Additionally, the last solution for every optimized region can be remembered,
+so that optimizations of an edited version of the region can be warm-started.
+"""
+
+import os
+import glob
+import json
+import time
+import types
+import pickle
+import hashlib
+import logging
+from functools import cache
+
+import ortools
+
+from slothy.helper import SourceLine
+
+# Bump this whenever the layout of cache entries changes
+CACHE_FORMAT_VERSION = 3
+
+# Configuration fields which do not influence the outcome of an optimization
+_IGNORED_CONFIG_FIELDS = [ "_log_dir", "_log_model", "log_dir", "log_model",
+                           "_cache_dir", "_cache_max_size", "_cache_max_age",
+                           "_profile_file", "_snapshot_callback", "_snapshot_file",
+                           "_deadline" ]
+
+@cache
+def slothy_fingerprint():
+    """Hash of the SLOTHY sources, including all architecture and
+    microarchitecture models.
+
+    Any modification of SLOTHY invalidates previously cached results."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    h = hashlib.sha256()
+    for f in sorted(glob.glob(os.path.join(root, "**", "*.py"), recursive=True)):
+        h.update(os.path.relpath(f, root).encode())
+        with open(f, "rb") as fh:
+            h.update(fh.read())
+    return h.hexdigest()
+
+class UncacheableException(Exception):
+    """An object cannot be converted into a canonical form reliably, see canonical()"""
+
+def _canonical_code(code):
+    consts = [ _canonical_code(c) if isinstance(c, types.CodeType) else canonical(c)
+               for c in code.co_consts ]
+    return { "code" : code.co_code.hex(), "consts" : consts, "names" : list(code.co_names) }
+
+def _canonical_function(f, seen):
+    # Two functions of the same name, e.g. lambdas, may behave differently, so
+    # the key comprises the code as well as default arguments and captured variables.
+    if id(f) in seen:
+        # Recursive reference, e.g. a closure capturing itself
+        return f"<function {f.__module__}.{f.__qualname__}>"
+    seen = seen | { id(f) }
+    cells = [ c.cell_contents for c in (f.__closure__ or []) ]
+    return { "function" : f"{f.__module__}.{f.__qualname__}",
+             "code"     : _canonical_code(f.__code__),
+             "defaults" : canonical(f.__defaults__, seen),
+             "kwdefaults" : canonical(f.__kwdefaults__, seen),
+             "closure"  : canonical(cells, seen) }
+
+def canonical(obj, _seen=frozenset()):
+    """Convert an object into a canonical, JSON-serializable form
+
+    This is used to hash configurations, which may contain sets, dictionaries,
+    nested configuration objects, modules and functions.
+
+    Raises UncacheableException for bound methods, whose behaviour depends on
+    the state of the object they are bound to."""
+    if isinstance(obj, types.ModuleType):
+        return f"<module {obj.__name__}>"
+    if isinstance(obj, types.FunctionType):
+        return _canonical_function(obj, _seen)
+    if isinstance(obj, types.BuiltinFunctionType):
+        return f"<function {obj.__module__}.{obj.__qualname__}>"
+    if isinstance(obj, types.MethodType):
+        raise UncacheableException(f"Cannot key bound method {obj.__qualname__}")
+    if isinstance(obj, type):
+        return f"<class {obj.__module__}.{obj.__qualname__}>"
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    if isinstance(obj, dict):
+        items = [ (repr(canonical(k, _seen)), canonical(v, _seen)) for k,v in obj.items() ]
+        return { k : v for k,v in sorted(items, key=lambda x: x[0]) }
+    if isinstance(obj, (set, frozenset)):
+        return sorted((canonical(v, _seen) for v in obj), key=repr)
+    if isinstance(obj, (list, tuple)):
+        return [ canonical(v, _seen) for v in obj ]
+    if isinstance(obj, SourceLine):
+        return obj.to_string()
+    if hasattr(obj, "__dict__"):
+        fields = { k : v for k,v in vars(obj).items()
+                   if k != "_locked" and k not in _IGNORED_CONFIG_FIELDS }
+        return { obj.__class__.__name__ : canonical(fields, _seen) }
+    return repr(obj)
+
+class ResultCache:
+    """Persistent content-addressed cache for SlothyBase optimization results
+
+    Each entry is stored as a single pickle file named after the hash of the
+    optimization problem. Entries are evicted by age and, if the total size of
+    the cache exceeds a threshold, in least-recently-used order."""
+
+    def __init__(self, cache_dir, max_size=None, max_age=None, logger=None):
+        """Create a handle to a result cache
+
+        Args:
+            cache_dir: The directory holding the cache entries.
+                It is created if it does not exist.
+            max_size: Maximum total size of the cache in bytes, or None
+                for no limit.
+            max_age: Maximum age of cache entries in seconds, or None
+                for no limit.
+            logger: The logger to use.
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.max_age = max_age
+        self.logger = logger if logger is not None else logging.getLogger("cache")
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(source, config, **kwargs):
+        """Compute the cache key for an optimization problem
+
+        Args:
+            source: The source code to be optimized, as a list of SourceLine.
+            config: The configuration used for the optimization.
+            kwargs: Any further parameters influencing the optimization,
+               such as the number of locked prefix or suffix instructions.
+
+        Returns:
+            The key, or None if the configuration cannot be keyed reliably,
+            in which case the result must not be cached.
+        """
+        source = SourceLine.reduce_source(source)
+        try:
+            config_desc = canonical(config)
+        except UncacheableException:
+            return None
+        desc = { "version" : CACHE_FORMAT_VERSION,
+                 "slothy"  : slothy_fingerprint(),
+                 "ortools" : ortools.__version__,
+                 "arch"    : config.arch.__name__,
+                 "target"  : config.target.__name__,
+                 "source"  : [ l.to_string() for l in source ],
+                 "config"  : config_desc,
+                 "args"    : canonical(kwargs) }
+        desc = json.dumps(desc, sort_keys=True, default=repr)
+        return hashlib.sha256(desc.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pickle")
+
+    def lookup(self, key):
+        """Lookup a cache entry. Returns None if there is no entry for the key."""
+        path = self._path(key)
+        if not os.path.exists(path):
+            self.logger.debug("Cache miss for %s", key)
+            return None
+        if self.max_age is not None and time.time() - os.path.getmtime(path) > self.max_age:
+            self.logger.debug("Cache entry %s expired", key)
+            self._remove(path)
+            return None
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            self.logger.warning("Ignoring corrupted cache entry %s", path)
+            self._remove(path)
+            return None
+        # Refresh the entry's timestamp for least-recently-used eviction
+        os.utime(path)
+        self.logger.debug("Cache hit for %s", key)
+        return entry
+
+    def store(self, key, entry):
+        """Store a cache entry, and evict old entries if necessary"""
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(entry, f)
+        # Atomic, so that concurrent SLOTHY runs never observe partial entries
+        os.replace(tmp, path)
+        self.logger.debug("Stored cache entry %s", key)
+        self.evict()
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def evict(self):
+        """Remove expired entries, and the least recently used ones if the cache
+        exceeds its maximum size."""
+        entries = []
+        for path in glob.glob(os.path.join(self.cache_dir, "*.pickle")):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        now = time.time()
+        if self.max_age is not None:
+            for (mtime, _, path) in entries:
+                if now - mtime > self.max_age:
+                    self._remove(path)
+            entries = [ e for e in entries if now - e[0] <= self.max_age ]
+
+        if self.max_size is None:
+            return
+
+        entries.sort()
+        total = sum(size for (_, size, _) in entries)
+        while total > self.max_size and len(entries) > 0:
+            _, size, path = entries.pop(0)
+            self.logger.debug("Evicting cache entry %s", path)
+            self._remove(path)
+            total -= size
+
+class WarmStartStore:
+    """Store for the last solution of every optimized region
+
+    A region is identified by the architecture and target models and the name
+    of the logger used for its optimization, but not by its source code, so that
+    the solution for a region can be used as a starting point for optimizing an
+    edited version of it.
+
+    Entries are kept in memory for the lifetime of the process, and additionally
+    written to a directory as JSON files if one is provided."""
+
+    # Shared across all stores, indexed by the region key
+    _entries = {}
+
+    def __init__(self, store_dir=None, logger=None):
+        """Create a handle to a warm start store
+
+        Args:
+            store_dir: The directory holding the entries, or None to only
+                remember entries in memory. It is created if it does not exist.
+            logger: The logger to use.
+        """
+        self.store_dir = store_dir
+        self.logger = logger if logger is not None else logging.getLogger("warm_start")
+        if self.store_dir is not None:
+            os.makedirs(self.store_dir, exist_ok=True)
+
+    @staticmethod
+    def key(config, region, **kwargs):
+        """Compute the key of a region
+
+        Args:
+            config: The configuration used for the optimization.
+            region: The name of the region, usually that of the logger.
+            kwargs: Any further parameters determining the shape of the solution,
+               such as whether software pipelining is used.
+        """
+        desc = { "version" : CACHE_FORMAT_VERSION,
+                 "arch"    : config.arch.__name__,
+                 "target"  : config.target.__name__,
+                 "region"  : region,
+                 "args"    : canonical(kwargs) }
+        desc = json.dumps(desc, sort_keys=True, default=repr)
+        return hashlib.sha256(desc.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.store_dir, f"{key}.json")
+
+    def lookup(self, key):
+        """Lookup the last solution for a region, or None if there is none"""
+        entry = WarmStartStore._entries.get(key, None)
+        if entry is not None or self.store_dir is None:
+            return entry
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            self.logger.warning("Ignoring corrupted warm start entry %s", self._path(key))
+            return None
+        WarmStartStore._entries[key] = entry
+        return entry
+
+    def store(self, key, entry):
+        """Remember the solution for a region, replacing any previous one"""
+        WarmStartStore._entries[key] = entry
+        if self.store_dir is None:
+            return
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+        self.logger.debug("Stored warm start entry %s", key)
@@ -33,6 +33,7 @@ SLOTHY configuration
 
 from copy import deepcopy
 import os
+import time
 
 from slothy.helper import LockAttributes, NestedPrint
 
@@ -177,6 +178,22 @@ class Config(NestedPrint, LockAttributes):
         """
         return self._variable_size
 
+    @property
+    def draft(self):
+        """Compute a quick draft schedule instead of invoking the constraint solver.
+
+        If this is set, one-shot SLOTHY optimizations use a greedy list scheduler
+        which places instructions in order of their critical path length, subject
+        to latencies, functional units, the issue rate and register availability.
+        The result is available almost instantly and passes the usual selfcheck,
+        but is generally not optimal, and target-specific constraints registered
+        via add_further_constraints() are not taken into account.
+
+        Software pipelining is not supported in draft mode.
+
+        See also Config.hints.list_schedule_hint."""
+        return self._draft
+
     @property
     def keep_tags(self):
         """Indicates whether tags in the input source should be kept or removed.
@@ -400,6 +417,227 @@ class Config(NestedPrint, LockAttributes):
         performance optimization (e.g., minimization of iteration overlapping)."""
         return self._retry_timeout
 
+    @property
+    def time_budget(self):
+        """The total wall-clock time in seconds for each call to Slothy.optimize(),
+        Slothy.optimize_loop() or Slothy.optimize_loops(), or None for no limit.
+
+        In contrast to timeout and retry_timeout, which apply to every single invocation
+        of the underlying solver, this bounds the entire optimization, including all steps
+        of the binary search for the number of stalls, all chunks of the split heuristic,
+        both phases of the halving heuristic, and the optimization of preamble and
+        postamble. At the beginning of each call, the budget is turned into a `deadline`,
+        and every step gets a share of the time remaining when it starts, so time left
+        over by earlier steps is available to later ones.
+
+        SLOTHY does not start building another constraint model if the time remaining
+        is less than it took to build the previous one, and abandons the construction of
+        a model once the deadline has passed. If the deadline is reached before the solver
+        found any solution, SLOTHY falls back to list scheduling (see `draft`), or to
+        modulo scheduling for software pipelining (see sw_pipelining.modulo_scheduling),
+        and the split heuristic keeps all remaining chunks as they are.
+
+        Note that the budget is not a hard limit: The model construction phase in
+        progress at the deadline and the fallback itself take additional time, which
+        can be in the order of seconds for large code."""
+        return self._time_budget
+
+    @property
+    def deadline(self):
+        """The point in time (as returned by time.time()) by which the current optimization
+        should finish, or None for no limit.
+
+        This is usually derived from `time_budget` at the beginning of an optimization,
+        and successively tightened for its individual steps. Setting it directly allows
+        to bound multiple optimizations at once. See also remaining_time()."""
+        return self._deadline
+
+    def remaining_time(self):
+        """The number of seconds left until the `deadline`, or None if there is none"""
+        if self.deadline is None:
+            return None
+        return max(0, self.deadline - time.time())
+
+    def start_time_budget(self):
+        """Set the `deadline` according to `time_budget`, counting from now.
+
+        An earlier existing deadline is kept."""
+        if self.time_budget is None:
+            return
+        deadline = time.time() + self.time_budget
+        if self.deadline is not None:
+            deadline = min(deadline, self.deadline)
+        self.deadline = deadline
+
+    def share_deadline(self, share):
+        """Move the `deadline` forward such that only the given share of the time
+        remaining is available, e.g. to one of multiple consecutive steps of an
+        optimization. This does nothing if there is no deadline."""
+        remaining = self.remaining_time()
+        if remaining is None:
+            return
+        self.deadline = time.time() + min(1, share) * remaining
+
+    @property
+    def solver_num_workers(self):
+        """The number of worker threads used by the underlying constraint solver,
+        or None to use the solver's default.
+
+        The solver's search is only reproducible for a fixed number of workers
+        and a fixed solver_random_seed."""
+        return self._solver_num_workers
+
+    @property
+    def solver_portfolio_size(self):
+        """The number of independent constraint solver processes to run in parallel,
+        or None to run a single solver.
+
+        In a portfolio, the i-th process uses the random seed solver_random_seed + i
+        and the parameter preset solver_portfolio_presets[i % len(solver_portfolio_presets)].
+        The first process finding a solution that is good enough according to
+        objective_precision or constraints.stalls_precision wins, and the remaining
+        processes are cancelled. If no process finds a good enough solution before
+        the timeout, the best solution found is used. The name of the winning preset
+        is recorded in Result.solver_preset.
+
+        Portfolios require the 'fork' start method for processes, and are
+        ignored on platforms where it is not available."""
+        return self._solver_portfolio_size
+
+    @property
+    def solver_portfolio_presets(self):
+        """The parameter presets used for the processes in a solver portfolio.
+
+        This is a list of pairs (name, parameters), where parameters is a dictionary
+        of CP-SAT parameters to set on top of the default ones. Enum-valued parameters
+        can be given by name, e.g. { "search_branching" : "FIXED_SEARCH" }.
+
+        See solver_portfolio_size."""
+        return self._solver_portfolio_presets
+
+    @property
+    def loops_parallel_workers(self):
+        """The number of worker processes to use in Slothy.optimize_loops(), that is,
+        the number of loops which may be optimized concurrently.
+
+        Loops are optimized concurrently only if their code does not overlap. The result
+        is the same as for sequential optimization, up to the non-determinism of the
+        solver. See also thread_budget."""
+        return self._loops_parallel_workers
+
+    @property
+    def thread_budget(self):
+        """The maximum total number of threads to be used by an optimization,
+        or None for no limit.
+
+        If set, the parallelism of the optimization is reduced to fit the budget,
+        see limit_threads(). In Slothy.optimize_loops(), the budget is shared
+        among the loops optimized concurrently."""
+        return self._thread_budget
+
+    def limit_threads(self, threads):
+        """Limit optimizations using this configuration to the given number of threads
+
+        The numbers of worker processes which an optimization may spawn, such as
+        split_heuristic_parallel_workers or solver_portfolio_size, are capped at
+        `threads`, and solver_num_workers is chosen such that the solver threads
+        of the largest group of concurrent processes fit the budget."""
+        processes = 1
+        if self.split_heuristic:
+            self.split_heuristic_parallel_workers = \
+                min(self.split_heuristic_parallel_workers, threads)
+            processes = self.split_heuristic_parallel_workers
+        self.constraints.stalls_parallel_workers = \
+            min(self.constraints.stalls_parallel_workers, threads)
+        if self.solver_portfolio_size is not None:
+            self.solver_portfolio_size = min(self.solver_portfolio_size, threads)
+        processes = max(processes, self.constraints.stalls_parallel_workers,
+                        self.solver_portfolio_size or 1)
+        num_workers = max(1, threads // processes)
+        if self.solver_num_workers is not None:
+            num_workers = min(num_workers, self.solver_num_workers)
+        self.solver_num_workers = num_workers
+
+    @property
+    def cache_dir(self):
+        """Directory of a persistent cache for optimization results, or None
+        if no cache should be used.
+
+        If set, the result of every successful one-shot SLOTHY optimization is stored
+        on disk, keyed by a hash of the (reduced) source code, the architecture and
+        target models, the SLOTHY sources, and the configuration. When the same
+        optimization problem is encountered again, the stored result is replayed
+        after passing the selfcheck, rather than invoking the solver.
+
+        Failed optimizations are only stored if the solver proved the problem
+        infeasible. Timeouts are never cached, since they depend on the time
+        given to the solver.
+
+        Functions in the configuration are keyed by their code, default arguments and
+        captured variables. If the configuration holds a bound method, whose behaviour
+        depends on the object it is bound to, the cache is not used.
+
+        See also cache_max_size and cache_max_age."""
+        return self._cache_dir
+
+    @property
+    def cache_max_size(self):
+        """The maximum total size of the result cache in bytes, or None for no limit.
+        When the cache exceeds this size, the least recently used entries are evicted.
+
+        This is only relevant if `cache_dir` is set."""
+        return self._cache_max_size
+
+    @property
+    def cache_max_age(self):
+        """The maximum age of result cache entries in seconds, or None for no limit.
+
+        This is only relevant if `cache_dir` is set."""
+        return self._cache_max_age
+
+    @property
+    def profile_file(self):
+        """File to which to append statistics about every one-shot SLOTHY optimization,
+        or None if no statistics should be recorded.
+
+        Each invocation of the underlying solver appends a single line of JSON to the file,
+        including the solver status and wall time as well as the time spent, and the
+        number of variables and constraints created, in each phase of the construction
+        of the constraint model (see Result.model_profile)."""
+        return self._profile_file
+
+    @property
+    def snapshot_callback(self):
+        """Function to be called with intermediate results of every one-shot SLOTHY
+        optimization, or None.
+
+        Normally, the result of an optimization is only available once the solver
+        has finished. If this option is set, every time the solver finds a solution
+        improving on the previous ones, it is extracted and checked as if it were the
+        final one, and passed to the callback as a Result object. This allows to
+        observe or keep the best schedule found so far, e.g. in case of a timeout.
+        Without `variable_size`, the stalls of an intermediate result are those the
+        current attempt allows, see constraints.stalls_allowed.
+
+        Intermediate results refer to the code passed to the underlying one-shot
+        optimization, e.g. a loop kernel or a single window of the split heuristic.
+        If a solver portfolio is used, the callback is invoked in the solver
+        worker processes. See also snapshot_file."""
+        return self._snapshot_callback
+
+    @property
+    def snapshot_file(self):
+        """File to which to write intermediate results of every one-shot SLOTHY
+        optimization, or None.
+
+        If set, the file is atomically replaced by the latest intermediate result
+        every time the solver finds an improved solution, see snapshot_callback.
+        It holds a pickled dictionary with the source code that was optimized
+        (`source`), the number of stalls (`stalls`), the solver wall time (`wall_time`),
+        the optimized code (`code`) and the result state (`state`), which can be
+        adopted via SlothyBase.replay()."""
+        return self._snapshot_file
+
     @property
     def do_address_fixup(self):
         """Indicates whether post-optimization address fixup should be conducted.
@@ -589,6 +827,31 @@ class Config(NestedPrint, LockAttributes):
             self.constraints.maximize_register_lifetimes or \
             (self.sw_pipelining.enabled and self.sw_pipelining.allow_post)
 
+    @property
+    def split_heuristic_parallel_workers(self):
+        """If split_heuristic is enabled, the number of worker processes to use for
+        the optimization of chunks.
+
+        If this is larger than 1, the list of chunks is partitioned into waves of
+        pairwise non-overlapping chunks (taking split_heuristic_optimize_seam into account),
+        and the chunks of each wave are optimized concurrently. Since non-overlapping
+        chunks are independent, the result is the same as for sequential optimization,
+        up to the non-determinism of the solver. If split_heuristic_abort_cycle_at_high
+        or split_heuristic_abort_cycle_at_low is set, waves are additionally restricted
+        to consecutive chunks, so that no chunk is optimized ahead of a chunk after
+        which the heuristic might abort.
+
+        Note that overlapping chunks, as created by the default split_heuristic_stepsize,
+        need to be optimized one after another; consider setting split_heuristic_stepsize
+        to 1/split_heuristic_factor to benefit from this option.
+
+        The value of this option is irrelevant if split_heuristic is False.
+        """
+        if not self.split_heuristic:
+            raise InvalidConfig("Did you forget to set config.split_heuristic=True? "\
+                            "Shouldn't read config.split_heuristic_parallel_workers otherwise.")
+        return self._split_heuristic_parallel_workers
+
     @property
     def split_heuristic_repeat(self):
         """If split_heuristic is enabled, the number of times the splitting heuristic
@@ -605,14 +868,56 @@ class Config(NestedPrint, LockAttributes):
                             "Shouldn't read config.split_heuristic_repeat otherwise.")
         return self._split_heuristic_repeat
 
+    @property
+    def split_heuristic_adaptive(self):
+        """If split_heuristic is enabled, this option determines whether the placement
+        and size of the windows should be derived from the stall map of the current code,
+        rather than sliding fixed-size windows over the code.
+
+        In adaptive mode, every round of the splitting heuristic repeatedly picks the
+        window of size len(code)/split_heuristic_factor containing the most stalls and
+        re-optimizes it. Windows without stalls are skipped. If the optimization of a
+        window fails to reduce the number of stalls, the window is set aside. Only once
+        no other window with stalls is left, the windows set aside are retried, grown
+        around their center, up to twice their original size. A round never invokes the
+        solver more often than the corresponding round of the fixed heuristic would, with
+        grown windows counting according to their size, and it ends early once no window
+        with stalls is left. The number of solver calls of every round is logged.
+
+        Adaptive mode optimizes windows sequentially; split_heuristic_parallel_workers,
+        split_heuristic_stepsize (other than for sizing the round),
+        split_heuristic_bottom_to_top and the split_heuristic_abort_cycle_at_* options
+        are ignored in this mode.
+
+        The value of this option is irrelevant if split_heuristic is False.
+        """
+        if not self.split_heuristic:
+            raise InvalidConfig("Did you forget to set config.split_heuristic=True? "\
+                            "Shouldn't read config.split_heuristic_adaptive otherwise.")
+        return self._split_heuristic_adaptive
+
+    @property
+    def reoptimize_window(self):
+        """When re-optimizing an edited version of previously optimized code, the number
+        of unchanged instructions on either side of the edited instructions which should
+        be re-optimized along with them. The same number of instructions beyond the window
+        is taken into account during optimization, but kept fixed.
+
+        See the `previous` argument of Slothy.optimize(). Larger windows give the
+        optimization more freedom to absorb the edit, at the cost of runtime; the
+        cost of re-optimization scales with the size of the edit and the window,
+        but not with the size of the code."""
+        return self._reoptimize_window
+
     def copy(self):
         """Make a deep copy of the configuration"""
-        # Temporarily unset references to Arch and Target for deepcopy
-        arch, target = self.arch, self.target
-        self.arch = self.target = None
+        # Temporarily unset references to Arch, Target and the snapshot
+        # callback for deepcopy, so that the copy refers to the same objects
+        arch, target, cb = self.arch, self.target, self.snapshot_callback
+        self.arch = self.target = self.snapshot_callback = None
         res = deepcopy(self)
-        res.arch, res.target   = arch, target
-        self.arch, self.target = arch, target
+        res.arch, res.target, res.snapshot_callback    = arch, target, cb
+        self.arch, self.target, self.snapshot_callback = arch, target, cb
         return res
 
     class SoftwarePipelining(NestedPrint, LockAttributes):
@@ -716,6 +1021,18 @@ class Config(NestedPrint, LockAttributes):
                 early instructions."""
             return self._max_pre
 
+        @property
+        def modulo_scheduling(self):
+            """Compute the software pipelined loop kernel via iterative modulo
+                scheduling instead of the constraint solver.
+
+                This considers a single copy of the loop body only and scales
+                to much larger loops, but the result is not optimal. Also,
+                `max_overlapping`, `min_overlapping` and `pre_before_post`
+                are not honored, nor are further microarchitecture-specific
+                constraints of the target. Requires `inputs_are_outputs`."""
+            return self._modulo_scheduling
+
         def __init__(self):
             super().__init__()
 
@@ -734,6 +1051,7 @@ class Config(NestedPrint, LockAttributes):
             self.halving_heuristic_periodic = False
             self.halving_heuristic_split_only = False
             self.max_pre = 1.0
+            self.modulo_scheduling = False
 
             self.lock()
 
@@ -782,6 +1100,9 @@ class Config(NestedPrint, LockAttributes):
         @max_pre.setter
         def max_pre(self,val):
             self._max_pre = val
+        @modulo_scheduling.setter
+        def modulo_scheduling(self,val):
+            self._modulo_scheduling = val
 
     class Constraints(NestedPrint, LockAttributes):
         """Subconfiguration for performance constraints"""
@@ -849,6 +1170,37 @@ class Config(NestedPrint, LockAttributes):
             the stall precision, but instead sets a different (typically smaller) timeout."""
             return self._stalls_timeout_below_precision
 
+        @property
+        def stalls_parallel_workers(self):
+            """The number of worker processes to use for the external binary search
+            for the minimum number of stalls.
+
+            If this is larger than 1, multiple stall counts are tried concurrently:
+            First, a geometric sequence of stall counts is explored until a successful
+            one is found. Then, the interval between the largest known failure and the
+            smallest known success is split among the workers. Optimizations whose
+            outcome is implied by another result are aborted early.
+
+            Note that each worker runs its own instance of the underlying solver.
+            If this option is used, ext_bsearch_remember_successes has no effect.
+
+            See also Config.variable_size."""
+            return self._stalls_parallel_workers
+
+        @property
+        def stalls_static_bounds(self):
+            """Determines whether static lower bounds should be used to skip
+            stall counts for which optimization is known to be infeasible.
+
+            If set, SLOTHY derives lower bounds on the cycle count from the
+            occupancy of the execution units, the issue rate, and the critical
+            path through the data flow graph, prior to the search for the minimum
+            number of stalls. The corresponding stall count is used in place of
+            stalls_minimum_attempt if it is larger.
+
+            The bound is reported as Result.static_cycles_bound."""
+            return self._stalls_static_bounds
+
         @property
         def model_latencies(self):
             """Determines whether instruction latencies should be modelled.
@@ -887,6 +1239,23 @@ class Config(NestedPrint, LockAttributes):
             in order to find the number of model violations in a piece of code."""
             return self._allow_renaming
 
+        @property
+        def break_register_symmetries(self):
+            """Restrict the register allocation to break symmetries between
+            interchangeable registers.
+
+            Registers of the same type which are not referred to specifically anywhere
+            in the model -- e.g. through fixed input/output registers, locked registers,
+            or argument restrictions -- can be permuted in any solution to give another
+            solution. If this option is set, only one solution from each such class is
+            admitted, by requiring that interchangeable registers are first used in a
+            fixed order.
+
+            This does not change which stall counts are feasible, but can considerably
+            speed up proving infeasibility during the search for the minimum number of
+            stalls. It is not applied if the target has its own objective."""
+            return self._break_register_symmetries
+
         @property
         def max_displacement(self):
             """The maximum relative displacement of an instruction.
@@ -930,11 +1299,14 @@ class Config(NestedPrint, LockAttributes):
             self._stalls_precision = 0
             self._stalls_timeout_below_precision = None
             self._stalls_first_attempt = 0
+            self._stalls_parallel_workers = 1
+            self._stalls_static_bounds = True
 
             self._model_latencies = True
             self._model_functional_units = True
             self._allow_reordering = True
             self._allow_renaming = True
+            self._break_register_symmetries = False
 
             self.lock()
 
@@ -959,6 +1331,12 @@ class Config(NestedPrint, LockAttributes):
         @stalls_timeout_below_precision.setter
         def stalls_timeout_below_precision(self,val):
             self._stalls_timeout_below_precision = val
+        @stalls_parallel_workers.setter
+        def stalls_parallel_workers(self,val):
+            self._stalls_parallel_workers = val
+        @stalls_static_bounds.setter
+        def stalls_static_bounds(self,val):
+            self._stalls_static_bounds = val
         @model_latencies.setter
         def model_latencies(self,val):
             self._model_latencies = val
@@ -971,6 +1349,9 @@ class Config(NestedPrint, LockAttributes):
         @allow_renaming.setter
         def allow_renaming(self,val):
             self._allow_renaming = val
+        @break_register_symmetries.setter
+        def break_register_symmetries(self,val):
+            self._break_register_symmetries = val
         @functional_only.setter
         def functional_only(self,val):
             if not val:
@@ -1007,6 +1388,69 @@ class Config(NestedPrint, LockAttributes):
             See also Config.variable_size."""
             return self._ext_bsearch_remember_successes
 
+        @property
+        def ext_bsearch_incremental(self):
+            """When using an external binary search, build the constraint model only
+            once per upper bound of stalls, and reuse it for all smaller stall counts.
+
+            Internally, the model is built with a variable number of stalls (see
+            Config.variable_size), and each attempt of the binary search only
+            tightens the bound on the number of stalls before re-solving. This saves
+            the time for parsing and model construction, and hints the solver with
+            the last successful solution.
+
+            A new model is only built when the stall count to attempt exceeds the
+            bound of the current one, that is, during the initial exponential search.
+
+            See also Config.variable_size and ext_bsearch_remember_successes."""
+            return self._ext_bsearch_incremental
+
+        @property
+        def warm_start(self):
+            """Warm-start optimizations from the last solution for the same region.
+
+            If this is set, the final solution for every optimized region is remembered,
+            keyed by the architecture and target models and the name of the logger used.
+            Intermediate solutions, such as those of the binary search for the minimum
+            number of stalls, are not remembered.
+            If the same region is optimized again after an edit of its source code, the
+            previous source is compared to the new one, and instructions which have not
+            changed are hinted to take their previous position, stage and register
+            allocation.
+
+            Solutions are remembered for the lifetime of the process and, if
+            Config.cache_dir is set, also in its `warm_start` subdirectory.
+
+            See also warm_start_window."""
+            return self._warm_start
+
+        @property
+        def warm_start_window(self):
+            """If warm_start is set, the number of instructions around an edit that
+            are freely optimized, or None if all instructions can be optimized freely.
+
+            Unchanged instructions further away from any edit than this keep their
+            previous register allocation and stage, as well as their relative order.
+            This makes small edits to large code fast to re-optimize, at the risk of
+            the edit not fitting into the remaining freedom.
+
+            If the source has not changed at all, nothing is fixed, and the previous
+            solution is only used as a hint."""
+            return self._warm_start_window
+
+        @property
+        def list_schedule_hint(self):
+            """Seed optimizations with a greedy list schedule.
+
+            If this is set, a list schedule is computed before invoking the constraint
+            solver (see Config.draft). Its positions and register allocation are passed
+            to the solver as a hint, and its number of stalls is used as the first
+            attempt of the stall search, since the optimum cannot be worse.
+
+            Software pipelining is not supported, and this option is ignored if it is
+            enabled."""
+            return self._list_schedule_hint
+
         def __init__(self):
             super().__init__()
 
@@ -1014,6 +1458,10 @@ class Config(NestedPrint, LockAttributes):
             self._order_hint_orig_order = False
             self._rename_hint_orig_rename = False
             self._ext_bsearch_remember_successes = False
+            self._ext_bsearch_incremental = False
+            self._warm_start = False
+            self._warm_start_window = None
+            self._list_schedule_hint = False
 
             self.lock()
 
@@ -1026,6 +1474,21 @@ class Config(NestedPrint, LockAttributes):
         @order_hint_orig_order.setter
         def order_hint_orig_order(self,val):
             self._order_hint_orig_order = val
+        @ext_bsearch_remember_successes.setter
+        def ext_bsearch_remember_successes(self,val):
+            self._ext_bsearch_remember_successes = val
+        @ext_bsearch_incremental.setter
+        def ext_bsearch_incremental(self,val):
+            self._ext_bsearch_incremental = val
+        @warm_start.setter
+        def warm_start(self,val):
+            self._warm_start = val
+        @warm_start_window.setter
+        def warm_start_window(self,val):
+            self._warm_start_window = val
+        @list_schedule_hint.setter
+        def list_schedule_hint(self,val):
+            self._list_schedule_hint = val
 
     def __init__(self, Arch, Target):
         super().__init__()
@@ -1038,6 +1501,7 @@ class Config(NestedPrint, LockAttributes):
         self._hints = Config.Hints()
 
         self._variable_size = False
+        self._draft = False
 
         self._register_aliases = {}
         self._outputs = set()
@@ -1063,6 +1527,9 @@ class Config(NestedPrint, LockAttributes):
         self._split_heuristic_abort_cycle_at_low = None
         self._split_heuristic_stepsize = None
         self._split_heuristic_repeat = 1
+        self._split_heuristic_parallel_workers = 1
+        self._split_heuristic_adaptive = False
+        self._reoptimize_window = 8
         self._split_heuristic_preprocess_naive_interleaving = False
         self._split_heuristic_preprocess_naive_interleaving_by_latency = False
 
@@ -1084,6 +1551,24 @@ class Config(NestedPrint, LockAttributes):
         self._max_solutions = 64
         self._timeout = None
         self._retry_timeout = None
+        self._time_budget = None
+        self._deadline = None
+        self._solver_num_workers = None
+        self._solver_portfolio_size = None
+        self._loops_parallel_workers = 1
+        self._thread_budget = None
+        self._solver_portfolio_presets = [
+            ("default",       {}),
+            ("no_lp",         { "linearization_level" : 0 }),
+            ("full_lp",       { "linearization_level" : 2 }),
+            ("quick_restart", { "search_branching" : "PORTFOLIO_WITH_QUICK_RESTART_SEARCH" }),
+            ("randomized",    { "randomize_search" : True }) ]
+        self._cache_dir = None
+        self._cache_max_size = None
+        self._cache_max_age = None
+        self._profile_file = None
+        self._snapshot_callback = None
+        self._snapshot_file = None
         self._ignore_objective = False
         self._objective_precision = 0
 
@@ -1151,6 +1636,9 @@ class Config(NestedPrint, LockAttributes):
     @variable_size.setter
     def variable_size(self,val):
         self._variable_size = val
+    @draft.setter
+    def draft(self,val):
+        self._draft = val
     @selfcheck.setter
     def selfcheck(self,val):
         self._selfcheck = val
@@ -1197,6 +1685,45 @@ class Config(NestedPrint, LockAttributes):
     @retry_timeout.setter
     def retry_timeout(self, val):
         self._retry_timeout = val
+    @time_budget.setter
+    def time_budget(self, val):
+        self._time_budget = val
+    @deadline.setter
+    def deadline(self, val):
+        self._deadline = val
+    @solver_num_workers.setter
+    def solver_num_workers(self, val):
+        self._solver_num_workers = val
+    @solver_portfolio_size.setter
+    def solver_portfolio_size(self, val):
+        self._solver_portfolio_size = val
+    @solver_portfolio_presets.setter
+    def solver_portfolio_presets(self, val):
+        self._solver_portfolio_presets = val
+    @loops_parallel_workers.setter
+    def loops_parallel_workers(self, val):
+        self._loops_parallel_workers = val
+    @thread_budget.setter
+    def thread_budget(self, val):
+        self._thread_budget = val
+    @cache_dir.setter
+    def cache_dir(self, val):
+        self._cache_dir = val
+    @cache_max_size.setter
+    def cache_max_size(self, val):
+        self._cache_max_size = val
+    @cache_max_age.setter
+    def cache_max_age(self, val):
+        self._cache_max_age = val
+    @profile_file.setter
+    def profile_file(self, val):
+        self._profile_file = val
+    @snapshot_callback.setter
+    def snapshot_callback(self, val):
+        self._snapshot_callback = val
+    @snapshot_file.setter
+    def snapshot_file(self, val):
+        self._snapshot_file = val
     @keep_tags.setter
     def keep_tags(self, val):
         self._keep_tags = val
@@ -1254,6 +1781,15 @@ class Config(NestedPrint, LockAttributes):
     @split_heuristic_preprocess_naive_interleaving_by_latency.setter
     def split_heuristic_preprocess_naive_interleaving_by_latency(self, val):
         self._split_heuristic_preprocess_naive_interleaving_by_latency = val
+    @split_heuristic_parallel_workers.setter
+    def split_heuristic_parallel_workers(self, val):
+        self._split_heuristic_parallel_workers = val
     @split_heuristic_repeat.setter
     def split_heuristic_repeat(self, val):
         self._split_heuristic_repeat = val
+    @split_heuristic_adaptive.setter
+    def split_heuristic_adaptive(self, val):
+        self._split_heuristic_adaptive = val
+    @reoptimize_window.setter
+    def reoptimize_window(self, val):
+        self._reoptimize_window = val
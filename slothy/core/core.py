@@ -25,23 +25,36 @@
 # Author: Hanno Becker <hannobecker@posteo.de>
 #
 
+import os
+import json
+import pickle
+import time
+import difflib
+from bisect import bisect_left
 import logging
 import math
+import multiprocessing
+import multiprocessing.connection
 from types import SimpleNamespace
 from copy import deepcopy
 from functools import cached_property
+from contextlib import contextmanager
 from sympy import simplify
 
+import numpy as np
 import ortools
 from ortools.sat.python import cp_model
 
 from slothy.core.config import Config
+from slothy.core.cache import ResultCache, WarmStartStore
 from slothy.helper import LockAttributes, Permutation, DeferHandler, SourceLine
 
 from slothy.core.dataflow import DataFlowGraph as DFG
 from slothy.core.dataflow import Config as DFGConfig
 from slothy.core.dataflow import InstructionOutput, InstructionInOut, ComputationNode
 from slothy.core.dataflow import SlothyUselessInstructionException
+from slothy.core.list_scheduling import ListScheduler, ListSchedulingException
+from slothy.core.modulo_scheduling import ModuloScheduler, ModuloSchedulingException
 
 class SlothyException(Exception):
     """Generic exception thrown by SLOTHY"""
@@ -242,6 +255,13 @@ class Result(LockAttributes):
         terminated prematurely, e.g. because of a timeout."""
         return self._cycles_bound
 
+    @property
+    def static_cycles_bound(self):
+        """A lower bound for the number of cycles obtained statically, prior to optimization.
+
+        See Config.constraints.stalls_static_bounds and slothy.core.bounds.StaticBounds."""
+        return self._static_cycles_bound
+
     @property
     def ipc_bound(self):
         """An uppwer bound on the instruction/cycle (IPC) count obtained during optimization.
@@ -263,6 +283,50 @@ class Result(LockAttributes):
         """Returns the amount of CPU time in seconds the optimization has taken"""
         return self._optimization_user_time
 
+    @property
+    def model_profile(self):
+        """Breakdown of the time spent on the construction of the constraint model.
+
+        This is a dictionary mapping the name of each model construction phase
+        (e.g. 'add_constraints_latencies') to a dictionary with entries 'time'
+        (wall time in seconds), 'variables' and 'constraints' (the number of
+        variables and constraints created in that phase). Interval variables
+        are counted as constraints.
+
+        This is None if the result has not been obtained by constructing a model,
+        e.g. because it was replayed from the result cache."""
+        return self._model_profile
+
+    @model_profile.setter
+    def model_profile(self, v):
+        assert self._model_profile is None
+        self._model_profile = v
+
+    @property
+    def solver_preset(self):
+        """The name of the parameter preset of the solver process which produced
+        the result, if the optimization used a solver portfolio, and None otherwise.
+
+        See Config.solver_portfolio_size."""
+        return self._solver_preset
+
+    @solver_preset.setter
+    def solver_preset(self, v):
+        assert self._solver_preset is None
+        self._solver_preset = v
+
+    @property
+    def warm_start_entry(self):
+        """The solution in the form remembered for warm-starting later optimizations
+        of the same region, or None if Config.hints.warm_start is not set.
+
+        See SlothyBase.record_warm_start()."""
+        return self._warm_start_entry
+
+    @warm_start_entry.setter
+    def warm_start_entry(self, v):
+        self._warm_start_entry = v
+
     @property
     def ipc(self):
         """The instruction/cycle (IPC) count that SLOTHY thinks the code will have."""
@@ -672,6 +736,10 @@ class Result(LockAttributes):
             res.append(SourceLine("")                                           \
                        .set_comment(f"IPC bound:       {self.ipc_bound:.2f}")   \
                        .set_length(fixlen))
+        if self.static_cycles_bound is not None:
+            res.append(SourceLine("")                                                 \
+                       .set_comment(f"Static bound:    {self.static_cycles_bound}")   \
+                       .set_length(fixlen))
         if self.optimization_wall_time is not None:
             res.append(SourceLine("")                                           \
                        .set_comment(f"")                                        \
@@ -795,8 +863,6 @@ class Result(LockAttributes):
     def _selfcheck_core(self, log):
         _, old_source, new_source, tree_old, tree_new, reordering = \
             self._get_full_code(log)
-        edges_old = tree_old.edges()
-        edges_new = tree_new.edges()
 
         # Add renaming for inputs and outputs to permutation
         for old, new in self.input_renamings.items():
@@ -807,24 +873,49 @@ class Result(LockAttributes):
         # The DFG isomorphism check is, perhaps surprisingly, very simple:
         # We take the set of labelled edges of source and destination graph, apply
         # the node permutation, and assert equality of sets.
+        #
+        # For large graphs, we do this on integer-encoded edges, and only fall back
+        # to the set of edges as triples of (src_id, dst_id, label) in case of failure,
+        # to produce a readable account of where the isomorphism failed.
+
+        ids_old, edges_old = tree_old.edges_array()
+        ids_new, edges_new = tree_new.edges_array()
+
+        index_new = { node_id : i for i, node_id in enumerate(ids_new) }
+        remap = np.array([ index_new.get(reordering.get(node_id, None), -1)
+                           for node_id in ids_old ], dtype=np.int64)
+        # Old nodes without counterpart in the new graph. Only those not being part
+        # of the remapping are an error here; the others show up as missing edges.
+        for i in np.unique(edges_old[:,:2]):
+            node_id = ids_old[i]
+            if node_id not in reordering:
+                raise SlothyException(f"ID {node_id} not in remapping {reordering.items()}")
+
+        num_nodes = max(len(ids_old), len(ids_new)) + 1
+        num_labels = max(edges_old[:,2].max(initial=0), edges_new[:,2].max(initial=0)) + 1
+        def pack(edges):
+            # Shift by one so that missing nodes (-1) get a valid code
+            src, dst, lbl = edges[:,0] + 1, edges[:,1] + 1, edges[:,2]
+            return np.unique((src * num_nodes + dst) * num_labels + lbl)
+
+        edges_old_remapped = np.column_stack((remap[edges_old[:,0]], remap[edges_old[:,1]],
+                                              edges_old[:,2]))
+
+        # DFG isomorphism as set-equality between remapped edge sets
+        if np.array_equal(pack(edges_old_remapped), pack(edges_new)):
+            log.debug("Isomophism between computation flow graphs: OK!")
+            log.info("OK!")
+            return True
 
         def apply_reordering(x):
             src,dst,lbl=x
-            if not src in reordering.keys():
-                raise SlothyException(f"Source ID {src} not in remapping {reordering.items()}")
-            if not dst in reordering:
-                raise SlothyException(f"Destination ID {dst} not in remapping {reordering.items()}")
             return (reordering[src], reordering[dst], lbl)
 
+        edges_old = tree_old.edges()
+        edges_new = tree_new.edges()
         edges_old_remapped = set(map(apply_reordering, edges_old))
         reordering_inv = { j : i for (i,j) in reordering.items() }
 
-        # DFG isomorphism as set-equality between remapped edge sets
-        if edges_old_remapped == edges_new:
-            log.debug("Isomophism between computation flow graphs: OK!")
-            log.info("OK!")
-            return True
-
         log.error("Isomophism between computation flow graphs: FAIL!")
 
         log.error("Input/Output renaming")
@@ -911,6 +1002,10 @@ class Result(LockAttributes):
         assert self._cycles_bound is None
         self._cycles_bound = v
 
+    @static_cycles_bound.setter
+    def static_cycles_bound(self, v):
+        self._static_cycles_bound = v
+
     def _build_stalls_idxs(self):
         self._stalls_idxs = { j for (i,j) in self.reordering.items() if
                               self.reordering_with_bubbles[i] + 1 not in
@@ -1208,6 +1303,18 @@ class Result(LockAttributes):
         DFG(self.postamble, log.getChild("new_postamble"), dfgc_postamble)
 
 
+    def export_state(self):
+        """Export the state of the result as a picklable dictionary.
+
+        This does not include the configuration, which is expected to be
+        provided anew when importing the state via import_state()."""
+        return { k : v for k,v in vars(self).items()
+                 if k.startswith("_") and k not in ["_config", "_locked"] }
+
+    def import_state(self, state):
+        """Import a result state previously exported via export_state()"""
+        self.__dict__.update(state)
+
     def __init__(self, config):
         super().__init__()
 
@@ -1223,6 +1330,7 @@ class Result(LockAttributes):
         self._valid = False
         self._success = None
         self._cycles_bound = None
+        self._static_cycles_bound = None
         self._stalls = None
         self._stalls_idxs = None
         self._input = None
@@ -1232,6 +1340,9 @@ class Result(LockAttributes):
         self._register_used = None
         self._optimization_wall_time = None
         self._optimization_user_time = None
+        self._model_profile = None
+        self._solver_preset = None
+        self._warm_start_entry = None
 
         self.lock()
 
@@ -1295,6 +1406,8 @@ class SlothyBase(LockAttributes):
         self._model = SimpleNamespace()
         self._result = None
         self._orig_code = None
+        self._optimize_args = None
+        self._replayed_from_cache = False
 
         self.lock() # Can't do this yet, there are still lots of temporaries being used
 
@@ -1303,6 +1416,8 @@ class SlothyBase(LockAttributes):
         self._model = SimpleNamespace()
         self._result = None
         self._orig_code = None
+        self._optimize_args = None
+        self._replayed_from_cache = False
 
     def _set_timeout(self, timeout):
         if timeout is None:
@@ -1310,14 +1425,474 @@ class SlothyBase(LockAttributes):
         self.logger.info("Setting timeout of %d seconds...", timeout)
         self._model.cp_solver.parameters.max_time_in_seconds = timeout
 
+    def _apply_deadline(self):
+        """Restrict the solver timeout to the time remaining until Config.deadline"""
+        remaining = self.config.remaining_time()
+        if remaining is None:
+            return
+        params = self._model.cp_solver.parameters
+        if remaining < params.max_time_in_seconds:
+            self.logger.debug("Limiting solver time to %.2fs until deadline", remaining)
+            params.max_time_in_seconds = remaining
+
+    def _get_cache(self):
+        if self.config.cache_dir is None:
+            return None
+        return ResultCache(self.config.cache_dir,
+                           max_size=self.config.cache_max_size,
+                           max_age=self.config.cache_max_age,
+                           logger=self.logger.getChild("cache"))
+
+    def _get_warm_start_store(self):
+        if not self.config.hints.warm_start:
+            return None
+        store_dir = None
+        if self.config.cache_dir is not None:
+            store_dir = os.path.join(self.config.cache_dir, "warm_start")
+        return WarmStartStore(store_dir, logger=self.logger.getChild("warm_start"))
+
+    def _warm_start_key(self):
+        return WarmStartStore.key(self.config, self.logger.name,
+                                  sw_pipelining=self.config.sw_pipelining.enabled)
+
+    def record_warm_start(self, result):
+        """Remember a result for warm-starting later optimizations of the region,
+        see Config.hints.warm_start.
+
+        This should only be called for the final result of a region, not for the
+        intermediate results of a search, which would otherwise be warm-started
+        from each other."""
+        store = self._get_warm_start_store()
+        if store is None or result.warm_start_entry is None:
+            return
+        store.store(self._warm_start_key(), result.warm_start_entry)
+
+    def _extract_warm_start_entry(self):
+        """Extract the current solution in the form needed for warm-starting"""
+        if not self.config.hints.warm_start:
+            return
+        get_value = self._model.cp_solver.Value
+        nodes = []
+        for t in self._get_nodes():
+            stage = None
+            if self.config.sw_pipelining.enabled:
+                stage = [ get_value(t.pre_var), get_value(t.core_var), get_value(t.post_var) ]
+            out = [ next((reg for reg, var in var_dict.items() if get_value(var)), None)
+                    for var_dict in t.alloc_out_var ]
+            nodes.append({ "pos" : get_value(t.program_start_var),
+                           "stage" : stage, "out" : out })
+        self._result.warm_start_entry = { "source" : [ l.text for l in self._orig_code ],
+                                          "nodes" : nodes }
+
+    def _replay_state(self, state, log):
+        """Adopt an exported result state in place of an optimization.
+
+        Returns True if the state passed the selfcheck, and False otherwise."""
+        result = Result(self.config)
+        result.import_state(state)
+        if result.success:
+            try:
+                passed = result.selfcheck(log.getChild("selfcheck"))
+            except SlothySelfCheckException:
+                passed = False
+            if not passed:
+                return False
+
+        self._result = result
+        self._replayed_from_cache = True
+        return True
+
+    def _check_cache_key(self, cache, key):
+        """Returns the given result cache, or None if the configuration could not be
+        keyed reliably and the cache must not be used, see ResultCache.key()"""
+        if key is None:
+            self.logger.warning("Configuration holds a bound method -- not using the result cache")
+            return None
+        return cache
+
+    def _store_in_cache(self, cache, key):
+        """Store the current result in the result cache.
+
+        Failures are only stored if the solver has proven the problem infeasible,
+        and marked as such: Timeouts depend on the time given to the solver, which
+        is not part of the cache key, and must not be replayed."""
+        state = self._result.export_state()
+        if not self.success:
+            if self._model.cp_model.status != cp_model.INFEASIBLE:
+                return
+            state["infeasible"] = True
+        cache.store(key, state)
+
+    def _replay_from_cache(self, cache, key):
+        """Attempt to replay an optimization result from the result cache.
+
+        Returns True if a cached result passing the selfcheck was found,
+        and False otherwise."""
+        state = cache.lookup(key)
+        if state is None:
+            return False
+
+        if not state.get("_success", False) and not state.pop("infeasible", False):
+            self.logger.warning("Cached failure %s is not a proof of infeasibility -- ignore", key)
+            return False
+
+        if not self._replay_state(state, self.logger.getChild("cache")):
+            self.logger.warning("Cached result %s failed the selfcheck -- ignore", key)
+            return False
+
+        self.logger.info("Replaying cached result %s", key)
+        return True
+
+    def replay(self, source, state, prefix_len=0, suffix_len=0):
+        """Adopt an optimization result computed elsewhere, e.g. in another process.
+
+        Args:
+            source: The source code that was optimized.
+            state: The result state, as returned by Result.export_state().
+            prefix_len: The number of locked prefix instructions used
+                for the optimization.
+            suffix_len: The number of locked suffix instructions used
+                for the optimization.
+
+        Returns:
+            Indicates whether the adopted result is successful. Afterwards,
+            SlothyBase.retry() can be used as if the result had been computed
+            by SlothyBase.optimize()."""
+        self._reset()
+        self._optimize_args = (source, { "prefix_len" : prefix_len, "suffix_len" : suffix_len })
+        if not self._replay_state(state, self.logger):
+            raise SlothyException("Replayed result failed the selfcheck")
+        return self.success
+
     def optimize(self, source, prefix_len=0, suffix_len=0, log_model=None, retry=False):
         self._reset()
         self._usage_check()
 
         self.config.log(self.logger.getChild("config").debug)
 
+        self._optimize_args = (source, { "prefix_len" : prefix_len, "suffix_len" : suffix_len })
+        if self.config.sw_pipelining.enabled and self.config.sw_pipelining.modulo_scheduling:
+            return self._optimize_modulo(source, prefix_len=prefix_len, suffix_len=suffix_len)
+        if self.config.draft:
+            return self._optimize_draft(source, prefix_len=prefix_len, suffix_len=suffix_len)
+
+        cache = self._get_cache()
+        if cache is not None:
+            cache_key = cache.key(source, self.config, prefix_len=prefix_len,
+                                  suffix_len=suffix_len)
+            cache = self._check_cache_key(cache, cache_key)
+        if cache is not None:
+            if self._replay_from_cache(cache, cache_key):
+                return self.success
+
+        if not self._build_model(source, prefix_len=prefix_len, suffix_len=suffix_len,
+                                 check_deadline=True):
+            # Treat like a solver timeout
+            self.logger.warning("Deadline reached while building the model -- skip solver")
+            self._new_result()
+            self.result.success = False
+            self.result.valid = True
+            return False
+
+        self._new_result()
+
+        # Do the actual work
+        self.logger.info("Invoking external constraint solver (%s) ...", self._describe_solver())
+        self.result.success = self._solve()
+        self.result.valid = True
+
+        if not retry and self.success:
+            self.logger.info("Booleans in result: %d", self._model.cp_solver.NumBooleans())
+
+        if self.success:
+            self._extract_result()
+
+        if cache is not None:
+            self._store_in_cache(cache, cache_key)
+
+        return self.success
+
+    def _list_schedule(self):
+        """Compute a greedy list schedule for the loaded source, see Config.draft.
+
+        Returns the ListScheduler holding the schedule, or None on failure."""
+        scheduler = ListScheduler(self._model.tree, self.config,
+                                  self.logger.getChild("list_scheduling"),
+                                  candidates=self._get_output_candidates,
+                                  ordering=[ (t0, t1) for (t0, t1, _)
+                                             in self._iter_locked_ordering() ])
+        try:
+            scheduler.schedule()
+        except ListSchedulingException as e:
+            self.logger.warning("List scheduling failed: %s", e)
+            return None
+        return scheduler
+
+    def _optimize_draft(self, source, prefix_len=0, suffix_len=0):
+        """Replace the constraint solver by a greedy list scheduler, see Config.draft"""
+        if self.config.sw_pipelining.enabled:
+            raise SlothyException("Draft mode does not support software pipelining")
+
+        self._model.variables = []
+        self._model.num_constraints = 0
+        self._model.profile = {}
+        with self._profile("load_source"):
+            self._load_source(source, prefix_len=prefix_len, suffix_len=suffix_len)
+
+        self.logger.info("Computing draft schedule via list scheduling...")
+        start, start_user = time.perf_counter(), time.process_time()
+        with self._profile("list_schedule"):
+            scheduler = self._list_schedule()
+
+        self._new_result()
+        self.result.success = scheduler is not None
+        self.result.valid = True
+        if not self.success:
+            return False
+
+        for t in self._get_nodes(allnodes=True):
+            t.inst.args_out = list(scheduler.allocation[t.id])
+        for t in self._get_nodes(allnodes=True):
+            t.inst.args_in     = [ v.reduce().name() for v in t.src_in     ]
+            t.inst.args_in_out = [ v.reduce().name() for v in t.src_in_out ]
+
+        num_cycles = scheduler.num_cycles
+        min_cycles = math.ceil(self._model.tree.num_nodes / self.target.issue_rate)
+        self._result.orig_code = self._orig_code
+        self._result.stalls = num_cycles - min_cycles
+        self._apply_positions(num_cycles * self.target.issue_rate, scheduler.positions)
+        self._result.optimization_wall_time = time.perf_counter() - start
+        self._result.optimization_user_time = time.process_time() - start_user
+
+        self._extract_input_output_renaming()
+        self._extract_code()
+        try:
+            self._result.selfcheck_with_fixup(self.logger.getChild("selfcheck"))
+        except SlothySelfCheckException as e:
+            self.logger.warning("Draft schedule failed the selfcheck: %s", e)
+            self._new_result()
+            self.result.success = False
+            self.result.valid = True
+            return False
+        self._result.offset_fixup(self.logger.getChild("fixup"))
+
+        self.logger.info("Draft schedule: %d cycles (%d stalls)",
+                         self._result.cycles, self._result.stalls)
+        return True
+
+    def _modulo_schedule(self):
+        """Compute a modulo schedule for a single copy of the loaded loop body,
+        see Config.sw_pipelining.modulo_scheduling.
+
+        Returns the ModuloScheduler holding the schedule, or None on failure. Node IDs
+        in the schedule refer to the data flow graph held by the scheduler."""
+        doubled = self._model.tree
+        n = len(doubled.nodes_low)
+        tree = DFG(self._orig_code, self.logger.getChild("dataflow_modulo"),
+                   DFGConfig(self.config))
+
+        # Restrictions on global inputs and outputs, see _restrict_input_output_renaming()
+        inputs = { t.inst.orig_reg : t for t in doubled.nodes_input }
+        outputs = { t.inst.orig_reg : t for t in doubled.nodes_output }
+        for t in tree.nodes_output:
+            t.inst.args_in_restrictions = outputs[t.inst.orig_reg].inst.args_in_restrictions
+
+        def counterpart(t):
+            if t.is_virtual_input:
+                return inputs[t.inst.orig_reg]
+            return doubled.nodes_low[t.orig_pos]
+
+        def candidates(t, idx):
+            return self._get_output_candidates(counterpart(t), idx)
+
+        ordering = {}
+        for (t0, t1, _) in self._iter_locked_ordering():
+            distance = t1.orig_pos // n - t0.orig_pos // n
+            ordering[(t0.orig_pos % n, t1.orig_pos % n, distance)] = None
+        ordering = [ (tree.nodes[i0], tree.nodes[i1], d) for (i0, i1, d) in ordering ]
+
+        scheduler = ModuloScheduler(tree, self.config,
+                                    self.logger.getChild("modulo_scheduling"),
+                                    candidates=candidates, ordering=ordering)
+        try:
+            scheduler.schedule()
+        except ModuloSchedulingException as e:
+            self.logger.warning("Modulo scheduling failed: %s", e)
+            return None
+        return scheduler
+
+    def _optimize_modulo(self, source, prefix_len=0, suffix_len=0):
+        """Replace the constraint solver by an iterative modulo scheduler,
+        see Config.sw_pipelining.modulo_scheduling"""
+        self._model.variables = []
+        self._model.num_constraints = 0
+        self._model.profile = {}
+        with self._profile("load_source"):
+            self._load_source(source, prefix_len=prefix_len, suffix_len=suffix_len)
+
+        self.logger.info("Computing loop kernel via modulo scheduling...")
+        start, start_user = time.perf_counter(), time.process_time()
+        with self._profile("modulo_schedule"):
+            scheduler = self._modulo_schedule()
+
+        self._new_result()
+        self.result.success = scheduler is not None
+        self.result.valid = True
+        if not self.success:
+            return False
+
+        # Transfer the schedule to both copies of the loop body: Early and late
+        # instructions of the second copy run alongside the core instructions
+        # of the first copy.
+        size = scheduler.ii * self.target.issue_rate
+        single = scheduler.tree
+        positions, stages = {}, {}
+        for s, tlow, thigh in zip(single.nodes, self._model.tree.nodes_low,
+                                  self._model.tree.nodes_high, strict=True):
+            pos = scheduler.positions[s.id]
+            core = scheduler.stages[s.id][1]
+            positions[tlow.id] = pos if core else pos + size
+            positions[thigh.id] = pos + size if core else pos
+            stages[tlow.id] = stages[thigh.id] = scheduler.stages[s.id]
+            tlow.inst.args_out = thigh.inst.args_out = list(scheduler.allocation[s.id])
+        single_inputs = { t.inst.orig_reg : t for t in single.nodes_input }
+        for t in self._model.tree.nodes_input:
+            t.inst.args_out = list(scheduler.allocation[single_inputs[t.inst.orig_reg].id])
+        for t in self._get_nodes(allnodes=True):
+            t.inst.args_in     = [ v.reduce().name() for v in t.src_in     ]
+            t.inst.args_in_out = [ v.reduce().name() for v in t.src_in_out ]
+
+        min_cycles = math.ceil(len(single.nodes) / self.target.issue_rate)
+        self._result.orig_code = self._orig_code
+        self._result.stalls = scheduler.ii - min_cycles
+        self._apply_positions(size, positions, stages)
+        self._result.optimization_wall_time = time.perf_counter() - start
+        self._result.optimization_user_time = time.process_time() - start_user
+
+        self._extract_input_output_renaming()
+        self._extract_code()
+        try:
+            self._result.selfcheck_with_fixup(self.logger.getChild("selfcheck"))
+        except SlothySelfCheckException as e:
+            self.logger.warning("Modulo schedule failed the selfcheck: %s", e)
+            self._new_result()
+            self.result.success = False
+            self.result.valid = True
+            return False
+        self._result.offset_fixup(self.logger.getChild("fixup"))
+
+        self.logger.info("Modulo schedule: %d cycles (%d stalls)",
+                         self._result.cycles, self._result.stalls)
+        return True
+
+    def build_incremental(self, source, prefix_len=0, suffix_len=0):
+        """Build a constraint model for repeated solving via solve_with_stalls().
+
+        The model is built once with a variable number of stalls, bounded by
+        config.constraints.stalls_allowed. Subsequent calls to solve_with_stalls()
+        only tighten this bound, reusing the model as well as the last solution
+        as a hint.
+
+        Args:
+            source: The source code to be optimized.
+            prefix_len: The number of prefix instructions to lock.
+            suffix_len: The number of suffix instructions to lock.
+        """
+        if not self.config.variable_size:
+            raise SlothyException("Incremental optimization requires variable_size=True")
+
+        self._reset()
+        self._usage_check()
+        self.config.log(self.logger.getChild("config").debug)
+
+        self._optimize_args = (source, { "prefix_len" : prefix_len, "suffix_len" : suffix_len })
+        self._build_model(source, prefix_len=prefix_len, suffix_len=suffix_len)
+
+        # We search for _some_ solution within the stall bound, rather than
+        # the one with the minimum number of stalls.
+        self._add_objective(force_objective=True)
+        self._model.stalls_bound_lits = {}
+
+    def solve_with_stalls(self, stalls, timeout=None):
+        """Solve the model built by build_incremental() with at most the given number of stalls.
+
+        Args:
+            stalls: The maximum number of stalls. Must not exceed the number of stalls
+                the model was built for.
+            timeout: The timeout for this solver invocation. If None, config.timeout
+                is used.
+
+        Returns:
+            Indicates whether the optimization succeeded."""
+        if stalls > self.config.constraints.stalls_allowed:
+            raise SlothyException(f"Stall bound {stalls} exceeds the bound "\
+                f"{self.config.constraints.stalls_allowed} the model was built for")
+
+        lit = self._model.stalls_bound_lits.get(stalls, None)
+        if lit is None:
+            lit = self._NewBoolVar(f"stalls_le_{stalls}")
+            self._Add(self._model.stalls <= stalls).OnlyEnforceIf(lit)
+            self._model.stalls_bound_lits[stalls] = lit
+        self._model.cp_model.ClearAssumptions()
+        self._model.cp_model.AddAssumptions([lit])
+
+        if timeout is None:
+            timeout = self.config.timeout
+        if timeout is None:
+            self._model.cp_solver.parameters.max_time_in_seconds = math.inf
+        else:
+            self._set_timeout(timeout)
+
+        self._new_result()
+        self.logger.info("Invoking external constraint solver (%s) with at most %d stalls...",
+                         self._describe_solver(), stalls)
+        self.result.success = self._solve()
+        self.result.valid = True
+
+        if self.success:
+            self._extract_result()
+        return self.success
+
+    @contextmanager
+    def _profile(self, phase):
+        """Record time, variables and constraints created during a model construction phase"""
+        variables = len(self._model.variables)
+        constraints = self._model.num_constraints
+        start = time.perf_counter()
+        yield
+        self._model.profile[phase] = {
+            "time": time.perf_counter() - start,
+            "variables": len(self._model.variables) - variables,
+            "constraints": self._model.num_constraints - constraints }
+
+    def _run_phases(self, phases, check_deadline=False):
+        """Run the given model construction phases. If check_deadline is set, stop early
+        and return False once Config.deadline has passed."""
+        for phase in phases:
+            if check_deadline and self.config.remaining_time() == 0:
+                return False
+            with self._profile(phase.__name__.lstrip("_")):
+                phase()
+        return True
+
+    def _log_profile(self):
+        log = self.logger.getChild("profile")
+        for phase, stats in self._model.profile.items():
+            log.debug("%-40s: %8.4fs, %6d variables, %6d constraints", phase,
+                      stats["time"], stats["variables"], stats["constraints"])
+
+    def _build_model(self, source, prefix_len=0, suffix_len=0, check_deadline=False):
+        """Build the constraint model for the given source code.
+
+        If check_deadline is set, model construction is abandoned once Config.deadline
+        has passed, in which case False is returned. Otherwise, returns True."""
+        self._model.variables = []
+        self._model.num_constraints = 0
+        self._model.profile = {}
+
         # Setup
-        self._load_source(source, prefix_len=prefix_len, suffix_len=suffix_len)
+        with self._profile("load_source"):
+            self._load_source(source, prefix_len=prefix_len, suffix_len=suffix_len)
         self._init_external_model_and_solver()
         self._init_model_internals()
 
@@ -1370,44 +1945,38 @@ class SlothyBase(LockAttributes):
         # Build constraint model
         self.logger.debug("Creating constraint model...")
         # - Variables
-        self._add_variables_scheduling()
-        self._add_variables_functional_units()
-        self._add_variables_loop_rolling()
-        self._add_variables_dependencies()
-        self._add_variables_register_renaming()
+        if not self._run_phases([
+            self._add_variables_scheduling,
+            self._add_variables_functional_units,
+            self._add_variables_loop_rolling,
+            self._add_variables_dependencies,
+            self._add_variables_register_renaming ], check_deadline=check_deadline):
+            return False
         # - Constraints
-        self._add_constraints_scheduling()
-        self._add_constraints_lifetime_bounds()
-        self._add_constraints_loop_optimization()
-        self._add_constraints_n_issue()
-        self._add_constraints_dependency_order()
-        self._add_constraints_latencies()
-        self._add_constraints_register_renaming()
-        self._add_constraints_register_usage()
-        self._add_constraints_functional_units()
-        self._add_constraints_loop_periodic()
-        self._add_constraints_locked_ordering()
-        self._add_constraints_misc()
+        if not self._run_phases([
+            self._add_constraints_scheduling,
+            self._add_constraints_lifetime_bounds,
+            self._add_constraints_loop_optimization,
+            self._add_constraints_n_issue,
+            self._add_constraints_dependency_order,
+            self._add_constraints_latencies,
+            self._add_constraints_register_renaming,
+            self._add_constraints_register_usage,
+            self._add_constraints_functional_units,
+            self._add_constraints_loop_periodic,
+            self._add_constraints_locked_ordering,
+            self._add_constraints_misc,
+            self._add_warm_start,
+            self._add_list_schedule_hints,
+            self._add_constraints_register_symmetry ], check_deadline=check_deadline):
+            return False
 
         # - Objective
-        self._add_objective()
+        self._run_phases([ self._add_objective ])
         # - Export (optional)
         self._export_model()
 
-        self._result = Result(self.config)
-
-        # Do the actual work
-        self.logger.info("Invoking external constraint solver (%s) ...", self._describe_solver())
-        self.result.success = self._solve()
-        self.result.valid = True
-
-        if not retry and self.success:
-            self.logger.info("Booleans in result: %d", self._model.cp_solver.NumBooleans())
-
-        if not self.success:
-            return False
-
-        self._extract_result()
+        self._log_profile()
         return True
 
     def _load_source(self, source, prefix_len=0, suffix_len=0):
@@ -1461,8 +2030,6 @@ class SlothyBase(LockAttributes):
         self._model.register_usages = {}
         self._model.register_usage_vars = {}
 
-        self._model.variables = []
-
     def _usage_check(self):
         if self._num_optimization_passes > 0:
             raise SlothyException("SlothyBase should be used for one-shot optimizations")
@@ -1625,9 +2192,10 @@ class SlothyBase(LockAttributes):
         and equipped with a callback that is triggered every time CP-SAT finds a new solution.
 
         This callback counts the solutions found so far, and aborts the search when the solution
-        is sufficiently close to the optimum."""
+        is sufficiently close to the optimum. If on_solution is set, it is called with the callback
+        object for every solution, e.g. to extract intermediate results via Value()."""
         def __init__(self, logger, objective_description, max_solutions=32, is_good_enough=None,
-                     printer=None):
+                     printer=None, on_solution=None):
             cp_model.CpSolverSolutionCallback.__init__(self)
             self.__solution_count = 0
             self.__logger = logger
@@ -1635,9 +2203,12 @@ class SlothyBase(LockAttributes):
             self.__is_good_enough = is_good_enough
             self.__printer = printer
             self.__objective_desc = objective_description
+            self.__on_solution = on_solution
         def on_solution_callback(self):
             """Triggered when OR-Tools finds a solution to the current constraint problem"""
             self.__solution_count += 1
+            if self.__on_solution is not None:
+                self.__on_solution(self)
             if self.__objective_desc:
                 cur = self.ObjectiveValue()
                 bound = self.BestObjectiveBound()
@@ -1786,36 +2357,111 @@ class SlothyBase(LockAttributes):
         self._extract_code()
         self._result.selfcheck_with_fixup(self.logger.getChild("selfcheck"))
         self._result.offset_fixup(self.logger.getChild("fixup"))
+        self._write_profile(success=True)
+        self._extract_warm_start_entry()
+
+    def _snapshot_hook(self):
+        """The function to pass as on_solution to CpSatSolutionCb, or None if intermediate
+        results are not requested, see Config.snapshot_callback and Config.snapshot_file."""
+        if self.config.snapshot_callback is None and self.config.snapshot_file is None:
+            return None
+        return self._snapshot
+
+    def _snapshot(self, solution_cb):
+        """Extract an intermediate result from a solution found by the solver,
+        and publish it via Config.snapshot_callback and Config.snapshot_file"""
+        log = self.logger.getChild("snapshot")
+        result = self._result
+        solver_stats = getattr(self._model, "solver_stats", None)
+        try:
+            self._new_result()
+            self._model.solver_stats = SimpleNamespace(
+                wall_time=solution_cb.WallTime(),
+                user_time=solution_cb.UserTime(),
+                objective_bound=solution_cb.BestObjectiveBound(),
+                preset=None)
+            self._result.orig_code = self._orig_code
+            self._extract_positions(solution_cb.Value)
+            if self._result.stalls is None:
+                # Without variable_size, the number of stalls is not a model variable,
+                # but fixed to the number the model was built for
+                self._result.stalls = self.config.constraints.stalls_allowed
+            self._extract_register_renamings(solution_cb.Value)
+            self._extract_input_output_renaming()
+            self._extract_code()
+            self._result.valid = True
+            self._result.success = True
+            try:
+                self._result.selfcheck_with_fixup(log.getChild("selfcheck"))
+            except SlothySelfCheckException as e:
+                log.warning("Intermediate result failed the selfcheck -- skip: %s", e)
+                return
+            self._result.offset_fixup(log.getChild("fixup"))
+            snapshot = self._result
+        finally:
+            self._result = result
+            self._model.solver_stats = solver_stats
+
+        log.debug("Publishing intermediate result with %s stalls after %.4fs",
+                  snapshot.stalls, solution_cb.WallTime())
+        if self.config.snapshot_callback is not None:
+            self.config.snapshot_callback(snapshot)
+        if self.config.snapshot_file is not None:
+            entry = { "source" : SourceLine.write_multiline(self._orig_code),
+                      "stalls" : snapshot.stalls,
+                      "wall_time" : solution_cb.WallTime(),
+                      "code" : SourceLine.write_multiline(snapshot.code),
+                      "state" : snapshot.export_state() }
+            tmp = f"{self.config.snapshot_file}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(entry, f)
+            # Atomic, so that readers never observe partial snapshots
+            os.replace(tmp, self.config.snapshot_file)
 
     def _extract_positions(self, get_value):
 
         if self.config.variable_size:
             self._result.stalls = get_value(self._model.stalls)
-            stalls_bound = self._model.cp_solver.BestObjectiveBound()
+        # The objective bound is only a bound on the stalls if their number is the objective
+        if self.config.variable_size and self._model.objective_name == "minimize cycles":
+            stalls_bound = self._model.solver_stats.objective_bound
             stats = self._stalls_to_stats(stalls_bound)
             if stats is not None:
                 cycles_bound, _ = stats
                 self._result.cycles_bound = cycles_bound
 
-        self._result.optimization_wall_time = self._model.cp_solver.WallTime()
-        self._result.optimization_user_time = self._model.cp_solver.UserTime()
+        self._result.optimization_wall_time = self._model.solver_stats.wall_time
+        self._result.optimization_user_time = self._model.solver_stats.user_time
+        if self._model.solver_stats.preset is not None:
+            self._result.solver_preset = self._model.solver_stats.preset
+
+        # Extract length and instructions positions program order
+        if self.config.sw_pipelining.enabled:
+            codesize_with_bubbles = get_value(self._model.program_padded_size_half)
+        else:
+            codesize_with_bubbles = get_value(self._model.program_padded_size)
 
         nodes = self._model.tree.nodes
+        positions = { t.id : get_value(t.program_start_var) for t in nodes }
+        stages = None
         if self.config.sw_pipelining.enabled:
-            nodes_low = self._model.tree.nodes_low
+            stages = { t.id : (get_value(t.pre_var), get_value(t.core_var),
+                               get_value(t.post_var)) for t in nodes }
+        self._apply_positions(codesize_with_bubbles, positions, stages)
 
-        # Extract length and instructions positions program order
+    def _apply_positions(self, codesize_with_bubbles, positions, stages=None):
+        """Record the positions of all instructions in program order and, for software
+        pipelining, their stages, as dictionaries indexed by node ID."""
+        nodes = self._model.tree.nodes
         if self.config.sw_pipelining.enabled:
-            self._result.codesize_with_bubbles = get_value(self._model.program_padded_size_half)
-        else:
-            self._result.codesize_with_bubbles = get_value(self._model.program_padded_size)
+            nodes_low = self._model.tree.nodes_low
+
+        self._result.codesize_with_bubbles = codesize_with_bubbles
 
         for t in nodes:
-            t.real_pos_program = get_value(t.program_start_var)
+            t.real_pos_program = positions[t.id]
             if self.config.sw_pipelining.enabled:
-                t.pre  = get_value(t.pre_var)
-                t.post = get_value(t.post_var)
-                t.core = get_value(t.core_var)
+                t.pre, t.core, t.post = stages[t.id]
                 if t.pre and t.orig_pos < len(nodes_low):
                     t.real_pos_program -= 2 * self._result.codesize_with_bubbles
                 if t.post and t.orig_pos >= len(nodes_low):
@@ -2185,14 +2831,58 @@ class SlothyBase(LockAttributes):
     #                  VARIABLES (Register allocation)               #
     # ================================================================
 
+    def _get_output_candidates(self, t, idx):
+        """The registers the idx-th output of node t may be allocated to"""
+        arg_ty = t.inst.arg_types_out[idx]
+        arg_out = t.inst.args_out[idx]
+        restrictions = t.inst.args_out_restrictions[idx]
+
+        self.logger.debug("- Output %s (%s)", arg_out, arg_ty)
+
+        # Locked output register aren't renamed, and neither are
+        # outputs of locked instructions.
+        self.logger.debug("Locked registers: %s", self.config.locked_registers)
+        is_locked = arg_out in self.config.locked_registers
+
+        locked = False
+        reason = None
+        if self.arch.RegisterType.is_renamed(arg_ty) is False:
+            locked, reason = True, "Register type is not renamed"
+        elif self._reg_is_architectural(arg_out, arg_ty):
+            if t.is_locked:
+                locked, reason = True, "Instruction is locked"
+            elif is_locked:
+                locked, reason = True, "Register is locked"
+            elif not self.config.constraints.allow_renaming:
+                locked, reason = True, "Register renaming disabled for this instruction"
+
+        if locked is True:
+            self.logger.input.debug(f"Instruction {t.inst.write()} has its output locked")
+            self.logger.input.debug(f"Reason: {reason}")
+            candidates = [arg_out]
+        else:
+            candidates = list(dict.fromkeys(self._model.avail_renaming_regs[arg_ty]))
+
+        if restrictions is not None:
+            self.logger.debug("%s (%s): Output restriction %s", t.id, t.inst, restrictions)
+            candidates_restricted = [ c for c in candidates if c in restrictions ]
+        else:
+            candidates_restricted = candidates
+        if len(candidates_restricted) == 0:
+            self.logger.error("No suitable output registers exist for %s?", t.inst)
+            self.logger.error("Original candidates: %s", candidates)
+            self.logger.error("Restricted candidates: %s", candidates_restricted)
+            self.logger.error("Restrictions: %s", restrictions)
+            raise SlothyException()
+
+        self.logger.input.debug("Registers available for renaming of "
+                                f"[{t.inst}].{arg_out} ({t.orig_pos})")
+        self.logger.input.debug(candidates_restricted)
+        return candidates_restricted
+
     def _add_variables_register_renaming(self):
         """Add boolean variables indicating if an instruction uses a certain output register"""
 
-        def _allow_renaming(_):
-            if not self.config.constraints.allow_renaming:
-                return False
-            return True
-
         self.logger.debug("Adding variables for register allocation...")
 
         if self.config.constraints.minimize_register_usage is not None:
@@ -2207,50 +2897,8 @@ class SlothyBase(LockAttributes):
             self.logger.debug("Create register renaming variables for %s", t)
 
             # Iterate through output registers of current instruction
-            for arg_ty, arg_out, restrictions in zip(t.inst.arg_types_out, t.inst.args_out,
-                                                     t.inst.args_out_restrictions, strict=True):
-
-                self.logger.debug("- Output %s (%s)", arg_out, arg_ty)
-
-                # Locked output register aren't renamed, and neither are
-                # outputs of locked instructions.
-                self.logger.debug("Locked registers: %s", self.config.locked_registers)
-                is_locked = arg_out in self.config.locked_registers
-
-                locked = False
-                reason = None
-                if self.arch.RegisterType.is_renamed(arg_ty) is False:
-                    locked, reason = True, "Register type is not renamed"
-                elif self._reg_is_architectural(arg_out, arg_ty):
-                    if t.is_locked:
-                        locked, reason = True, "Instruction is locked"
-                    elif is_locked:
-                        locked, reason = True, "Register is locked"
-                    elif not _allow_renaming(t):
-                        locked, reason = True, "Register renaming disabled for this instruction"
-
-                if locked is True:
-                    self.logger.input.debug(f"Instruction {t.inst.write()} has its output locked")
-                    self.logger.input.debug(f"Reason: {reason}")
-                    candidates = [arg_out]
-                else:
-                    candidates = list(set(self._model.avail_renaming_regs[arg_ty]))
-
-                if restrictions is not None:
-                    self.logger.debug("%s (%s): Output restriction %s", t.id, t.inst, restrictions)
-                    candidates_restricted = [ c for c in candidates if c in restrictions ]
-                else:
-                    candidates_restricted = candidates
-                if len(candidates_restricted) == 0:
-                    self.logger.error("No suitable output registers exist for %s?", t.inst)
-                    self.logger.error("Original candidates: %s", candidates)
-                    self.logger.error("Restricted candidates: %s", candidates_restricted)
-                    self.logger.error("Restrictions: %s", restrictions)
-                    raise SlothyException()
-
-                self.logger.input.debug("Registers available for renaming of "
-                                        f"[{t.inst}].{arg_out} ({t.orig_pos})")
-                self.logger.input.debug(candidates_restricted)
+            for idx, arg_out in enumerate(t.inst.args_out):
+                candidates_restricted = self._get_output_candidates(t, idx)
 
                 var_dict = { out_reg : self._NewBoolVar(f"ALLOC({t.inst})({out_reg})")
                              for out_reg in candidates_restricted }
@@ -2503,7 +3151,7 @@ class SlothyBase(LockAttributes):
             for reg in self.arch.RegisterType.list_registers(ty):
                 arr = self._model.register_usage_vars.get(reg,[])
                 if len(arr) > 0:
-                    self._model.AddMaxEquality(self._register_used[reg], arr)
+                    self._AddMaxEquality(self._register_used[reg], arr)
                 else:
                     self._Add(self._register_used[reg] is False)
 
@@ -2550,6 +3198,98 @@ class SlothyBase(LockAttributes):
                 t_out = find_out_node(t_in)
                 self._force_renaming_collision( t_in.alloc_out_var[0], t_out.alloc_in_var[0] )
 
+    # ================================================================
+    #                  CONSTRAINTS (Register symmetries)             #
+    # ================================================================
+
+    def _interchangeable_registers(self):
+        """Find the classes of registers which are interchangeable in the model.
+
+        A register is interchangeable with others of its class if no part of the
+        model refers to it specifically: It is neither the fixed register of an
+        input, output or locked instruction, nor part of an argument restriction
+        or combination, nor fixed by a warm start. Any permutation of the registers
+        within a class then maps solutions to solutions."""
+        mentioned = set(self._model.fixed_registers)
+
+        def mention(regs, ty):
+            if regs is None:
+                return
+            if set(regs).issuperset(self._model.avail_renaming_regs[ty]):
+                # Not a restriction
+                return
+            mentioned.update(regs)
+
+        def mention_combinations(combinations):
+            if combinations is None:
+                return
+            for _, valid_combinations in combinations:
+                for combination in valid_combinations:
+                    mentioned.update(combination)
+
+        for t in self._get_nodes(allnodes=True):
+            for ty, var_dict in zip(t.inst.arg_types_out, t.alloc_out_var):
+                mention(var_dict.keys(), ty)
+            for ty, restriction in zip(t.inst.arg_types_in, t.inst.args_in_restrictions):
+                mention(restriction, ty)
+            for ty, restriction in zip(t.inst.arg_types_in_out, t.inst.args_in_out_restrictions):
+                mention(restriction, ty)
+            mention_combinations(t.inst.args_in_combinations)
+            mention_combinations(t.inst.args_out_combinations)
+            mention_combinations(t.inst.args_in_out_combinations)
+
+        classes = []
+        for ty in self.arch.RegisterType:
+            if self.arch.RegisterType.is_renamed(ty) is False:
+                continue
+            regs = [ r for r in self._model.avail_renaming_regs[ty] if r not in mentioned ]
+            # Extra registers are not interchangeable with normal ones if their
+            # use is penalized by the objective
+            extra = set(self.arch.RegisterType.list_registers(ty, only_extra=True))
+            if self.config.constraints.minimize_use_of_extra_registers == ty:
+                classes.append((ty, [ r for r in regs if r not in extra ]))
+                classes.append((ty, [ r for r in regs if r in extra ]))
+            else:
+                classes.append((ty, regs))
+        return [ (ty, regs) for (ty, regs) in classes if len(regs) > 1 ]
+
+    def _add_constraints_register_symmetry(self):
+        """Break the symmetry between interchangeable registers, see
+        Config.constraints.break_register_symmetries."""
+        if not self.config.constraints.break_register_symmetries:
+            return
+        if self.target.has_min_max_objective(self.config):
+            self.logger.debug("Target-specific objective -- not breaking register symmetries")
+            return
+
+        for ty, regs in self._interchangeable_registers():
+            # The register allocation variables of all outputs which may use
+            # the registers, in program order
+            slots = [ var_dict for t in self._get_nodes(allnodes=True)
+                      for arg_ty, var_dict in zip(t.inst.arg_types_out, t.alloc_out_var)
+                      if arg_ty == ty and regs[0] in var_dict ]
+            self.logger.debug("Breaking symmetry between %d %s registers %s across %d outputs",
+                              len(regs), ty, regs, len(slots))
+
+            # Value precedence: A register may only be used by an output if the
+            # preceding register in the class is used by an earlier output.
+            used = None
+            for var_dict in slots:
+                if used is None:
+                    for reg in regs[1:]:
+                        self._Add(var_dict[reg] == False) # pylint:disable=singleton-comparison
+                else:
+                    for prev, reg in zip(regs, regs[1:]):
+                        self._AddImplication(var_dict[reg], used[prev])
+                cur = {}
+                for reg in regs[:-1]:
+                    if used is None:
+                        cur[reg] = var_dict[reg]
+                        continue
+                    cur[reg] = self._NewBoolVar("")
+                    self._AddMaxEquality(cur[reg], [used[reg], var_dict[reg]])
+                used = cur
+
     # ================================================================
     #                 CONSTRAINTS (Software pipelining)              #
     # ================================================================
@@ -2652,7 +3392,10 @@ class SlothyBase(LockAttributes):
             self._Add( t.program_start_var ==
                        t.cycle_start_var * self.target.issue_rate + t.slot_var )
 
-    def _add_constraints_locked_ordering(self):
+    def _iter_locked_ordering(self):
+        """Yields triples (t0, t1, annotated) of instructions t0, t1 whose relative
+        order needs to be preserved. The flag annotated indicates whether this is
+        because of a source annotation."""
 
         def inst_changes_addr(inst):
             return inst.increment is not None
@@ -2672,36 +3415,27 @@ class SlothyBase(LockAttributes):
                 return True
             return False
 
-        def force_stays_before(t0, t1):
-            if self.config.sw_pipelining.enabled:
-                self._AddImplication( t0.post_var, t1.post_var )
-                self._AddImplication( t1.pre_var,  t0.pre_var )
-                self._AddImplication( t0.pre_var,  t1.post_var.Not() )
-            if should_forbid_reordering(t0,t1):
-                self.logger.debug("Forbid reordering of (%s,%s) to avoid address fixup issues",
-                                  t0, t1)
-            self._add_path_constraint( t1, t0,
-               lambda t0=t0, t1=t1: self._Add(t0.program_start_var < t1.program_start_var) )
-
         def comes_before(t0, t1):
             return (t0.orig_pos < t1.orig_pos)
 
         if self.config.constraints.allow_reordering is False:
             for t0, t1 in self.get_inst_pairs(cond=comes_before):
-                force_stays_before(t0, t1)
+                yield (t0, t1, False)
         else:
             for t0, t1 in self.get_inst_pairs(
                     cond_fst=lambda t: t.is_locked,
                     cond_snd=lambda t: t.is_locked,
                     cond = comes_before):
-                force_stays_before(t0, t1)
+                yield (t0, t1, False)
 
             for t0, t1 in self.get_inst_pairs(
                     cond_fst = lambda t: t.inst.is_load_store_instruction(),
                     cond_snd = lambda t: t.inst.is_load_store_instruction(),
                     cond = comes_before):
                 if should_forbid_reordering(t0, t1):
-                    force_stays_before(t0, t1)
+                    self.logger.debug("Forbid reordering of (%s,%s) to avoid address "\
+                                      "fixup issues", t0, t1)
+                    yield (t0, t1, False)
 
         if self.config.sw_pipelining.enabled is True:
             nodes = self._get_nodes(low=True)
@@ -2727,9 +3461,7 @@ class SlothyBase(LockAttributes):
                     continue
                 t0s.append(nodes[i-1])
             for t0 in t0s:
-                self.logger.info("Force %s < %s by source annotation", t0, t1)
-                self._add_path_constraint(t1, t0,
-                    lambda t0=t0, t1=t1: self._Add(t0.program_start_var < t1.program_start_var))
+                yield (t0, t1, True)
 
         for t0 in nodes:
             force_before = t0.inst.source_line.tags.get("before", [])
@@ -2737,9 +3469,25 @@ class SlothyBase(LockAttributes):
                 force_before = [force_before]
             for t1_id in force_before:
                 t1 = find_node_by_source_id(t1_id)
-                self.logger.info("Force %s < %s by source annotation", t0, t1)
-                self._add_path_constraint(t1, t0,
-                    lambda t0=t0, t1=t1: self._Add(t0.program_start_var < t1.program_start_var))
+                yield (t0, t1, True)
+
+    def _add_constraints_locked_ordering(self):
+
+        def force_stays_before(t0, t1):
+            if self.config.sw_pipelining.enabled:
+                self._AddImplication( t0.post_var, t1.post_var )
+                self._AddImplication( t1.pre_var,  t0.pre_var )
+                self._AddImplication( t0.pre_var,  t1.post_var.Not() )
+            self._add_path_constraint( t1, t0,
+               lambda t0=t0, t1=t1: self._Add(t0.program_start_var < t1.program_start_var) )
+
+        for t0, t1, annotated in self._iter_locked_ordering():
+            if not annotated:
+                force_stays_before(t0, t1)
+                continue
+            self.logger.info("Force %s < %s by source annotation", t0, t1)
+            self._add_path_constraint(t1, t0,
+                lambda t0=t0, t1=t1: self._Add(t0.program_start_var < t1.program_start_var))
 
     # ================================================================
     #                  CONSTRAINTS (Single issuing)                  #
@@ -2842,6 +3590,103 @@ class SlothyBase(LockAttributes):
     def _add_constraints_misc(self):
         self.target.add_further_constraints(self)
 
+    def _add_warm_start(self):
+        """Hint the previous solution for all instructions which have not changed
+        since the last optimization of the region, see Config.hints.warm_start."""
+        store = self._get_warm_start_store()
+        if store is None:
+            return
+        entry = store.lookup(self._warm_start_key())
+        if entry is None:
+            self.logger.debug("No previous solution to warm-start from")
+            return
+
+        # Map unchanged instructions in the new source to their old positions
+        old_src = entry["source"]
+        new_src = [ l.text for l in self._orig_code ]
+        matcher = difflib.SequenceMatcher(None, old_src, new_src, autojunk=False)
+        matches = {}
+        edits = []
+        for (tag, i1, _, j1, j2) in matcher.get_opcodes():
+            if tag == "equal":
+                for k in range(j2 - j1):
+                    matches[j1 + k] = i1 + k
+            else:
+                # For deletions, remember where the deleted instructions used to be
+                edits += range(j1, max(j2, j1 + 1))
+        self.logger.info("Warm-starting from previous solution: %d/%d instructions unchanged",
+                         len(matches), len(new_src))
+
+        # Without any edit, there is nothing to make room for, so the previous
+        # solution is only hinted
+        window = self.config.hints.warm_start_window
+        if len(edits) == 0:
+            window = None
+        def is_frozen(j):
+            if window is None:
+                return False
+            # Distance to the closest edit
+            idx = bisect_left(edits, j)
+            dist = [ abs(edits[i] - j) for i in [idx - 1, idx] if 0 <= i < len(edits) ]
+            return min(dist) > window
+
+        # With software pipelining, the nodes consist of two copies of the source
+        hints = []
+        frozen = []
+        for k, t in enumerate(self._get_nodes()):
+            copy_idx, j = divmod(k, len(new_src))
+            if j not in matches:
+                continue
+            values = entry["nodes"][copy_idx * len(old_src) + matches[j]]
+            freeze = is_frozen(j)
+
+            hints.append((t.program_start_var, values["pos"]))
+            if values["stage"] is not None:
+                for var, val in zip([t.pre_var, t.core_var, t.post_var], values["stage"]):
+                    hints.append((var, val))
+                    if freeze:
+                        self._Add(var == val)
+            for var_dict, reg in zip(t.alloc_out_var, values["out"]):
+                if reg not in var_dict:
+                    continue
+                hints.append((var_dict[reg], True))
+                if freeze:
+                    self._Add(var_dict[reg] == True)
+                    self._model.fixed_registers.add(reg)
+            if freeze:
+                frozen.append((values["pos"], t))
+
+        # Frozen instructions keep their relative order, but may move
+        # to make room for the edited ones
+        frozen.sort(key=lambda x: x[0])
+        for (_, t0), (_, t1) in zip(frozen, frozen[1:]):
+            self._Add(t0.program_start_var < t1.program_start_var)
+        if window is not None:
+            self.logger.info("Froze %d instructions further than %d instructions from any edit",
+                             len(frozen), window)
+
+        self._AddHintsOverriding(hints)
+
+    def _add_list_schedule_hints(self):
+        """Hint a greedy list schedule, see Config.hints.list_schedule_hint."""
+        if not self.config.hints.list_schedule_hint:
+            return
+        if self.config.sw_pipelining.enabled:
+            self.logger.debug("Ignoring list schedule hint for software pipelining")
+            return
+        scheduler = self._list_schedule()
+        if scheduler is None:
+            return
+        self.logger.info("Hinting list schedule with %d cycles", scheduler.num_cycles)
+        for t in self._get_nodes():
+            self._AddHint(t.program_start_var, scheduler.positions[t.id])
+            if not self.config.constraints.functional_only:
+                self._AddHint(t.cycle_start_var, scheduler.cycles[t.id])
+        for t in self._get_nodes(allnodes=True):
+            for var_dict, reg in zip(t.alloc_out_var, scheduler.allocation[t.id]):
+                if reg in var_dict:
+                    self._AddHint(var_dict[reg], True)
+
     def get_inst_pairs(self, cond_fst=None, cond_snd=None, cond=None):
         """Yields all instruction pairs satisfying the provided predicate.
 
@@ -3049,7 +3894,10 @@ class SlothyBase(LockAttributes):
         return (cycles, ipc)
 
     def _print_stalls(self, stalls):
-        (cycles, ipc) = self._stalls_to_stats(stalls)
+        stats = self._stalls_to_stats(stalls)
+        if stats is None:
+            return f"{stalls}"
+        (cycles, ipc) = stats
         return f" (Cycles ~ {cycles}, IPC ~ {ipc:.2f})"
 
     def _add_objective(self, force_objective=False):
@@ -3111,6 +3959,7 @@ class SlothyBase(LockAttributes):
             self._model.objective_name = name
         else:
             self.logger.info("Objective: None (any satisfying solution is fine)")
+            self._model.cp_model.ClearObjective()
             self._model.objective_name = "no objective"
 
     #
@@ -3120,20 +3969,28 @@ class SlothyBase(LockAttributes):
     #
 
     def _describe_solver(self):
+        desc = f"OR-Tools CP-SAT v{ortools.__version__}"
         workers = self._model.cp_solver.parameters.num_workers
         if workers > 0:
-            return f"OR-Tools CP-SAT v{ortools.__version__}, {workers} threads"
-        return f"OR-Tools CP-SAT v{ortools.__version__}"
+            desc += f", {workers} threads"
+        if self._portfolio_size() > 1:
+            desc += f", portfolio of {self._portfolio_size()} processes"
+        return desc
 
     def _init_external_model_and_solver(self):
         self._model.cp_model  = cp_model.CpModel()
         self._model.cp_solver = cp_model.CpSolver()
-        self._model.cp_solver.random_seed = self.config.solver_random_seed
+        self._model.hints = {}
+        self._model.fixed_registers = set()
+        self._model.cp_solver.parameters.random_seed = self.config.solver_random_seed
+        if self.config.solver_num_workers is not None:
+            self._model.cp_solver.parameters.num_workers = self.config.solver_num_workers
 
         # There is a bug in OR-Tools, https://github.com/google/or-tools/issues/3483,
         # that causes models to be incorrectly classes as INFEASIBLE at times.
         # The following turns of the buggy parts of the code:
-        if ortools.__version__ < "9.5.2040":
+        ortools_version = tuple(int(v) for v in ortools.__version__.split(".") if v.isdigit())
+        if ortools_version < (9, 5, 2040):
             self.logger.warning("Please consider upgrading OR-Tools to version >= 9.5.2040")
             self._model.cp_solver.parameters.symmetry_level = 1
 
@@ -3142,8 +3999,10 @@ class SlothyBase(LockAttributes):
         self._model.variables.append(r)
         return r
     def _NewIntervalVar(self, base, dur, end, name=""): # pylint:disable=invalid-name
+        self._model.num_constraints += 1
         return self._model.cp_model.NewIntervalVar(base,dur,end,name)
     def _NewOptionalIntervalVar(self, base, dur, end, cond,name=""): # pylint:disable=invalid-name
+        self._model.num_constraints += 1
         return self._model.cp_model.NewOptionalIntervalVar(base,dur,end,cond,name)
     def _NewBoolVar(self, name=""): # pylint:disable=invalid-name
         r = self._model.cp_model.NewBoolVar(name)
@@ -3153,22 +4012,44 @@ class SlothyBase(LockAttributes):
         r = self._model.cp_model.NewConstant(val)
         return r
     def _Add(self,c): # pylint:disable=invalid-name
+        self._model.num_constraints += 1
         return self._model.cp_model.Add(c)
-    def _AddNoOverlap(self,lst): # pylint:disable=invalid-name
-        return self._model.cp_model.AddNoOverlap(lst)
     def _AddExactlyOne(self,lst): # pylint:disable=invalid-name
+        self._model.num_constraints += 1
         return self._model.cp_model.AddExactlyOne(lst)
     def _AddImplication(self,a,b): # pylint:disable=invalid-name
+        self._model.num_constraints += 1
         return self._model.cp_model.AddImplication(a,b)
     def _AddAtLeastOne(self,lst): # pylint:disable=invalid-name
+        self._model.num_constraints += 1
         return self._model.cp_model.AddAtLeastOne(lst)
     def _AddAbsEq(self,dst,expr): # pylint:disable=invalid-name
+        self._model.num_constraints += 1
         return self._model.cp_model.AddAbsEquality(dst,expr)
+    def _AddMaxEquality(self,dst,lst): # pylint:disable=invalid-name
+        self._model.num_constraints += 1
+        return self._model.cp_model.AddMaxEquality(dst,lst)
     def _AddAllDifferent(self,lst): # pylint:disable=invalid-name
+        self._model.num_constraints += 1
         return self._model.cp_model.AddAllDifferent(lst)
     def _AddHint(self,var,val): # pylint:disable=invalid-name
+        # CP-SAT rejects models hinting the same variable twice; the first hint wins
+        if var.Index() in self._model.hints:
+            return None
+        self._model.hints[var.Index()] = (var, val)
         return self._model.cp_model.AddHint(var,val)
+    def _AddHintsOverriding(self, hints): # pylint:disable=invalid-name
+        """Add hints, replacing previous hints for the same variables"""
+        for var, val in hints:
+            self._model.hints[var.Index()] = (var, val)
+        self._model.cp_model.ClearHints()
+        for var, val in self._model.hints.values():
+            self._model.cp_model.AddHint(var, val)
+    def _ClearHints(self): # pylint:disable=invalid-name
+        self._model.hints = {}
+        self._model.cp_model.ClearHints()
     def _AddNoOverlap(self,interval_list): # pylint:disable=invalid-name
+        self._model.num_constraints += 1
         return self._model.cp_model.AddNoOverlap(interval_list)
 
     def _export_model(self):
@@ -3178,45 +4059,255 @@ class SlothyBase(LockAttributes):
         self.logger.info("Writing model to %s ...", log_file)
         assert self._model.cp_model.ExportToFile(log_file)
 
+    def _new_result(self):
+        self._result = Result(self.config)
+        self._result.model_profile = dict(self._model.profile)
+
+    def _write_profile(self, success):
+        """Append model construction profile and solver statistics to config.profile_file
+
+        For successful optimizations, this also records the quality of the result."""
+        if self.config.profile_file is None:
+            return
+        record = {
+            "name": self.logger.name,
+            "instructions": len(self._orig_code),
+            "stalls_allowed": self.config.constraints.stalls_allowed,
+            "status": self._model.cp_solver.StatusName(self._model.cp_model.status),
+            "solve_time": self._model.solver_stats.wall_time,
+            "preset": self._model.solver_stats.preset,
+            "variables": len(self._model.variables),
+            "constraints": self._model.num_constraints,
+            "phases": self._model.profile }
+        if success:
+            record["cycles"] = self._result.cycles
+            record["stalls"] = self._result.stalls
+            record["cycles_bound"] = self._result.cycles_bound
+        with open(self.config.profile_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def _is_good_enough(self, cur, bound):
+        """Determines whether the best solution found so far is close enough to the optimum
+        that we should stop."""
+        if self._model.objective_name == "minimize number of stalls":
+            prec = self.config.constraints.stalls_precision
+            if cur - bound <= self.config.constraints.stalls_precision:
+                self.logger.info("Closer than %d stalls to theoretical optimum... stop", prec)
+                return True
+        elif self._model.objective_name != "no objective":
+            prec = self.config.objective_precision
+            if bound > 0 and abs(1 - (cur / bound)) < prec:
+                self.logger.info("Closer than %d%% to theoretical optimum... stop",
+                                    int(prec*100))
+                return True
+        return False
+
+    def _portfolio_size(self):
+        size = self.config.solver_portfolio_size
+        if size is None or size <= 1:
+            return 1
+        if "fork" not in multiprocessing.get_all_start_methods():
+            return 1
+        return size
+
     def _solve(self):
+        if self._portfolio_size() > 1:
+            ok = self._solve_portfolio()
+        else:
+            ok = self._solve_single()
 
-        # Determines whether the best solution found so far is close enough to the optimum
-        # that we should stop.
-        def is_good_enough( cur, bound ):
-            if self._model.objective_name == "minimize number of stalls":
-                prec = self.config.constraints.stalls_precision
-                if cur - bound <= self.config.constraints.stalls_precision:
-                    self.logger.info("Closer than %d stalls to theoretical optimum... stop", prec)
-                    return True
-            elif self._model.objective_name != "no objective":
-                prec = self.config.objective_precision
-                if bound > 0 and abs(1 - (cur / bound)) < prec:
-                    self.logger.info("Closer than %d%% to theoretical optimum... stop",
-                                        int(prec*100))
-                    return True
-            return False
+        if not ok:
+            self._write_profile(success=False)
+
+        if ok:
+            # Remember solution in case we want to retry with an(other) objective
+            self._ClearHints()
+            for v in self._model.variables:
+                self._AddHint(v, self._model.cp_solver.Value(v))
+
+        return ok
 
+    def _solve_single(self):
         solution_cb = SlothyBase.CpSatSolutionCb(self.logger,self._model.objective_name,
                                                  self.config.max_solutions,
-                                                 is_good_enough=is_good_enough,
-                                                 printer=self._model.objective_printer)
+                                                 is_good_enough=self._is_good_enough,
+                                                 printer=self._model.objective_printer,
+                                                 on_solution=self._snapshot_hook())
+        self._apply_deadline()
         self._model.cp_model.status = self._model.cp_solver.Solve(self._model.cp_model, solution_cb)
+        self._model.solver_stats = SimpleNamespace(
+            wall_time=self._model.cp_solver.WallTime(),
+            user_time=self._model.cp_solver.UserTime(),
+            objective_bound=self._model.cp_solver.BestObjectiveBound(),
+            preset=None)
 
         status_str = self._model.cp_solver.StatusName(self._model.cp_model.status)
         self.logger.info("%s, wall time: %4f s", status_str, self._model.cp_solver.WallTime())
 
-        ok = self._model.cp_model.status in [cp_model.FEASIBLE, cp_model.OPTIMAL]
+        return self._model.cp_model.status in [cp_model.FEASIBLE, cp_model.OPTIMAL]
+
+    def _set_solver_preset(self, idx, params):
+        solver_params = self._model.cp_solver.parameters
+        solver_params.random_seed = self.config.solver_random_seed + idx
+        for k, v in params.items():
+            if isinstance(v, str) and hasattr(cp_model, v):
+                v = getattr(cp_model, v)
+            setattr(solver_params, k, v)
+
+    def _run_portfolio_worker(self, idx, params, conn):
+        # This runs in a forked process, so we can freely modify the solver
+        self._set_solver_preset(idx, params)
+        stopped = []
+        def is_good_enough(cur, bound):
+            res = self._is_good_enough(cur, bound)
+            if res:
+                stopped.append(True)
+            return res
+        solution_cb = SlothyBase.CpSatSolutionCb(self.logger, self._model.objective_name,
+                                                 self.config.max_solutions,
+                                                 is_good_enough=is_good_enough,
+                                                 printer=self._model.objective_printer,
+                                                 on_solution=self._snapshot_hook())
+        self._apply_deadline()
+        solver = self._model.cp_solver
+        status = solver.Solve(self._model.cp_model, solution_cb)
+        res = SimpleNamespace(optimal=status == cp_model.OPTIMAL,
+                              feasible=status in [cp_model.FEASIBLE, cp_model.OPTIMAL],
+                              infeasible=status == cp_model.INFEASIBLE,
+                              good_enough=len(stopped) > 0,
+                              wall_time=solver.WallTime(),
+                              user_time=solver.UserTime(),
+                              objective_bound=None,
+                              objective=None,
+                              values=None)
+        if res.feasible:
+            res.objective = solver.ObjectiveValue()
+            res.objective_bound = solver.BestObjectiveBound()
+            res.values = [ solver.Value(v) for v in self._model.variables ]
+        conn.send(vars(res))
+        conn.close()
+
+    def _solve_portfolio(self):
+        """Run multiple independent solver processes with different random seeds
+        and parameter presets, and adopt the first good enough solution.
+
+        As soon as one process proves the model infeasible, all others are stopped."""
+        ctx = multiprocessing.get_context("fork")
+        presets = self.config.solver_portfolio_presets
+        t0 = time.time()
+
+        pending = {}
+        for idx in range(self._portfolio_size()):
+            name, params = presets[idx % len(presets)]
+            if idx >= len(presets):
+                name = f"{name}#{idx // len(presets)}"
+            conn_recv, conn_send = ctx.Pipe(duplex=False)
+            proc = ctx.Process(target=self._run_portfolio_worker,
+                               args=(idx, params, conn_send), daemon=True)
+            proc.start()
+            conn_send.close()
+            pending[conn_recv] = (idx, name, params, proc)
+
+        # Maximization objectives are the exception, see _add_objective()
+        sign = -1 if self._model.cp_model.Proto().objective.scaling_factor < 0 else 1
+
+        winner = None
+        best = None
+        infeasible = False
+        try:
+            while len(pending) > 0 and winner is None and not infeasible:
+                for conn in multiprocessing.connection.wait(list(pending.keys())):
+                    idx, name, params, proc = pending.pop(conn)
+                    try:
+                        res = SimpleNamespace(**conn.recv())
+                    except EOFError:
+                        self.logger.warning("Solver process %d (%s) terminated unexpectedly",
+                                            idx, name)
+                        continue
+                    finally:
+                        conn.close()
+                    self.logger.debug("Solver process %d (%s) finished after %.4fs: %s",
+                                      idx, name, res.wall_time,
+                                      "feasible" if res.feasible else
+                                      "infeasible" if res.infeasible else "unknown")
+                    if res.infeasible:
+                        # No other process can find a solution either
+                        infeasible = True
+                        break
+                    if not res.feasible:
+                        continue
+                    res.idx, res.name, res.params = idx, name, params
+                    if res.optimal or res.good_enough:
+                        winner = res
+                        break
+                    if best is None or sign * res.objective < sign * best.objective:
+                        best = res
+        finally:
+            for (_, _, _, proc) in pending.values():
+                proc.terminate()
+            for (_, _, _, proc) in pending.values():
+                proc.join()
+
+        wall_time = time.time() - t0
+        if infeasible:
+            self._model.cp_model.status = cp_model.INFEASIBLE
+            self._model.solver_stats = SimpleNamespace(wall_time=wall_time, user_time=0,
+                                                       objective_bound=None, preset=None)
+            self.logger.info("INFEASIBLE (solver portfolio), wall time: %4f s", wall_time)
+            return False
 
-        if ok:
-            # Remember solution in case we want to retry with an(other) objective
-            self._model.cp_model.ClearHints()
-            for v in self._model.variables:
-                self._AddHint(v, self._model.cp_solver.Value(v))
+        if winner is None:
+            winner = best
 
-        return ok
+        if winner is None:
+            self._model.cp_model.status = cp_model.UNKNOWN
+            self._model.solver_stats = SimpleNamespace(wall_time=wall_time, user_time=0,
+                                                       objective_bound=None, preset=None)
+            self.logger.info("No solution found by solver portfolio, wall time: %4f s",
+                             wall_time)
+            return False
+
+        self.logger.info("Solver process %d (%s) won, wall time: %4f s",
+                         winner.idx, winner.name, wall_time)
+
+        # Load the winning solution into the solver of this process, by fixing
+        # all variables to the values found, and solving again
+        self._ClearHints()
+        for v, val in zip(self._model.variables, winner.values):
+            self._AddHint(v, val)
+        params = self._model.cp_solver.parameters
+        params.fix_variables_to_their_hinted_value = True
+        status = self._model.cp_solver.Solve(self._model.cp_model)
+        params.fix_variables_to_their_hinted_value = False
+        if status not in [cp_model.FEASIBLE, cp_model.OPTIMAL]:
+            raise SlothyException("Failed to load solution from solver portfolio")
+
+        self._model.cp_model.status = cp_model.OPTIMAL if winner.optimal else cp_model.FEASIBLE
+        self._model.solver_stats = SimpleNamespace(wall_time=wall_time,
+                                                   user_time=winner.user_time,
+                                                   objective_bound=winner.objective_bound,
+                                                   preset=winner.name)
+        return True
 
     def retry(self, fix_stalls=None):
-        self._result = Result(self.config)
+        cache = self._get_cache()
+        if cache is not None:
+            source, kwargs = self._optimize_args
+            cache_key = cache.key(source, self.config, retry=True,
+                                  fix_stalls=fix_stalls, **kwargs)
+            cache = self._check_cache_key(cache, cache_key)
+        if cache is not None:
+            if self._replay_from_cache(cache, cache_key):
+                return self.success
+
+        if self._replayed_from_cache:
+            # The previous result was replayed from the cache, so there
+            # is no constraint model to re-optimize yet.
+            source, kwargs = self._optimize_args
+            self._build_model(source, **kwargs)
+            self._replayed_from_cache = False
+
+        self._new_result()
 
         if fix_stalls is not None:
             assert self.config.variable_size
@@ -3235,6 +4326,10 @@ class SlothyBase(LockAttributes):
             return False
 
         self._extract_result()
+
+        if cache is not None:
+            self._store_in_cache(cache, cache_key)
+
         return True
 
     def _dump_model_statistics(self):
@@ -25,7 +25,15 @@
 # Author: Hanno Becker <hannobecker@posteo.de>
 #
 
+import copy
+import logging
+from bisect import bisect_right
+from collections import OrderedDict
+from collections.abc import Mapping
 from functools import cached_property
+
+import numpy as np
+
 from slothy.helper import SourceLine
 
 class SlothyUselessInstructionException(Exception):
@@ -34,6 +42,116 @@ class SlothyUselessInstructionException(Exception):
     useless according to the architecture model given to SLOTHY. Consider removing the instruction
     or refining the architecture model."""
 
+class ParsedInstructionCache:
+    """Bounded least-recently-used cache of parsed source lines
+
+    The same source is typically turned into a data flow graph many times during
+    a single SLOTHY run. This cache maps the normalized text of a source line,
+    together with its tags, to the list of instructions it parses to. The cached
+    instructions are never handed out directly: since instructions are modified
+    in place during renaming and fusion, every lookup returns fresh clones."""
+
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def _key(arch, l):
+        # Tags may influence parsing, e.g. through explicit read/write annotations
+        return (arch.__name__, l.text.strip(), repr(sorted(l.tags.items())))
+
+    @staticmethod
+    def _clone(inst):
+        # Only the argument lists, restrictions and the like are modified
+        # in-place, so a shallow copy of all container attributes suffices.
+        res = copy.copy(inst)
+        for k, v in vars(inst).items():
+            if isinstance(v, (list, dict, set)):
+                setattr(res, k, copy.copy(v))
+        return res
+
+    def parse(self, arch, l):
+        """Parse a source line into a list of instructions of the given architecture"""
+        if self.max_size == 0:
+            return arch.Instruction.parser(l)
+        key = self._key(arch, l)
+        insts = self._entries.get(key, None)
+        if insts is None:
+            insts = list(map(self._clone, arch.Instruction.parser(l)))
+            self._entries[key] = insts
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+        return list(map(self._clone, insts))
+
+    def clear(self):
+        """Remove all cached entries"""
+        self._entries.clear()
+
+class RegisterState:
+    """The register state during the construction of a data flow graph
+
+    This maps register names to the RegisterSource instances currently holding
+    them. Every node in the data flow graph remembers the register state at the
+    time it was added. Rather than storing a full copy of the state in each node,
+    which would be quadratic in the size of the graph, we record the history of
+    each register once and hand out lightweight snapshots referring to a point
+    in that history."""
+
+    def __init__(self):
+        self._current = {}
+        self._history = {}
+        self._version = 0
+
+    def __contains__(self, reg):
+        return reg in self._current
+
+    def __getitem__(self, reg):
+        return self._current[reg]
+
+    def __setitem__(self, reg, ref):
+        self._version += 1
+        self._current[reg] = ref
+        versions, refs = self._history.setdefault(reg, ([], []))
+        versions.append(self._version)
+        refs.append(ref)
+
+    def lookup(self, reg, version):
+        """Returns the source of a register at a given point in the history"""
+        versions, refs = self._history.get(reg, ((), ()))
+        idx = bisect_right(versions, version)
+        if idx == 0:
+            raise KeyError(reg)
+        return refs[idx - 1]
+
+    def registers(self, version):
+        """Returns the registers which have been written at a given point in the history"""
+        return [ reg for reg, (versions, _) in self._history.items()
+                 if versions[0] <= version ]
+
+    def snapshot(self):
+        """Returns an immutable view of the current register state"""
+        return RegisterStateSnapshot(self, self._version)
+
+class RegisterStateSnapshot(Mapping):
+    """Immutable view of a RegisterState at a fixed point in its history"""
+
+    __slots__ = ("_state", "_version")
+
+    def __init__(self, state, version):
+        self._state = state
+        self._version = version
+
+    def __getitem__(self, reg):
+        return self._state.lookup(reg, self._version)
+
+    def __iter__(self):
+        return iter(self._state.registers(self._version))
+
+    def __len__(self):
+        return len(self._state.registers(self._version))
+
 class RegisterSource:
     """Representation of the output of an instruction
 
@@ -364,6 +482,9 @@ class DataFlowGraphException(Exception):
 class DataFlowGraph:
     """The data flow graph associated with a piece of assembly."""
 
+    # Parsing results shared across all data flow graphs
+    parse_cache = ParsedInstructionCache()
+
     @property
     def nodes_all(self):
         """The list of all ComputationNodes contained in the DataFlowGraph.
@@ -478,6 +599,27 @@ class DataFlowGraph:
                         yield (t.id, d.id, f"inout{in_out_idx}")
         return set(_iter_edges_with_label())
 
+    def edges_array(self):
+        """Return the labelled edges in the data flow graph in integer-encoded form.
+
+        Returns a pair (ids, edges), where ids is the list of node IDs in the order
+        of DataFlowGraph.nodes_all, and edges is a NumPy array of shape (n,3) whose
+        rows (src, dst, label) refer to nodes by their index in ids. The label 2*i
+        encodes the i-th output, while 2*i+1 encodes the i-th input/output.
+
+        In contrast to DataFlowGraph.edges(), edges may be listed multiple times."""
+        ids = [ t.id for t in self.nodes_all ]
+        index = { node_id : i for i, node_id in enumerate(ids) }
+        flat = []
+        for i, t in enumerate(self.nodes_all):
+            for out_idx, deps in enumerate(t.dst_out):
+                for d in deps:
+                    flat.extend((i, index[d.id], 2 * out_idx))
+            for in_out_idx, deps in enumerate(t.dst_in_out):
+                for d in deps:
+                    flat.extend((i, index[d.id], 2 * in_out_idx + 1))
+        return ids, np.array(flat, dtype=np.int64).reshape(-1, 3)
+
     def depth(self):
         """The depth of the data flow graph.
 
@@ -570,6 +712,8 @@ class DataFlowGraph:
         Args:
             arch: The underlying architecture.
              src: The source code to be converted into a data flow graph.
+                  This can be a list or a generator of SourceLine instances;
+                  lines are parsed one at a time while the graph is built.
           logger: The logger to be used.
            typing_hints: String-indexed dictionary mapping symbolic register names
                          to types. Types are members of the RegisterType enum from the
@@ -580,9 +724,9 @@ class DataFlowGraph:
 
         self.logger = logger
         self.config = config
-        self.src = self._parse_source(src)
+        self.src = []
 
-        self._build_graph()
+        self._build_graph(self._parse_source(src))
 
         if parsing_cb is True:
             self.apply_parsing_cbs()
@@ -618,7 +762,7 @@ class DataFlowGraph:
 
     def _parse_line(self, l):
         assert SourceLine.is_source_line(l)
-        insts = self.arch.Instruction.parser(l)
+        insts = DataFlowGraph.parse_cache.parse(self.arch, l)
         # Remember options from source line
         # TODO: Might not be the right place to remember options
         for inst in insts:
@@ -626,7 +770,7 @@ class DataFlowGraph:
         return (insts, l)
 
     def _parse_source(self, src):
-        return list(map(self._parse_line, SourceLine.reduce_source(src)))
+        return map(self._parse_line, SourceLine.reduce_source_iter(src))
 
     def iter_dependencies(self):
         """Returns an iterator over all dependencies in the data flow graph.
@@ -665,12 +809,12 @@ class DataFlowGraph:
                 # Check if we've been given a type hint
                 if name in self.config.typing_hints.keys():
                     exp_ty = self.config.typing_hints[name]
-                    self.logger.debug(f"   + type of {name} according to typing hints: {exp_ty}")
+                    self.logger.debug("   + type of %s according to typing hints: %s", name, exp_ty)
                     expectations.append((f"Typing hint: {exp_ty}", exp_ty))
 
                 exp_ty = self.arch.RegisterType.find_type(name)
                 if exp_ty is not None:
-                    self.logger.debug(f"   + type of {name} according to model: {exp_ty}")
+                    self.logger.debug("   + type of %s according to model: %s", name, exp_ty)
                     expectations.append((f"Model: {exp_ty}", exp_ty))
 
                 # Check if all our expectations match the type recorded in the
@@ -723,13 +867,27 @@ class DataFlowGraph:
             for i,v in enumerate(t.src_in_out):
                 t.inst.args_in_out[i] = v.reduce().name()
 
-    def _build_graph(self):
-        self.reg_state = {}
+    def _build_graph(self, src=None):
+        """Build the data flow graph
+
+        Args:
+            src: Optional iterator over the parsed source. If provided, lines are
+                 consumed one at a time and appended to self.src. Otherwise, the
+                 graph is rebuilt from self.src.
+        """
+        self.reg_state = RegisterState()
         self._typing_dict = {}
         self._nodes_all = []
+        self._num_instructions = 0
+
+        record = src is not None
+        if not record:
+            src = self.src
 
         # Process source and add one instruction a time to the data flow graph
-        for c,s in self.src:
+        for c,s in src:
+            if record:
+                self.src.append((c,s))
             self._add_node_from_candidates(c,s)
 
         # Mark inputs as outputs if desired
@@ -743,8 +901,10 @@ class DataFlowGraph:
                                              for ty in self.arch.RegisterType],
                                            f"<output:{out}>")
 
-        self.logger.debug("Dumping computational flow graph")
-        self.describe()
+        # Formatting the graph is costly, so skip it unless it is actually logged
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Dumping computational flow graph")
+            self.describe()
 
     def _add_node_from_candidates(self, candidates, sourceline):
         valid_candidates = list(filter(self._typecheck_node, candidates))
@@ -800,7 +960,7 @@ class DataFlowGraph:
 
             # Return a reference to the node producing the input
             origin = self.reg_state[name]
-            self.logger.debug(f"-> {name} has been produced by {origin}")
+            self.logger.debug("-> %s has been produced by %s", name, origin)
 
             if origin.get_type() != ty:
                 warnstr = f"Type mismatch: Output {name} of {type(origin.src.inst).__name__} has "\
@@ -824,12 +984,13 @@ class DataFlowGraph:
             s_id = f"output_{s.orig_reg}"
             orig_pos = None
         else:
-            s_id = len(self.nodes)
+            s_id = self._num_instructions
             orig_pos = s_id
+            self._num_instructions += 1
 
         step = ComputationNode(node_id=s_id, orig_pos=orig_pos, inst=s,
                                src_in=src_in, src_in_out=src_in_out)
-        step.reg_state = self.reg_state.copy()
+        step.reg_state = self.reg_state.snapshot()
 
         def change_reg_ref(reg, ref):
             self._remember_type(reg, ref.get_type())
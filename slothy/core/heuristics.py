@@ -35,12 +35,23 @@ smaller-sizes problems amenable to one-shot SLOTHY.
 
 import math
 import random
+import difflib
+from bisect import bisect_left
+
+from sympy import simplify
 
 from slothy.core.dataflow import DataFlowGraph as DFG
 from slothy.core.dataflow import Config as DFGConfig, ComputationNode
+from slothy.core.dataflow import DataFlowGraphException, SlothyUselessInstructionException
 from slothy.core.core import SlothyBase, Result, SlothyException
+from slothy.core.bounds import StaticBounds
 from slothy.helper import Permutation, SourceLine
 from slothy.helper import binary_search, BinarySearchLimitException
+from slothy.helper import parallel_binary_search, parallel_map, ForkedTask
+
+class DeadlineExceededException(SlothyException):
+    """The deadline of an optimization has been reached before finding a solution,
+    see Config.time_budget"""
 
 class Heuristics():
     """Break down large optimization problems into smaller ones.
@@ -55,13 +66,13 @@ class Heuristics():
 
         logger_name = logger.name.replace(".","_")
         last_successful = None
+        build_time = None
 
-        def try_with_stalls(stalls, timeout=None):
-            nonlocal last_successful
-
-            logger.info(f"Attempt optimization with max {stalls} stalls...")
+        def make_config(stalls, timeout=None):
             c = conf.copy()
             c.constraints.stalls_allowed = stalls
+            # Leave time for further attempts and the re-optimization for the objective
+            c.share_deadline(0.5)
 
             if c.hints.ext_bsearch_remember_successes:
                 c.hints.rename_hint_orig_rename = True
@@ -69,6 +80,17 @@ class Heuristics():
 
             if timeout is not None:
                 c.timeout = timeout
+            return c
+
+        def try_with_stalls(stalls, timeout=None):
+            nonlocal last_successful, build_time
+
+            # Don't start building a model that cannot be solved before the deadline
+            if Heuristics._time_insufficient(conf, build_time):
+                return False, None
+
+            logger.info(f"Attempt optimization with max {stalls} stalls...")
+            c = make_config(stalls, timeout=timeout)
             core = SlothyBase(conf.arch, conf.target, logger=logger, config=c)
 
             if last_successful is not None:
@@ -76,21 +98,97 @@ class Heuristics():
             else:
                 src = source
             success = core.optimize(src, **kwargs)
+            build_time = Heuristics._build_time(core) or build_time
 
             if success and c.hints.ext_bsearch_remember_successes:
                 last_successful = core.result.code
 
             return success, core
 
+        incremental_core = None
+        def try_with_stalls_incremental(stalls, timeout=None):
+            nonlocal incremental_core
+
+            if Heuristics._deadline_passed(conf):
+                return False, incremental_core
+
+            rebuild = incremental_core is None or \
+                stalls > incremental_core.config.constraints.stalls_allowed
+            if rebuild and Heuristics._time_insufficient(
+                    conf, Heuristics._build_time(incremental_core)):
+                return False, incremental_core
+
+            logger.info(f"Attempt optimization with max {stalls} stalls...")
+            if rebuild:
+                c = conf.copy()
+                c.variable_size = True
+                c.constraints.stalls_allowed = stalls
+                incremental_core = SlothyBase(conf.arch, conf.target, logger=logger, config=c)
+                incremental_core.build_incremental(source, **kwargs)
+
+            incremental_core.config.deadline = conf.deadline
+            incremental_core.config.share_deadline(0.5)
+            success = incremental_core.solve_with_stalls(stalls, timeout=timeout)
+            return success, incremental_core
+
+        def try_with_stalls_in_worker(stalls, timeout=None):
+            success, core = try_with_stalls(stalls, timeout=timeout)
+            if not success:
+                return False, None
+            return True, core.result.export_state()
+
+        search_kwargs = {
+            "minimum": conf.constraints.stalls_minimum_attempt - 1,
+            "start": max(conf.constraints.stalls_first_attempt,
+                         conf.constraints.stalls_minimum_attempt),
+            "threshold": conf.constraints.stalls_maximum_attempt,
+            "precision": conf.constraints.stalls_precision,
+            "timeout_below_precision": conf.constraints.stalls_timeout_below_precision }
+
+        workers = conf.constraints.stalls_parallel_workers
+        if workers > 1 and not ForkedTask.supported():
+            logger.warning("Parallel binary search is not supported on this platform "\
+                           "-- falling back to sequential search")
+            workers = 1
+
+        incremental = conf.hints.ext_bsearch_incremental
+        if workers > 1 and incremental:
+            logger.warning("Incremental binary search is not supported with parallel workers "\
+                           "-- ignoring ext_bsearch_incremental")
+            incremental = False
+
         try:
-            return binary_search(try_with_stalls,
-                minimum=conf.constraints.stalls_minimum_attempt - 1,
-                start=conf.constraints.stalls_first_attempt,
-                threshold=conf.constraints.stalls_maximum_attempt,
-                precision=conf.constraints.stalls_precision,
-                timeout_below_precision=conf.constraints.stalls_timeout_below_precision)
-
-        except BinarySearchLimitException:
+            if incremental:
+                min_stalls, core = binary_search(try_with_stalls_incremental, **search_kwargs)
+                # The model has been used for further unsuccessful attempts after
+                # finding the minimum. Solve again, hinted by the last solution,
+                # to restore the result and the stall bound. This is quick, so
+                # don't risk losing the solution to the deadline.
+                core.config.deadline = None
+                if not core.solve_with_stalls(min_stalls):
+                    raise SlothyException("Failed to reproduce solution with "\
+                                          f"{min_stalls} stalls")
+                return min_stalls, core
+
+            if workers == 1:
+                return binary_search(try_with_stalls, **search_kwargs)
+
+            logger.info(f"Parallel binary search with {workers} workers...")
+            min_stalls, state = parallel_binary_search(try_with_stalls_in_worker,
+                                                       workers, **search_kwargs)
+            # Adopt the result of the winning worker in this process,
+            # so that it can be re-optimized for a secondary objective.
+            core = SlothyBase(conf.arch, conf.target, logger=logger,
+                              config=make_config(min_stalls))
+            core.replay(source, state, **kwargs)
+            return min_stalls, core
+
+        except BinarySearchLimitException as e:
+            # Attempts may also have been skipped for lack of time
+            if Heuristics._time_insufficient(
+                    conf, build_time or Heuristics._build_time(incremental_core)):
+                raise DeadlineExceededException("Deadline reached without finding "\
+                                                "a working solution") from e
             logger.error("Exceeded stall limit without finding a working solution")
             logger.error("Here's what you asked me to optimize:")
 
@@ -105,6 +203,7 @@ class Heuristics():
                 f.write('\n'.join(source))
 
             logger.error(f"Stored this information in {err_file}")
+            raise SlothyException("No solution found") from e
 
     @staticmethod
     def optimize_binsearch(source, logger, conf, **kwargs):
@@ -128,10 +227,126 @@ class Heuristics():
             The Result object for the succceeding optimization with the smallest
             number of stalls.
         """
-        if conf.variable_size:
-            return Heuristics.optimize_binsearch_internal(source, logger, conf, **kwargs)
+        if conf.sw_pipelining.enabled and conf.sw_pipelining.modulo_scheduling:
+            return Heuristics._optimize_modulo(source, logger, conf, **kwargs)
+        if conf.draft:
+            return Heuristics._optimize_draft(source, logger, conf, **kwargs)
+
+        if conf.hints.list_schedule_hint and not conf.sw_pipelining.enabled:
+            draft = Heuristics._optimize_draft_or_none(source, logger, conf, **kwargs)
+            if draft is not None:
+                logger.info("List schedule has %d stalls -- using as first attempt",
+                            draft.stalls)
+                conf = conf.copy()
+                conf.constraints.stalls_first_attempt = draft.stalls
+
+        bounds = Heuristics._static_bounds(source, logger, conf)
+        if bounds is not None and bounds.stalls > conf.constraints.stalls_minimum_attempt:
+            logger.info("Skipping stall counts below static bound of %d stalls", bounds.stalls)
+            conf = conf.copy()
+            conf.constraints.stalls_minimum_attempt = bounds.stalls
+
+        if Heuristics._deadline_passed(conf):
+            return Heuristics._optimize_best_effort(source, logger, conf, **kwargs)
+
+        try:
+            if conf.variable_size:
+                res = Heuristics.optimize_binsearch_internal(source, logger, conf, **kwargs)
+            else:
+                res = Heuristics.optimize_binsearch_external(source, logger, conf, **kwargs)
+        except DeadlineExceededException:
+            return Heuristics._optimize_best_effort(source, logger, conf, **kwargs)
+
+        Heuristics._record_warm_start(res, logger, conf)
+
+        if bounds is not None and res is not None:
+            res.static_cycles_bound = bounds.cycles
+        return res
+
+    @staticmethod
+    def _record_warm_start(res, logger, conf):
+        """Remember the final result of a region for warm-starting later
+        optimizations of it, see Config.hints.warm_start"""
+        if res is None or not conf.hints.warm_start:
+            return
+        core = SlothyBase(conf.arch, conf.target, logger=logger, config=conf)
+        core.record_warm_start(res)
+
+    @staticmethod
+    def _optimize_draft_or_none(source, logger, conf, **kwargs):
+        c = conf.copy()
+        c.draft = True
+        core = SlothyBase(c.arch, c.target, logger=logger.getChild("draft"), config=c)
+        if not core.optimize(source, **kwargs):
+            return None
+        return core.result
+
+    @staticmethod
+    def _optimize_draft(source, logger, conf, **kwargs):
+        """Compute a draft schedule via list scheduling, see Config.draft"""
+        res = Heuristics._optimize_draft_or_none(source, logger, conf, **kwargs)
+        if res is None:
+            raise SlothyException("Draft optimization failed")
+        return res
+
+    @staticmethod
+    def _deadline_passed(conf):
+        return conf.remaining_time() == 0
 
-        return Heuristics.optimize_binsearch_external(source, logger, conf, **kwargs)
+    @staticmethod
+    def _time_insufficient(conf, build_time=None):
+        """Indicates whether the time remaining until the deadline is insufficient for
+        another attempt: Either the deadline has passed, or it is closer than the time
+        it took to build the previous constraint model, see Config.time_budget"""
+        remaining = conf.remaining_time()
+        if remaining is None:
+            return False
+        return remaining == 0 or (build_time is not None and remaining < build_time)
+
+    @staticmethod
+    def _build_time(core):
+        """The time it took to build the constraint model for the last result of the
+        given SlothyBase instance, or None if no model was built"""
+        if core is None or core.result is None or core.result.model_profile is None:
+            return None
+        return sum(p["time"] for p in core.result.model_profile.values())
+
+    @staticmethod
+    def _optimize_best_effort(source, logger, conf, **kwargs):
+        """Fallback if the deadline has been reached without finding a solution,
+        see Config.time_budget"""
+        if not conf.constraints.allow_reordering:
+            raise DeadlineExceededException("Deadline reached without finding a solution")
+        c = conf.copy()
+        if c.sw_pipelining.enabled:
+            logger.warning("Deadline reached without finding a solution "\
+                           "-- falling back to modulo scheduling")
+            c.sw_pipelining.modulo_scheduling = True
+            return Heuristics._optimize_modulo(source, logger, c, **kwargs)
+        logger.warning("Deadline reached without finding a solution "\
+                       "-- falling back to list scheduling")
+        return Heuristics._optimize_draft(source, logger, c, **kwargs)
+
+    @staticmethod
+    def _optimize_modulo(source, logger, conf, **kwargs):
+        """Compute the loop kernel via modulo scheduling,
+        see Config.sw_pipelining.modulo_scheduling"""
+        core = SlothyBase(conf.arch, conf.target, logger=logger, config=conf)
+        if not core.optimize(source, **kwargs):
+            raise SlothyException("Modulo scheduling failed")
+        return core.result
+
+    @staticmethod
+    def _static_bounds(source, logger, conf):
+        if not conf.constraints.stalls_static_bounds or conf.constraints.functional_only:
+            return None
+        try:
+            bounds = StaticBounds(source, logger.getChild("bounds"), conf)
+        except DataFlowGraphException as e:
+            logger.debug("Failed to compute static bounds: %s", e)
+            return None
+        bounds.log(logger.debug)
+        return bounds
 
     @staticmethod
     def _log_reoptimization_failure(log):
@@ -187,12 +402,22 @@ class Heuristics():
         if not conf.has_objective:
             return core.result
 
+        if Heuristics._deadline_passed(conf):
+            logger.warning("Deadline reached -- skipping re-optimization for objective")
+            return core.result
+
         logger.info("Optimize again with minimal number of %d stalls, with objective...",
             min_stalls)
         first_result = core.result
 
         core.config.ignore_objective = False
-        success = core.retry()
+        core.config.deadline = conf.deadline
+        if conf.hints.ext_bsearch_incremental and core.config.variable_size:
+            # Incremental search: The model allows for a variable number of stalls,
+            # so keep the stall count found fixed during re-optimization
+            success = core.retry(fix_stalls=core.result.stalls)
+        else:
+            success = core.retry()
 
         if not success:
             Heuristics._log_reoptimization_failure(logger)
@@ -220,18 +445,28 @@ class Heuristics():
 
         logger.info("Perform internal binary search for minimal number of stalls...")
 
-        start_attempt = conf.constraints.stalls_first_attempt
+        start_attempt = max(conf.constraints.stalls_first_attempt,
+                            conf.constraints.stalls_minimum_attempt)
         cur_attempt = start_attempt
+        build_time = None
 
         while True:
+            # Don't start building a model that cannot be solved before the deadline
+            if Heuristics._time_insufficient(conf, build_time):
+                raise DeadlineExceededException("Deadline reached without finding "\
+                                                "a working solution")
             c = conf.copy()
             c.variable_size = True
             c.constraints.stalls_allowed = cur_attempt
+            if conf.has_objective:
+                # Leave time for the re-optimization for the objective
+                c.share_deadline(0.5)
 
             logger.info("Attempt optimization with max %d stalls...", cur_attempt)
 
             core = SlothyBase(c.arch, c.target, logger=logger, config=c)
             success = core.optimize(source, **kwargs)
+            build_time = Heuristics._build_time(core) or build_time
 
             if success:
                 min_stalls = core.result.stalls
@@ -247,10 +482,15 @@ class Heuristics():
         if not conf.has_objective:
             return core.result
 
+        if Heuristics._deadline_passed(conf):
+            logger.warning("Deadline reached -- skipping re-optimization for objective")
+            return core.result
+
         logger.info("Optimize again with minimal number of %d stalls, with objective...",
             min_stalls)
         first_result = core.result
 
+        core.config.deadline = conf.deadline
         success = core.retry(fix_stalls=min_stalls)
         if not success:
             Heuristics._log_reoptimization_failure(logger)
@@ -292,6 +532,13 @@ class Heuristics():
             loop counter).
         """
 
+        modulo = conf.sw_pipelining.enabled and conf.sw_pipelining.modulo_scheduling
+        if conf.sw_pipelining.enabled and conf.draft and not modulo:
+            logger.warning("Draft mode does not support software pipelining "\
+                           "-- optimizing the loop body as straightline code")
+            conf = conf.copy()
+            conf.sw_pipelining.enabled = False
+
         if conf.sw_pipelining.enabled and not conf.inputs_are_outputs:
             Heuristics._log_input_output_warning(logger)
 
@@ -310,7 +557,7 @@ class Heuristics():
             res = Heuristics.linear( body, logger=logger, conf=conf)
             return [], res.code, [], 0
 
-        if conf.sw_pipelining.halving_heuristic:
+        if conf.sw_pipelining.halving_heuristic and not modulo:
             return Heuristics._periodic_halving( body, logger, conf)
 
         # 'Normal' software pipelining
@@ -323,6 +570,9 @@ class Heuristics():
         logger.debug("Optimize loop kernel...")
         c = conf.copy()
         c.inputs_are_outputs = True
+        if conf.sw_pipelining.optimize_preamble or conf.sw_pipelining.optimize_postamble:
+            # Leave time for preamble and postamble, which are smaller than the kernel
+            c.share_deadline(2/3)
         result = Heuristics.optimize_binsearch(body,logger.getChild("slothy"),c)
 
         conf.outputs = list(map(lambda o: result.output_renamings.get(o,o), conf.outputs))
@@ -341,6 +591,10 @@ class Heuristics():
             c = conf.copy()
             c.outputs = result.kernel_input_output
             c.sw_pipelining.enabled=False
+            if conf.sw_pipelining.optimize_postamble:
+                # Share the remaining time with the postamble, according to size
+                c.share_deadline((len(preamble) + 1) /
+                                 (len(preamble) + len(result.postamble) + 2))
             res_preamble = Heuristics.linear(preamble,conf=c, logger=logger.getChild("preamble"))
             preamble = res_preamble.code
 
@@ -382,12 +636,446 @@ class Heuristics():
         Heuristics._dump("Starting linear optimization...", body, logger)
 
         # So far, we only implement one heuristic: The splitting heuristic --
-        # If that's disabled, just forward to the core optimization
-        if not conf.split_heuristic:
+        # If that's disabled, just forward to the core optimization. Drafts
+        # are fast enough to not need it.
+        if not conf.split_heuristic or conf.draft:
             return Heuristics.optimize_binsearch(body,logger.getChild("slothy"), conf)
 
         return Heuristics._split(body, logger, conf)
 
+    @staticmethod
+    def _address_offsets(dfg):
+        """Compute the offsets of load/store instructions relative to the value of
+        their address register at the beginning of the code.
+
+        In contrast to the offsets in the instructions themselves, those are invariant
+        under the address fixup applied when reordering load/store instructions."""
+        offsets = {}
+        increments = {}
+        for t in dfg.nodes:
+            inst = t.inst
+            if not inst.is_load_store_instruction():
+                continue
+            base = increments.get(inst.addr, 0)
+            try:
+                if inst.increment is not None:
+                    increments[inst.addr] = base + int(simplify(inst.increment))
+                elif inst.pre_index is not None:
+                    offsets[t.id] = base + int(simplify(inst.pre_index))
+            except (TypeError, ValueError):
+                continue
+        return offsets
+
+    @staticmethod
+    def _instruction_template(inst, offset=None):
+        """The parsed fields of an instruction, such as its mnemonic, argument
+        types, datatype and immediates, with all register arguments abstracted away.
+        If the normalized address offset of a load/store instruction is provided,
+        it replaces the actual offset."""
+        # Register arguments are abstracted away, and the source line only
+        # carries comments and tags
+        ignored = { "source_line", "addr" }
+        if offset is not None:
+            # Architecture models store the offset of a load/store as pre_index,
+            # and possibly also as its immediate
+            ignored |= { "pre_index", "immediate" }
+        fields = tuple(sorted((k, repr(v)) for k, v in vars(inst).items()
+                              if k not in ignored and not k.startswith("args_")))
+        return (type(inst).__name__, fields, offset)
+
+    @staticmethod
+    def _node_signatures(dfg, input_sig):
+        """Compute structural signatures of the nodes of a data flow graph.
+
+        The signature of a node depends on its instruction, up to register
+        renaming, and the signatures of the nodes producing its inputs.
+        It is therefore invariant under reordering and register renaming.
+        The signature of virtual input nodes is given by input_sig()."""
+        sigs = {}
+        offsets = Heuristics._address_offsets(dfg)
+        for t in dfg.nodes_all:
+            if t.is_virtual_input:
+                sigs[t.id] = hash(("input", input_sig(t)))
+                continue
+            if t.is_virtual_output:
+                continue
+            srcs = tuple((sigs[s.src.id], type(s).__name__, s.idx)
+                         for s in t.src_in + t.src_in_out)
+            template = Heuristics._instruction_template(t.inst, offsets.get(t.id, None))
+            sigs[t.id] = hash((template, srcs))
+        return sigs
+
+    @staticmethod
+    def _match_inputs(dfg_a, dfg_b):
+        """Find the renaming of inputs between two data flow graphs which are
+        equivalent up to reordering and register renaming.
+
+        Only instructions whose signature is unique up to the naming of inputs
+        are used to infer the renaming, since they must correspond to each other.
+
+        Returns:
+            Dictionary mapping the inputs of dfg_a to those of dfg_b, or None
+            if the renaming could not be determined."""
+        def input_type(t):
+            return t.inst.arg_types_out[0]
+        sigs_a = Heuristics._node_signatures(dfg_a, input_type)
+        sigs_b = Heuristics._node_signatures(dfg_b, input_type)
+
+        def unique(dfg, sigs):
+            count = {}
+            for t in dfg.nodes:
+                count[sigs[t.id]] = count.get(sigs[t.id], 0) + 1
+            return { sigs[t.id] : t for t in dfg.nodes if count[sigs[t.id]] == 1 }
+        unique_b = unique(dfg_b, sigs_b)
+
+        renaming = {}
+        for sig, t in unique(dfg_a, sigs_a).items():
+            u = unique_b.get(sig, None)
+            if u is None:
+                continue
+            for s, v in zip(t.src_in + t.src_in_out, u.src_in + u.src_in_out):
+                if not s.src.is_virtual_input:
+                    continue
+                reg_a, reg_b = s.src.inst.orig_reg, v.src.inst.orig_reg
+                if renaming.setdefault(reg_a, reg_b) != reg_b:
+                    return None
+        if set(renaming.keys()) != dfg_a.inputs or \
+           set(renaming.values()) != dfg_b.inputs:
+            return None
+        return renaming
+
+    @staticmethod
+    def _match_nodes(dfg_a, dfg_b, renaming):
+        """Match the instructions of two data flow graphs which are equivalent
+        up to reordering and register renaming.
+
+        Args:
+            dfg_a: The first data flow graph
+            dfg_b: The second data flow graph
+            renaming: Dictionary mapping the inputs of dfg_a to those of dfg_b
+
+        Returns:
+            List mapping the index of every instruction in dfg_a to the index
+            of the corresponding instruction in dfg_b, or None if the graphs
+            could not be matched."""
+        sigs_a = Heuristics._node_signatures(dfg_a, lambda t: renaming[t.inst.orig_reg])
+        sigs_b = Heuristics._node_signatures(dfg_b, lambda t: t.inst.orig_reg)
+        by_sig = {}
+        for i, t in enumerate(dfg_b.nodes):
+            by_sig.setdefault(sigs_b[t.id], []).append(i)
+        for lst in by_sig.values():
+            lst.reverse()
+        res = []
+        for t in dfg_a.nodes:
+            lst = by_sig.get(sigs_a[t.id], [])
+            if len(lst) == 0:
+                return None
+            # Nodes with identical signatures compute the same value,
+            # so any pairing between them is fine.
+            res.append(lst.pop())
+        if any(len(lst) > 0 for lst in by_sig.values()):
+            return None
+        return res
+
+    @staticmethod
+    def _check_rewrite(orig, orig_conf, new, new_conf, mapping, renaming, logger):
+        """Check that `new` is a reordering and renaming of `orig`, where the
+        instruction at index i in `orig` is moved to index mapping[i] in `new`,
+        and the inputs and outputs of `orig` are renamed according to `renaming`."""
+        try:
+            dfg_orig = DFG(orig, logger.getChild("dfg_orig"), DFGConfig(orig_conf.copy()))
+            dfg_new  = DFG(new,  logger.getChild("dfg_new"),  DFGConfig(new_conf.copy()))
+        except (DataFlowGraphException, SlothyUselessInstructionException):
+            return False
+        if len(dfg_orig.nodes) != len(dfg_new.nodes):
+            return False
+        def remap(i):
+            if isinstance(i, int):
+                return mapping[i]
+            kind, reg = i.split("_", 1)
+            return f"{kind}_{renaming.get(reg, reg)}"
+        edges = { (remap(s), remap(d), lbl) for (s, d, lbl) in dfg_orig.edges() }
+        return edges == dfg_new.edges()
+
+    @staticmethod
+    def reoptimize(body, prev_body, prev_opt, logger, conf):
+        """Entrypoint for re-optimization of an edited version of previously
+        optimized straightline code.
+
+        The edit is computed as the difference between `prev_body` and `body`.
+        The edited instructions are translated into the register allocation of
+        the previous optimization result `prev_opt` and placed at the position
+        of the instructions they replace. Only a window of conf.reoptimize_window
+        instructions around the edit is then re-optimized, with the same number
+        of instructions beyond either side of the window taken into account but
+        locked in place, as for the split heuristic.
+
+        Args:
+            body: The assembly input to be optimized. This must be a list of
+                SourceLine objects.
+            prev_body: The previous version of the assembly input. This must be
+                a list of SourceLine objects.
+            prev_opt: The optimized version of prev_body, as previously
+                returned by SLOTHY. This must be a list of SourceLine objects.
+            logger: The logger to be used.
+            conf: The configuration to be applied. Software pipelining must be disabled.
+
+        Returns:
+            The optimized code as a list of SourceLine objects, or None if the
+            edit could not be applied to the previous optimization result. In this
+            case, the caller should fall back to optimizing the code from scratch.
+        """
+        # pylint:disable=too-many-locals,too-many-branches,too-many-statements
+        assert SourceLine.is_source(body)
+        if conf.sw_pipelining.enabled:
+            raise SlothyException("Re-optimization should only be called "
+                                  "with SW pipelining disabled")
+
+        log = logger.getChild("reoptimize")
+
+        body      = SourceLine.reduce_source(body)
+        prev_body = SourceLine.reduce_source(prev_body)
+        prev_opt  = SourceLine.reduce_source(prev_opt)
+
+        dfgc = DFGConfig(conf.copy())
+        try:
+            dfg_new  = DFG(body,      log.getChild("dfg_new"),  dfgc)
+            dfg_prev = DFG(prev_body, log.getChild("dfg_prev"), dfgc)
+            dfg_opt  = DFG(prev_opt,  log.getChild("dfg_opt"),  dfgc)
+        except (DataFlowGraphException, SlothyUselessInstructionException) as e:
+            log.warning("Failed to build data flow graphs: %s", e)
+            return None
+
+        if len(dfg_new.nodes)  != len(body)     or \
+           len(dfg_prev.nodes) != len(prev_body) or \
+           len(dfg_opt.nodes)  != len(prev_opt):
+            log.warning("Source lines do not match instructions -- cannot re-optimize")
+            return None
+
+        # Find the renaming of inputs applied by the previous optimization
+        if dfg_prev.inputs == dfg_opt.inputs:
+            renaming = { reg : reg for reg in dfg_prev.inputs }
+        else:
+            renaming = Heuristics._match_inputs(dfg_prev, dfg_opt)
+            if renaming is None:
+                log.warning("Could not determine renaming of inputs in previous "\
+                            "optimization -- cannot re-optimize")
+                return None
+
+        # Locate the instructions of the previous source in the previous optimization result
+        prev_to_opt = Heuristics._match_nodes(dfg_prev, dfg_opt, renaming)
+        if prev_to_opt is None:
+            log.warning("Previous optimization result does not match previous source "\
+                        "-- cannot re-optimize")
+            return None
+
+        # Compute the edit from the previous to the current source
+        matcher = difflib.SequenceMatcher(None, [ l.text for l in prev_body ],
+                                          [ l.text for l in body ], autojunk=False)
+        new_to_prev = {}
+        blocks = []
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                new_to_prev.update(zip(range(j1, j2), range(i1, i2)))
+                continue
+            blocks.append((i1, i2, j1, j2))
+
+        # Unchanged instructions whose inputs are now produced by different
+        # instructions need to be re-allocated as well
+        idx_new  = { t.id : j for j, t in enumerate(dfg_new.nodes) }
+        idx_prev = { t.id : i for i, t in enumerate(dfg_prev.nodes) }
+        def same_source(s, v):
+            if type(s) is not type(v) or s.idx != v.idx:
+                return False
+            if s.src.is_virtual_input or v.src.is_virtual_input:
+                return s.src.is_virtual_input and v.src.is_virtual_input and \
+                    s.src.inst.orig_reg == v.src.inst.orig_reg
+            return new_to_prev.get(idx_new[s.src.id], None) == idx_prev[v.src.id]
+        rewired = []
+        changed_prev = [ i for (i1, i2, _, _) in blocks for i in range(i1, i2) ]
+        changed_new  = [ j for (_, _, j1, j2) in blocks for j in range(j1, j2) ]
+        for j, i in new_to_prev.items():
+            t, u = dfg_new.nodes[j], dfg_prev.nodes[i]
+            if not all(map(same_source, t.src_in + t.src_in_out, u.src_in + u.src_in_out)):
+                rewired.append((i, i + 1, j, j + 1))
+        for (_, _, j, _) in rewired:
+            del new_to_prev[j]
+        blocks = sorted(blocks + rewired, key=lambda b: b[2])
+
+        new_to_opt = { j : prev_to_opt[i] for j, i in new_to_prev.items() }
+        rewired_to_opt = { j : prev_to_opt[i] for (i, _, j, _) in rewired }
+        removed = { prev_to_opt[i] for (i1, i2, _, _) in blocks for i in range(i1, i2) }
+
+        if len(blocks) == 0:
+            log.info("Source unchanged -- reusing previous optimization")
+            return prev_opt
+
+        edited = [ j for (_, _, j1, j2) in blocks for j in range(j1, j2) ]
+        log.info("Re-optimizing %d edited and %d removed instructions",
+                 len(edited), len(removed))
+
+        # Instructions adjusting addresses may require offset fixups of other
+        # instructions, which are not applied when translating the edit. Rewired
+        # instructions are fine as long as they stay in place.
+        def adjusts_address(inst):
+            return getattr(inst, "increment", None) is not None
+        def addr_of(inst):
+            if not inst.is_load_store_instruction():
+                return None
+            return getattr(inst, "addr", None)
+        adjusted = { addr_of(t.inst) for t in dfg_new.nodes + dfg_prev.nodes
+                     if adjusts_address(t.inst) }
+        adjusted.discard(None)
+        if any(addr_of(dfg_new.nodes[j].inst) in adjusted for j in changed_new) or \
+           any(addr_of(dfg_prev.nodes[i].inst) in adjusted for i in changed_prev):
+            log.warning("Edit involves address adjustments -- cannot re-optimize")
+            return None
+        pinned = { j for j in rewired_to_opt if addr_of(dfg_new.nodes[j].inst) in adjusted }
+
+        # Find register names required by unchanged consumers of edited instructions
+        nodes_new = dfg_new.nodes
+        edited_ids = { nodes_new[j].id for j in edited }
+        demands = {}
+        for t in dfg_new.nodes_all:
+            if t.id in edited_ids or t.is_virtual_input:
+                continue
+            if t.is_virtual_output:
+                args_in, args_in_out = [ renaming.get(t.inst.orig_reg, t.inst.orig_reg) ], []
+            else:
+                o = dfg_opt.nodes[new_to_opt[idx_new[t.id]]].inst
+                args_in, args_in_out = o.args_in, o.args_in_out
+            for s, reg in zip(t.src_in + t.src_in_out, args_in + args_in_out):
+                r = s.reduce()
+                if r.src.id in edited_ids:
+                    demands.setdefault((r.src.id, r.idx), set()).add(reg)
+
+        # Translate edited instructions into the register allocation of the
+        # previous optimization result
+        typing_hints = {}
+        names = {}
+        def name_of(r):
+            if r.src.is_virtual_input:
+                return renaming.get(r.src.inst.orig_reg, r.src.inst.orig_reg)
+            if r.src.id in edited_ids:
+                return names[(r.src.id, r.idx)]
+            return dfg_opt.nodes[new_to_opt[idx_new[r.src.id]]].inst.args_out[r.idx]
+
+        # Rewired instructions keep the text of the previous optimization result,
+        # which may differ from the source in the address offset
+        lines = {}
+        for j in edited:
+            t = nodes_new[j]
+            u = dfg_opt.nodes[rewired_to_opt[j]] if j in rewired_to_opt else t
+            for i, s in enumerate(t.src_in):
+                u.inst.args_in[i] = name_of(s.reduce())
+            for i, s in enumerate(t.src_in_out):
+                u.inst.args_in_out[i] = name_of(s.reduce())
+            for i, ty in enumerate(t.inst.arg_types_out):
+                regs = demands.get((t.id, i), set())
+                if len(regs) > 1:
+                    log.warning("Conflicting register demands for %s -- cannot re-optimize", t)
+                    return None
+                if len(regs) == 1:
+                    reg = regs.pop()
+                else:
+                    reg = f"reopt_{j}_{i}"
+                    typing_hints[reg] = ty
+                names[(t.id, i)] = reg
+                u.inst.args_out[i] = reg
+            lines[j] = u.to_source_line()
+
+        # Inputs and outputs are named as in the previous optimization result
+        c = conf.copy()
+        c.typing_hints = { **c.typing_hints, **typing_hints }
+        c.outputs = { renaming.get(reg, reg) for reg in dfg_new.outputs }
+        c.inputs_are_outputs = False
+
+        def splice(early):
+            """Place edited instructions right after the instructions they depend on
+            if `early` is set, and otherwise at the position of the instructions they
+            replace, but after the instructions they depend on."""
+            keys = {}
+            def key_of(t):
+                if t.id in edited_ids:
+                    return keys[t.id]
+                return (new_to_opt[idx_new[t.id]], 0, 0)
+
+            for i1, i2, j1, j2 in blocks:
+                spots = sorted(prev_to_opt[i] for i in range(i1, i2))
+                if len(spots) == 0:
+                    spots = [ prev_to_opt[i1 - 1] if i1 > 0 else -1 ]
+                for m, j in enumerate(range(j1, j2)):
+                    t = nodes_new[j]
+                    key = (-1 if early else spots[min(m, len(spots) - 1)], 1, j)
+                    for s in t.src_in + t.src_in_out:
+                        if s.src.is_virtual_input:
+                            continue
+                        key = max(key, (key_of(s.src)[0], 1, j))
+                    if j in pinned and key[0] != rewired_to_opt[j]:
+                        return None
+                    keys[t.id] = key
+
+            placed = [ ((o, 0, 0), l, None) for o, l in enumerate(prev_opt)
+                       if o not in removed ]
+            placed += [ (keys[nodes_new[j].id], lines[j], j) for j in edited ]
+            placed.sort(key=lambda x: x[0])
+
+            opt_to_placed = { key[0] : idx for idx, (key, _, j) in enumerate(placed)
+                              if j is None }
+            mapping = { j : opt_to_placed[o] for j, o in new_to_opt.items() }
+            mapping.update({ j : idx for idx, (_, _, j) in enumerate(placed) if j is not None })
+            return placed, mapping
+
+        for early in [False, True]:
+            spliced = splice(early)
+            if spliced is None:
+                continue
+            placed, mapping = spliced
+            spliced = [ l for (_, l, _) in placed ]
+            if Heuristics._check_rewrite(body, conf, spliced, c, mapping, renaming,
+                                         log.getChild("check_splice")):
+                break
+        else:
+            log.warning("Edit cannot be applied to previous optimization result "\
+                        "-- cannot re-optimize")
+            return None
+
+        # Re-optimize a window around the edit
+        idxs = [ idx for idx, (_, _, j) in enumerate(placed) if j is not None ]
+        idxs += [ bisect_left([ key for (key, _, _) in placed ], (o, 0, 0)) for o in removed ]
+        window = conf.reoptimize_window
+        start_idx = max(0, min(idxs) - window)
+        end_idx   = min(len(spliced), max(idxs) + 1 + window)
+        prefix_len = min(start_idx, window)
+        suffix_len = min(len(spliced) - end_idx, window)
+
+        try:
+            res = Heuristics.optimize_chunk(spliced, start_idx, end_idx, prefix_len,
+                                            suffix_len, log, c)
+        except SlothyException as e:
+            log.warning("Failed to re-optimize window: %s", e)
+            return None
+
+        chunk_start = start_idx - prefix_len
+        chunk_end   = end_idx + suffix_len
+        new_body = spliced[:chunk_start] + SourceLine.reduce_source(res.code) + \
+            spliced[chunk_end:]
+
+        def remap(idx):
+            if chunk_start <= idx < chunk_end:
+                return chunk_start + res.reordering[idx - chunk_start]
+            return idx
+        mapping = { j : remap(idx) for j, idx in mapping.items() }
+
+        if not Heuristics._check_rewrite(body, conf, new_body, c, mapping, renaming,
+                                         log.getChild("check")):
+            log.warning("Re-optimized code failed selfcheck -- cannot re-optimize")
+            return None
+
+        log.info("Re-optimized window [%d:%d] of %d instructions",
+                 chunk_start, chunk_end, len(new_body))
+        return new_body
+
     @staticmethod
     def _naive_reordering(body, logger, conf, use_latency_depth=False):
 
@@ -558,6 +1246,53 @@ class Heuristics():
         ssa = [ ComputationNode.to_source_line(t) for t in dfg.nodes ]
         return ssa
 
+    @staticmethod
+    def optimize_chunk(body, start_idx, end_idx, prefix_len, suffix_len, logger, conf):
+        """Optimizes the chunk body[start_idx:end_idx] of a snippet, keeping the rest
+        of the snippet intact. Input/output register names of the chunk stay intact.
+
+        Args:
+            body: The snippet containing the chunk. Must be a list of SourceLine instances.
+            start_idx: Index of the first instruction of the chunk
+            end_idx: Index of the first instruction following the chunk
+            prefix_len: Number of instructions preceding the chunk which should be
+                included in the optimization, but locked in place.
+            suffix_len: Number of instructions following the chunk which should be
+                included in the optimization, but locked in place.
+            logger: The logger to be used
+            conf: The configuration to apply
+
+        Returns:
+            The Result object for the chunk, including prefix and suffix.
+        """
+
+        cur_pre  = body[:start_idx - prefix_len]
+        cur_body = body[start_idx - prefix_len:end_idx + suffix_len]
+        cur_post = body[end_idx + suffix_len:]
+
+        Heuristics._dump(f"Optimizing chunk [{start_idx}-{prefix_len}:{end_idx}+{suffix_len}]",
+            cur_body, logger)
+        if prefix_len > 0:
+            Heuristics._dump("Using prefix", cur_body[:prefix_len], logger)
+        if suffix_len > 0:
+            Heuristics._dump("Using suffix", cur_body[-suffix_len:], logger)
+
+        # Find dependencies of rest of body
+
+        dfgc = DFGConfig(conf.copy())
+        dfgc.outputs = set(dfgc.outputs).union(conf.outputs)
+        cur_outputs = DFG(cur_post, logger.getChild("dfg_infer_outputs"),dfgc).inputs
+
+        c = conf.copy()
+        c.rename_inputs  = { "other" : "static" } # No renaming
+        c.rename_outputs = { "other" : "static" } # No renaming
+        c.inputs_are_outputs = False
+        c.outputs = cur_outputs
+
+        return Heuristics.optimize_binsearch(cur_body,
+            logger.getChild(f"{start_idx}_{end_idx}"), c,
+            prefix_len=prefix_len, suffix_len=suffix_len)
+
     @staticmethod
     def _split_inner(body, logger, conf, ssa=False):
 
@@ -615,80 +1350,226 @@ class Heuristics():
                 :i+math.ceil(chunk_len/2)]) for i in range(l) ]
             print_intarr(stalls_cumulative,l)
 
-        def optimize_chunk(start_idx, end_idx, body, stalls,show_stalls=True):
+        def chunk_extent(start_idx, end_idx, body):
+            """Returns the number of prefix and suffix instructions to be included
+            in the optimization of the given chunk."""
+            if not conf.split_heuristic_optimize_seam:
+                return 0, 0
+            prefix_len = min(start_idx, conf.split_heuristic_optimize_seam)
+            suffix_len = min(len(body) - end_idx, conf.split_heuristic_optimize_seam)
+            return prefix_len, suffix_len
+
+        def solve_chunk(start_idx, end_idx, body, c):
             """Optimizes a sub-chunks of the given snippet, delimited by pairs
             of start and end indices provided as arguments. Input/output register
-            names stay intact -- in particular, overlapping chunks are allowed."""
-
-            cur_pre  = body[:start_idx]
-            cur_body = body[start_idx:end_idx]
-            cur_post = body[end_idx:]
+            names stay intact -- in particular, overlapping chunks are allowed.
 
-            if not conf.split_heuristic_optimize_seam:
-                prefix_len = 0
-                suffix_len = 0
-            else:
-                prefix_len = min(len(cur_pre), conf.split_heuristic_optimize_seam)
-                suffix_len = min(len(cur_post), conf.split_heuristic_optimize_seam)
-                cur_prefix = cur_pre[-prefix_len:] if prefix_len > 0 else []
-                cur_suffix = cur_post[:suffix_len]
-                cur_body = cur_prefix + cur_body + cur_suffix
-                cur_pre = cur_pre[:-prefix_len] if prefix_len > 0 else cur_pre
-                cur_post = cur_post[suffix_len:]
-
-            pre_pad = len(cur_pre)
-            post_pad = len(cur_post)
-
-            Heuristics._dump(f"Optimizing chunk [{start_idx}-{prefix_len}:{end_idx}+{suffix_len}]",
-                cur_body, log)
-            if prefix_len > 0:
-                Heuristics._dump("Using prefix", cur_prefix, log)
-            if suffix_len > 0:
-                Heuristics._dump("Using suffix", cur_suffix, log)
-
-            # Find dependencies of rest of body
+            Returns the optimized code for the chunk, including prefix and suffix,
+            its reordering, and its stall positions."""
 
-            dfgc = DFGConfig(conf.copy())
-            dfgc.outputs = set(dfgc.outputs).union(conf.outputs)
-            cur_outputs = DFG(cur_post, log.getChild("dfg_infer_outputs"),dfgc).inputs
+            prefix_len, suffix_len = chunk_extent(start_idx, end_idx, body)
 
-            c = conf.copy()
-            c.rename_inputs  = { "other" : "static" } # No renaming
-            c.rename_outputs = { "other" : "static" } # No renaming
-            c.inputs_are_outputs = False
-            c.outputs = cur_outputs
-
-            result = Heuristics.optimize_binsearch(cur_body,
-                log.getChild(f"{start_idx}_{end_idx}"), c,
-                prefix_len=prefix_len, suffix_len=suffix_len)
+            try:
+                result = Heuristics.optimize_chunk(body, start_idx, end_idx,
+                    prefix_len, suffix_len, log, c)
+            except DeadlineExceededException:
+                log.warning(f"Deadline reached -- keeping chunk [{start_idx}:{end_idx}] as is")
+                chunk = body[start_idx - prefix_len:end_idx + suffix_len]
+                return SourceLine.reduce_source(chunk), \
+                    Permutation.permutation_id(len(chunk)), []
             Heuristics._dump(f"New chunk [{start_idx}:{end_idx}]", result.code, log)
-            new_body = cur_pre + SourceLine.reduce_source(result.code) + cur_post
 
-            perm = Permutation.permutation_pad(result.reordering, pre_pad, post_pad)
+            return SourceLine.reduce_source(result.code), result.reordering, \
+                result.stall_positions
+
+        def apply_chunk(start_idx, end_idx, body, stalls, solved, show_stalls=True):
+            """Splices the result of solve_chunk() back into the snippet."""
+            new_chunk, reordering, stall_positions = solved
+            prefix_len, suffix_len = chunk_extent(start_idx, end_idx, body)
+
+            cur_pre  = body[:start_idx - prefix_len]
+            cur_post = body[end_idx + suffix_len:]
+            new_body = cur_pre + new_chunk + cur_post
+
+            perm = Permutation.permutation_pad(reordering, len(cur_pre), len(cur_post))
 
             keep_stalls = { i for i in stalls if i < start_idx - prefix_len or
                 i >= end_idx + suffix_len }
             new_stalls = keep_stalls.union(map(lambda i: i + start_idx - prefix_len,
-                                                    result.stall_positions))
+                                                    stall_positions))
 
             if show_stalls:
                 print_stalls(new_stalls,l)
 
-            return new_body, new_stalls, len(result.stall_positions), perm
+            return new_body, new_stalls, len(stall_positions), perm
+
+        def make_waves(start_end_idx_lst, body, in_order=False):
+            """Partitions a list of chunks into waves of pairwise non-overlapping chunks.
+
+            Every chunk is placed in the wave following the last wave containing an
+            earlier chunk it overlaps with. Chunks within a wave are independent, and
+            processing the waves in order yields the same code as processing the
+            chunks one by one. Chunks may run ahead of earlier chunks, though, so
+            aborting after a chunk does not undo later chunks from earlier waves.
+
+            If in_order is set, waves are consecutive runs of chunks instead, so
+            that every chunk is processed after all earlier chunks. This is needed
+            to abort after a chunk exactly as the sequential loop does."""
+            extents = []
+            waves = []
+            for start_idx, end_idx in start_end_idx_lst:
+                prefix_len, suffix_len = chunk_extent(start_idx, end_idx, body)
+                ext = (start_idx - prefix_len, end_idx + suffix_len)
+                wave_idx = 1 + max((w for (w, (s, e)) in extents
+                                    if s < ext[1] and ext[0] < e), default=-1)
+                if in_order:
+                    wave_idx = max(wave_idx, len(waves) - 1)
+                extents.append((wave_idx, ext))
+                if wave_idx == len(waves):
+                    waves.append([])
+                waves[wave_idx].append((start_idx, end_idx))
+            return waves
 
         def optimize_chunks_many(start_end_idx_lst, body, stalls,
                                  abort_stall_threshold_high=None,
                                  abort_stall_threshold_low=None,
                                  **kwargs):
             perm = Permutation.permutation_id(len(body))
-            for start_idx, end_idx in start_end_idx_lst:
-                body, stalls, cur_stalls, local_perm = optimize_chunk(start_idx, end_idx, body,
-                                                                      stalls, **kwargs)
-                perm = Permutation.permutation_comp(local_perm, perm)
-                if abort_stall_threshold_high is not None and cur_stalls > abort_stall_threshold_high:
+
+            workers = conf.split_heuristic_parallel_workers
+            if workers > 1 and ForkedTask.supported():
+                # Chunks must not run ahead of a chunk after which we might abort
+                aborting = abort_stall_threshold_high is not None or \
+                           abort_stall_threshold_low is not None
+                waves = make_waves(start_end_idx_lst, body, in_order=aborting)
+                log.info(f"Optimizing {len(start_end_idx_lst)} chunks in {len(waves)} waves "\
+                         f"using {workers} workers")
+            else:
+                waves = [ [ idxs ] for idxs in start_end_idx_lst ]
+
+            nonlocal chunks_left
+            for wave in waves:
+                if Heuristics._deadline_passed(conf):
+                    log.warning("Deadline reached -- skipping remaining chunks")
+                    return body, stalls, perm
+                # Chunks solved concurrently can use the same time
+                c = conf.copy()
+                c.share_deadline(min(workers, len(wave)) / max(1, chunks_left))
+                chunks_left -= len(wave)
+                def solve(idxs, body=body, c=c):
+                    return solve_chunk(*idxs, body, c)
+                wave_solved = parallel_map(solve, wave, workers)
+                # Apply results in the original chunk order. Since waves are in order
+                # when aborting, the results of the remaining chunks of the wave are
+                # dropped on abort, as if chunks had been optimized one by one.
+                for (start_idx, end_idx), solved in zip(wave, wave_solved):
+                    body, stalls, cur_stalls, local_perm = apply_chunk(start_idx, end_idx,
+                                                                      body, stalls, solved,
+                                                                      **kwargs)
+                    perm = Permutation.permutation_comp(local_perm, perm)
+                    if abort_stall_threshold_high is not None and \
+                       cur_stalls > abort_stall_threshold_high:
+                        return body, stalls, perm
+                    if abort_stall_threshold_low is not None and \
+                       cur_stalls < abort_stall_threshold_low:
+                        return body, stalls, perm
+            return body, stalls, perm
+
+        def optimize_chunks_adaptive(body, stalls, max_calls):
+            """Optimizes the windows with the highest stall density first, as indicated
+            by the current stall map, until no window with stalls is left or the budget
+            of max_calls solver invocations on base-sized windows is used up.
+
+            A window whose optimization does not reduce the number of stalls is set
+            aside. Only once no other window with stalls is left, windows set aside
+            are retried, grown around their center, up to twice the base window size.
+            A grown window is charged against the budget according to its size."""
+            perm = Permutation.permutation_id(len(body))
+            base_len = max(1, math.ceil(l / split_factor))
+            max_len = min(l, 2 * base_len)
+
+            def count_stalls(start_idx, end_idx):
+                return sum(1 for i in stalls if start_idx <= i < end_idx)
+
+            def densest_window(skip):
+                # Stalls in regions which have been given up on or set aside don't count
+                stalls_arr = [ int(i in stalls and i not in skip) for i in range(l) ]
+                best, best_start = 0, None
+                for start_idx in range(l - base_len + 1):
+                    cur = sum(stalls_arr[start_idx:start_idx + base_len])
+                    if cur > best:
+                        best, best_start = cur, start_idx
+                return best_start
+
+            def grow(start_idx, end_idx):
+                cur_len = min(max_len, int(1.5 * (end_idx - start_idx)) + 1)
+                center = (start_idx + end_idx) // 2
+                new_start = max(0, min(center - cur_len // 2, l - cur_len))
+                return new_start, new_start + cur_len
+
+            def cost(start_idx, end_idx):
+                return math.ceil((end_idx - start_idx) / base_len)
+
+            def next_window():
+                aside = { i for (s, e) in failed for i in range(s, e) }
+                start_idx = densest_window(done.union(aside))
+                if start_idx is not None:
+                    return start_idx, start_idx + base_len
+                # Retry the window set aside with the most stalls, grown
+                failed.sort(key=lambda w: count_stalls(*w))
+                while len(failed) > 0:
+                    start_idx, end_idx = failed.pop()
+                    if count_stalls(start_idx, end_idx) > 0:
+                        return grow(start_idx, end_idx)
+                return None
+
+            nonlocal chunks_left
+            done = set()
+            failed = []
+            calls = 0
+            invocations = 0
+            while calls < max_calls:
+                if Heuristics._deadline_passed(conf):
+                    log.warning("Deadline reached -- skipping remaining windows")
                     break
-                if abort_stall_threshold_low is not None and cur_stalls < abort_stall_threshold_low:
+                window = next_window()
+                if window is None:
+                    log.info("No window with stalls left")
                     break
+                start_idx, end_idx = window
+                cur_cost = cost(start_idx, end_idx)
+                if calls + cur_cost > max_calls:
+                    log.info("Budget exhausted for window [%d:%d]", start_idx, end_idx)
+                    break
+
+                c = conf.copy()
+                c.share_deadline(cur_cost / max(1, chunks_left))
+                chunks_left -= cur_cost
+                calls += cur_cost
+                invocations += 1
+
+                prefix_len, suffix_len = chunk_extent(start_idx, end_idx, body)
+                old_stalls = count_stalls(start_idx - prefix_len, end_idx + suffix_len)
+                solved = solve_chunk(start_idx, end_idx, body, c)
+                new_stalls = len(solved[2])
+                log.info(f"Window [{start_idx}:{end_idx}]: {old_stalls} -> {new_stalls} stalls")
+
+                if new_stalls <= old_stalls:
+                    body, stalls, _, local_perm = apply_chunk(start_idx, end_idx,
+                                                              body, stalls, solved)
+                    perm = Permutation.permutation_comp(local_perm, perm)
+
+                if new_stalls >= old_stalls:
+                    if end_idx - start_idx < max_len:
+                        failed.append(window)
+                    else:
+                        done.update(range(start_idx, end_idx))
+
+            log.info(f"Adaptive round: {invocations} solver calls worth {calls} base windows, "\
+                     f"compared to {max_calls} solver calls with fixed windows")
+
+            # Solver calls not made here no longer need a share of the remaining time
+            chunks_left -= max_calls - calls
             return body, stalls, perm
 
         cur_body = body
@@ -713,9 +1594,34 @@ class Heuristics():
             idx_lst = list(filter(not_empty, idx_lst))
             return idx_lst
 
+        def make_idx_list_repeat(increment):
+            if conf.split_heuristic_chunks:
+                start_pos = [ x[0] for x in conf.split_heuristic_chunks ]
+                end_pos   = [ x[1] for x in conf.split_heuristic_chunks ]
+                idx_lst = zip(Heuristics._idxs_from_fractions(start_pos, cur_body),
+                              Heuristics._idxs_from_fractions(end_pos, cur_body))
+                def not_empty(x):
+                    return x[0] != x[1]
+                idx_lst = list(filter(not_empty, idx_lst))
+            else:
+                idx_lst = make_idx_list_consecutive(split_factor, increment)
+                if conf.split_heuristic_bottom_to_top is True:
+                    idx_lst.reverse()
+            return idx_lst
+
         stalls = set()
         increment = 1 / split_factor
 
+        if conf.split_heuristic_stepsize is None:
+            repeat_increment = 1 / (2*split_factor)
+        else:
+            repeat_increment = conf.split_heuristic_stepsize
+
+        # Number of chunks still to be optimized, for sharing the time until the deadline
+        chunks_left = conf.split_heuristic_repeat * len(make_idx_list_repeat(repeat_increment))
+        if conf.split_heuristic_repeat > 0:
+            chunks_left += len(make_idx_list_consecutive(split_factor, increment))
+
         # First, do a 'dry run' solely for finding the initial 'stall map'
         if conf.split_heuristic_repeat > 0:
             orig_conf = conf.copy()
@@ -728,10 +1634,7 @@ class Heuristics():
             log.info("Initial stalls")
             print_stalls(stalls,l)
 
-        if conf.split_heuristic_stepsize is None:
-            increment = 1 / (2*split_factor)
-        else:
-            increment = conf.split_heuristic_stepsize
+        increment = repeat_increment
 
         # Remember inputs and outputs
         dfgc = DFGConfig(conf.copy())
@@ -741,21 +1644,13 @@ class Heuristics():
         for _ in range(conf.split_heuristic_repeat):
 
             cur_body = SourceLine.reduce_source(cur_body)
+            idx_lst = make_idx_list_repeat(increment)
 
-            if conf.split_heuristic_chunks:
-                start_pos = [ x[0] for x in conf.split_heuristic_chunks ]
-                end_pos   = [ x[1] for x in conf.split_heuristic_chunks ]
-                idx_lst = zip(Heuristics._idxs_from_fractions(start_pos, cur_body),
-                              Heuristics._idxs_from_fractions(end_pos, cur_body))
-                def not_empty(x):
-                    return x[0] != x[1]
-                idx_lst = list(filter(not_empty, idx_lst))
+            if conf.split_heuristic_adaptive:
+                cur_body, stalls, local_perm = optimize_chunks_adaptive(cur_body, stalls,
+                                                                        len(idx_lst))
             else:
-                idx_lst = make_idx_list_consecutive(split_factor, increment)
-                if conf.split_heuristic_bottom_to_top is True:
-                    idx_lst.reverse()
-
-            cur_body, stalls, local_perm = optimize_chunks_many(idx_lst, cur_body, stalls,
+                cur_body, stalls, local_perm = optimize_chunks_many(idx_lst, cur_body, stalls,
                                abort_stall_threshold_high=conf.split_heuristic_abort_cycle_at_high,
                                abort_stall_threshold_low=conf.split_heuristic_abort_cycle_at_low)
             perm = Permutation.permutation_comp(local_perm, perm)
@@ -854,7 +1749,10 @@ class Heuristics():
         c.outputs = c.outputs.union(kernel_deps)
 
         if not conf.sw_pipelining.halving_heuristic_split_only:
-            res_halving_0 = Heuristics.linear(body,logger.getChild("slothy"),conf=c)
+            # Leave time for the second phase
+            c0 = c.copy()
+            c0.share_deadline(0.5)
+            res_halving_0 = Heuristics.linear(body,logger.getChild("slothy"),conf=c0)
 
             # Split resulting kernel as [A;B] and synthesize result structure
             # as if SW pipelining has been used and the result would have been
@@ -0,0 +1,509 @@
+#
+# Copyright (c) 2024 Arm Limited
+# Copyright (c) 2024 Hanno Becker
+# SPDX-License-Identifier: MIT
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Author: Hanno Becker <hannobecker@posteo.de>
+#
+
+"""
+Greedy list scheduling of straight-line code
+
+This is a fast, heuristic alternative to the constraint model in slothy.core.core:
+Instructions are placed cycle by cycle in order of their critical path length,
+subject to latencies, functional units, the issue rate and the availability of
+registers, and outputs are allocated to registers greedily.
+
+The resulting schedule honors the same constraints as the SLOTHY model, except
+for further microarchitecture-specific constraints registered by the target via
+add_further_constraints(). It is generally not optimal.
+"""
+
+import math
+
+from slothy.core.dataflow import InstructionInOut
+
+class ListSchedulingException(Exception):
+    """The list scheduler failed to find a schedule, e.g. because
+    it ran out of registers"""
+
+class ListScheduler:
+    """List scheduler for the data flow graph of a straight-line piece of code
+
+    After ListScheduler.schedule(), the following fields describe the schedule:
+
+    - positions: Dictionary mapping the ID of every instruction to its position
+      in program order, including issue slots left empty.
+    - cycles: Dictionary mapping the ID of every instruction to the cycle it is
+      issued in.
+    - allocation: Dictionary mapping the ID of every node, including virtual
+      input nodes, to the list of registers allocated to its outputs.
+    - num_cycles: The total number of cycles, in the sense of SLOTHY's model.
+    """
+
+    def __init__(self, tree, config, logger, candidates, ordering):
+        """Create a list scheduler
+
+        Args:
+            tree: The data flow graph of the code to be scheduled.
+            config: The configuration to apply. Software pipelining must be disabled.
+            logger: The logger to use.
+            candidates: Function mapping a node and the index of one of its outputs
+                to the list of registers which the output may be allocated to.
+            ordering: List of pairs (t0,t1) of nodes whose relative order must be
+                preserved.
+        """
+        self.tree = tree
+        self.config = config
+        self.logger = logger
+        self.arch = config.arch
+        self.target = config.target
+        self._candidates = candidates
+        self._ordering = ordering
+
+        self.positions = None
+        self.cycles = None
+        self.allocation = None
+        self.num_cycles = None
+
+    # Values are identified by their producing node and output index, and
+    # include the chain of input/output arguments overwriting them.
+
+    @staticmethod
+    def _value_of(src):
+        src = src.reduce()
+        return (src.src.id, src.idx)
+
+    @staticmethod
+    def _segment_of(src):
+        return (src.src.id, isinstance(src, InstructionInOut), src.idx)
+
+    def _get_latency(self, src, t):
+        if self.config.constraints.functional_only or \
+           not self.config.constraints.model_latencies:
+            return 0
+        latency = self.target.get_latency(src.src.inst, src.idx, t.inst)
+        # If the target offers an alternative constraint, use the plain latency
+        if not isinstance(latency, int):
+            latency = latency[0]
+        return max(latency, 0)
+
+    def _get_units(self, t):
+        # Mirrors SlothyBase._add_variables_functional_units(): A single list of
+        # units is occupied at once, while otherwise one of the units is chosen.
+        if self.config.constraints.functional_only or \
+           not self.config.constraints.model_functional_units:
+            return 0, []
+        cycles = self.target.get_inverse_throughput(t.inst)
+        units = self.target.get_units(t.inst)
+        if len(units) == 1:
+            if isinstance(units[0], list):
+                return cycles, [ units[0] ]
+            return cycles, [ units ]
+        choices = []
+        for unit_choices in units:
+            if not isinstance(unit_choices, list):
+                unit_choices = [unit_choices]
+            choices += [ [unit] for unit in unit_choices ]
+        return cycles, choices
+
+    def _setup_values(self):
+        self._nodes_by_id = { t.id : t for t in self.tree.nodes_all }
+        self._allowed = {}
+        self._value_type = {}
+        self._consumers = {}
+        # Consumers of the individual outputs and input/outputs of a node,
+        # before the value is overwritten by the next input/output argument.
+        self._segment_consumers = {}
+        self._segment_inout_consumers = {}
+
+        for t in self.tree.nodes_all:
+            for idx, ty in enumerate(t.inst.arg_types_out):
+                v = (t.id, idx)
+                self._allowed[v] = list(self._candidates(t, idx))
+                self._value_type[v] = ty
+                self._consumers[v] = set()
+
+        def restrict(v, restriction):
+            if restriction is None:
+                return
+            self._allowed[v] = [ r for r in self._allowed[v] if r in restriction ]
+
+        for t in self.tree.nodes_all:
+            for src, restriction in zip(t.src_in, t.inst.args_in_restrictions):
+                v = self._value_of(src)
+                self._consumers[v].add(t.id)
+                self._segment_consumers.setdefault(self._segment_of(src), set()).add(t.id)
+                restrict(v, restriction)
+            for src, restriction in zip(t.src_in_out, t.inst.args_in_out_restrictions):
+                v = self._value_of(src)
+                self._consumers[v].add(t.id)
+                self._segment_consumers.setdefault(self._segment_of(src), set()).add(t.id)
+                self._segment_inout_consumers.setdefault(self._segment_of(src), []).append(t.id)
+                restrict(v, restriction)
+
+        for v, allowed in self._allowed.items():
+            if len(allowed) == 0:
+                raise ListSchedulingException(f"No register available for {v}")
+
+        # Restrictions on combinations of registers, such as consecutive registers
+        self._groups = []
+        self._groups_of = { v : [] for v in self._allowed }
+        for t in self.tree.nodes_all:
+            combinations = [
+                (t.inst.args_out_combinations, [ (t.id, i) for i in range(t.inst.num_out) ]),
+                (t.inst.args_in_combinations, list(map(self._value_of, t.src_in))),
+                (t.inst.args_in_out_combinations, list(map(self._value_of, t.src_in_out))) ]
+            for combs, values in combinations:
+                if combs is None:
+                    continue
+                for idx_lst, valid_combinations in combs:
+                    group = { "values" : [ values[i] for i in idx_lst ],
+                              "combinations" : valid_combinations,
+                              "choice" : None }
+                    self._groups.append(group)
+                    for v in group["values"]:
+                        self._groups_of[v].append(group)
+
+    def _setup_dependencies(self):
+        nodes = self.tree.nodes
+        self._preds = { t.id : [] for t in nodes }
+        self._succs = { t.id : [] for t in nodes }
+
+        # Data dependencies
+        for t in nodes:
+            for src in t.src_in + t.src_in_out:
+                if src.src.is_virtual:
+                    continue
+                self._add_edge(src.src.id, t.id, self._get_latency(src, t))
+
+        # An input/output argument overwrites its input, so all other
+        # consumers of the input need to come first
+        real = { t.id for t in nodes }
+        for seg, inout_consumers in self._segment_inout_consumers.items():
+            for t1 in inout_consumers:
+                for t0 in self._segment_consumers[seg]:
+                    if t0 != t1 and t0 in real and t1 in real:
+                        self._add_edge(t0, t1, None)
+
+        for t0, t1 in self._ordering:
+            self._add_edge(t0.id, t1.id, None)
+
+    def _add_edge(self, t0, t1, latency):
+        """Force t1 to come after t0, with a latency in cycles, or None
+        if only the order in the program matters."""
+        if t0 == t1:
+            return
+        self._preds[t1].append((t0, latency))
+        self._succs[t0].append((t1, latency))
+
+    def _count_pinned(self):
+        # Values whose register is fixed need to be placed in their original order,
+        # and the registers can't be used for other values in the meantime.
+        self._pinned = {}
+        for v, allowed in self._allowed.items():
+            if len(allowed) != 1 or self._nodes_by_id[v[0]].is_virtual_input:
+                continue
+            self._pinned.setdefault(allowed[0], []).append(v)
+        self._pinned_pending = { reg : len(values) for reg, values in self._pinned.items() }
+
+    def _add_pinned_ordering(self):
+        def orig_pos(v):
+            t = self._nodes_by_id[v[0]]
+            return -1 if t.is_virtual_input else t.orig_pos
+
+        real = { t.id for t in self.tree.nodes }
+        for reg, values in self._pinned.items():
+            inputs = [ v for v, r in self._register_of.items() if r == reg ]
+            values = sorted(inputs + values, key=orig_pos)
+            for v0, v1 in zip(values, values[1:]):
+                if any(c not in real for c in self._consumers[v0]):
+                    raise ListSchedulingException(
+                        f"Register {reg} needed for {v1} holds global output {v0}")
+                preds = set(self._consumers[v0])
+                if v0[0] in real:
+                    preds.add(v0[0])
+                preds.discard(v1[0])
+                for t0 in preds:
+                    self._add_edge(t0, v1[0], None)
+
+    def _setup_priorities(self):
+        # Length of the critical path from every instruction to the end
+        self._height = {}
+        for t in reversed(self.tree.nodes):
+            self._height[t.id] = max((self._height[s] + (lat or 0)
+                                      for (s, lat) in self._succs[t.id]), default=0)
+
+    # Register allocation
+
+    def _is_available(self, reg, v, freed):
+        if reg in self._live and reg not in freed:
+            return False
+        if self._reserved.get(reg, v) != v:
+            return False
+        pinned = len(self._allowed[v]) == 1
+        if not pinned and self._pinned_pending.get(reg, 0) > 0:
+            return False
+        return True
+
+    def _preference(self, v):
+        # Prefer the original register name, if possible
+        t = self._nodes_by_id[v[0]]
+        orig = t.inst.args_out[v[1]]
+        allowed = self._allowed[v]
+        if orig in allowed:
+            return [orig] + [ r for r in allowed if r != orig ]
+        return allowed
+
+    def _choose_group(self, group, v, reg, freed, taken):
+        values = group["values"]
+        for comb in group["combinations"]:
+            ok = True
+            for w, r in zip(values, comb):
+                if w == v:
+                    ok = r == reg
+                elif w in self._register_of:
+                    ok = self._register_of[w] == r
+                else:
+                    ok = r in self._allowed[w] and r not in taken and \
+                         self._is_available(r, w, freed)
+                if not ok:
+                    break
+            if ok:
+                return comb
+        return None
+
+    def _find_register(self, v, freed, taken, exclude):
+        """Find a register for value v, returning the register and the choices
+        for combination groups it participates in, or None."""
+        for reg in self._preference(v):
+            if reg in taken or reg in exclude or not self._is_available(reg, v, freed):
+                continue
+            choices = []
+            for group in self._groups_of[v]:
+                if group["choice"] is not None:
+                    comb = group["choice"]
+                    if comb[group["values"].index(v)] != reg:
+                        break
+                    continue
+                comb = self._choose_group(group, v, reg, freed, taken)
+                if comb is None:
+                    break
+                choices.append((group, comb))
+            else:
+                return reg, choices
+        return None
+
+    def _allocate(self, t, freed):
+        """Find registers for all outputs of t, or None if that's not possible."""
+        regs = []
+        choices = []
+        taken = set()
+        for idx in range(t.inst.num_out):
+            exclude = set()
+            for (idx_out, idx_in) in (t.inst.args_in_out_different or []):
+                if idx_out == idx:
+                    exclude.add(self._register_of[self._value_of(t.src_in[idx_in])])
+            res = self._find_register((t.id, idx), freed, taken, exclude)
+            if res is None:
+                return None
+            reg, cur_choices = res
+            regs.append(reg)
+            choices += cur_choices
+            taken.add(reg)
+        for (idx_inout, idx_in) in (t.inst.args_in_inout_different or []):
+            if self._register_of[self._value_of(t.src_in_out[idx_inout])] == \
+               self._register_of[self._value_of(t.src_in[idx_in])]:
+                return None
+        return regs, choices
+
+    def _commit(self, t, regs, choices):
+        for idx, reg in enumerate(regs):
+            v = (t.id, idx)
+            self._register_of[v] = reg
+            self._live[reg] = v
+            if self._reserved.get(reg, None) == v:
+                del self._reserved[reg]
+            if len(self._allowed[v]) == 1 and v[0] in self._preds:
+                self._pinned_pending[reg] -= 1
+        for group, comb in choices:
+            group["choice"] = comb
+            for w, r in zip(group["values"], comb):
+                if w not in self._register_of:
+                    self._reserved[r] = w
+
+    def _values_freed_by(self, t):
+        """The registers which become available when t is scheduled"""
+        freed = set()
+        for src in t.src_in + t.src_in_out:
+            v = self._value_of(src)
+            if self._remaining[v] == { t.id }:
+                freed.add(self._register_of[v])
+        return freed
+
+    def _release(self, t):
+        for src in t.src_in + t.src_in_out:
+            v = self._value_of(src)
+            self._remaining[v].discard(t.id)
+            if len(self._remaining[v]) == 0 and self._live.get(self._register_of[v]) == v:
+                del self._live[self._register_of[v]]
+
+    def _release_unused(self, t):
+        for idx in range(t.inst.num_out):
+            v = (t.id, idx)
+            if len(self._remaining[v]) == 0 and self._live.get(self._register_of[v]) == v:
+                del self._live[self._register_of[v]]
+
+    def _allocate_inputs(self):
+        self._register_of = {}
+        self._live = {}
+        self._reserved = {}
+        self._remaining = { v : set(c) for v, c in self._consumers.items() }
+
+        # Inputs with a fixed register first
+        inputs = sorted(self.tree.nodes_input, key=lambda t: len(self._allowed[(t.id, 0)]))
+        for t in inputs:
+            res = self._allocate(t, set())
+            if res is None:
+                raise ListSchedulingException(f"Could not allocate register for input {t}")
+            self._commit(t, *res)
+
+        # Inputs which are also outputs need to keep their register
+        if self.config.inputs_are_outputs:
+            outputs = { t.inst.orig_reg : t for t in self.tree.nodes_output }
+            for t in self.tree.nodes_input:
+                t_out = outputs.get(t.inst.orig_reg, None)
+                if t_out is None:
+                    raise ListSchedulingException(
+                        f"Could not find matching output for input {t.inst.orig_reg}")
+                v = self._value_of(t_out.src_in[0])
+                reg = self._register_of[(t.id, 0)]
+                if v in self._register_of:
+                    if self._register_of[v] != reg:
+                        raise ListSchedulingException(f"Output {t.inst.orig_reg} needs "\
+                            f"to stay in {reg}, but is passed through from another input")
+                    continue
+                if reg not in self._allowed[v]:
+                    raise ListSchedulingException(f"Output {t.inst.orig_reg} can't be "\
+                        f"allocated to input register {reg}")
+                self._allowed[v] = [reg]
+
+    # Scheduling
+
+    def schedule(self):
+        """Compute a schedule
+
+        Raises:
+            ListSchedulingException: If no schedule could be found.
+
+        Returns:
+            The scheduler itself, with the fields describing the schedule set."""
+        issue_rate = self.target.issue_rate
+        nodes = self.tree.nodes
+
+        self._setup_values()
+        self._setup_dependencies()
+        self._count_pinned()
+        self._allocate_inputs()
+        # Allocating the inputs may have fixed the registers of further outputs
+        self._count_pinned()
+        self._add_pinned_ordering()
+        self._setup_priorities()
+
+        self.positions = {}
+        self.cycles = {}
+        unit_free = {}
+        unit_end = 0
+        pending = { t.id : t for t in nodes }
+        num_preds = { t.id : len(self._preds[t.id]) for t in nodes }
+        earliest = { t.id : 0 for t in nodes }
+        ready = [ t.id for t in nodes if num_preds[t.id] == 0 ]
+        max_idle = 16 + max((lat or 0 for t in nodes for (_, lat) in self._succs[t.id]),
+                            default=0)
+        max_idle += max((self._get_units(t)[0] for t in nodes), default=0)
+
+        cycle = 0
+        idle = 0
+        while len(pending) > 0:
+            progress = False
+            for slot in range(issue_rate):
+                best = None
+                for tid in ready:
+                    if earliest[tid] > cycle:
+                        continue
+                    t = pending[tid]
+                    occupancy, unit_choices = self._get_units(t)
+                    choice = next((units for units in unit_choices
+                                   if all(unit_free.get(u, 0) <= cycle for u in units)), None)
+                    if len(unit_choices) > 0 and choice is None:
+                        continue
+                    freed = self._values_freed_by(t)
+                    res = self._allocate(t, freed)
+                    if res is None:
+                        continue
+                    # Under register pressure, prefer instructions freeing registers
+                    pressure = len(res[0]) > len(freed) and self._low_on_registers(t)
+                    key = (pressure, -self._height[tid], t.orig_pos)
+                    if best is None or key < best[0]:
+                        best = (key, t, res, choice, occupancy)
+                if best is None:
+                    break
+                _, t, res, choice, occupancy = best
+                tid = t.id
+                self.positions[tid] = cycle * issue_rate + slot
+                self.cycles[tid] = cycle
+                for u in choice or []:
+                    unit_free[u] = cycle + occupancy
+                    unit_end = max(unit_end, cycle + occupancy)
+                self._release(t)
+                self._commit(t, *res)
+                self._release_unused(t)
+                del pending[tid]
+                ready.remove(tid)
+                for (s, lat) in self._succs[tid]:
+                    num_preds[s] -= 1
+                    if lat is not None:
+                        earliest[s] = max(earliest[s], cycle + lat)
+                    if num_preds[s] == 0:
+                        ready.append(s)
+                progress = True
+            idle = 0 if progress else idle + 1
+            if idle > max_idle:
+                raise ListSchedulingException("No progress in list scheduling -- "\
+                    f"{len(pending)} instructions left, live registers {self._live}")
+            cycle += 1
+
+        min_cycles = math.ceil(len(nodes) / issue_rate)
+        last_cycle = max(self.cycles.values(), default=-1)
+        self.num_cycles = max(min_cycles, last_cycle + 1, unit_end - 1)
+        self.allocation = { t.id : [ self._register_of[(t.id, i)]
+                                     for i in range(t.inst.num_out) ]
+                            for t in self.tree.nodes_all }
+        self.logger.debug("List schedule: %d cycles", self.num_cycles)
+        return self
+
+    def _low_on_registers(self, t):
+        for idx, ty in enumerate(t.inst.arg_types_out):
+            allowed = self._allowed[(t.id, idx)]
+            free = [ r for r in allowed if r not in self._live ]
+            if len(free) <= 2 and self.arch.RegisterType.is_renamed(ty):
+                return True
+        return False
@@ -0,0 +1,600 @@
+#
+# Copyright (c) 2024 Arm Limited
+# Copyright (c) 2024 Hanno Becker
+# SPDX-License-Identifier: MIT
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Author: Hanno Becker <hannobecker@posteo.de>
+#
+
+"""
+Iterative modulo scheduling of loop bodies
+
+This is an alternative to software pipelining via the constraint model in
+slothy.core.core, which considers two copies of the loop body and thus
+becomes impractical for large loops. Here, a single copy of the loop body is
+scheduled for a fixed initiation interval, using modulo reservation tables
+for the issue slots and execution units, following Rau's iterative modulo
+scheduling. Registers are then allocated on the circular timeline of the
+loop kernel.
+
+As for the constraint model, every instruction is either early, core or late,
+so a schedule spans at most three iterations. Registers are not rotated, so
+every value needs to die before the instruction producing it is executed again.
+
+Further microarchitecture-specific constraints registered by the target via
+add_further_constraints() are not taken into account.
+"""
+
+import heapq
+import math
+
+from slothy.core.list_scheduling import ListScheduler, ListSchedulingException
+
+class ModuloSchedulingException(ListSchedulingException):
+    """The modulo scheduler failed to find a schedule"""
+
+class ModuloScheduler(ListScheduler):
+    """Iterative modulo scheduler for the data flow graph of a loop body
+
+    After ModuloScheduler.schedule(), the following fields describe the schedule:
+
+    - ii: The initiation interval, that is, the number of cycles of the kernel.
+    - positions: Dictionary mapping the ID of every instruction to its position
+      in the kernel, including issue slots left empty.
+    - cycles: Dictionary mapping the ID of every instruction to the cycle in
+      the kernel it is issued in.
+    - stages: Dictionary mapping the ID of every instruction to a triple of
+      Booleans indicating whether it is an early, core, or late instruction.
+    - allocation: Dictionary mapping the ID of every node, including virtual
+      input nodes, to the list of registers allocated to its outputs.
+    - num_cycles: Same as ii.
+    """
+
+    # Number of instruction placements per instruction before giving up
+    # on an initiation interval, cf. Rau's BudgetRatio
+    BUDGET_RATIO = 6
+
+    def __init__(self, tree, config, logger, candidates, ordering):
+        """Create a modulo scheduler
+
+        Args:
+            tree: The data flow graph of a single copy of the loop body.
+                Inputs must be outputs, see Config.inputs_are_outputs.
+            config: The configuration to apply.
+            logger: The logger to use.
+            candidates: Function mapping a node and the index of one of its outputs
+                to the list of registers which the output may be allocated to.
+            ordering: List of triples (t0,t1,distance) of nodes such that t1 needs to
+                come after t0 from `distance` iterations before.
+        """
+        super().__init__(tree, config, logger, candidates, ordering)
+        self.ii = None
+        self.stages = None
+
+    # Dependencies are triples (node, latency, distance): The target of the
+    # dependency must not be issued before `latency` cycles after the source
+    # from `distance` iterations before, and must come after it in program order.
+    # If the latency is None, only the order in the program matters.
+
+    def _add_edge(self, t0, t1, latency, distance=0):
+        if t0 == t1 and distance == 0:
+            return
+        self._preds[t1].append((t0, latency, distance))
+        self._succs[t0].append((t1, latency, distance))
+
+    def _real(self, tid):
+        return tid in self._preds
+
+    def _segments(self, v):
+        """The chain of segments of a value: Pairs of the node writing the
+        segment (None for global inputs) and the segment."""
+        t = self._nodes_by_id[v[0]]
+        seg = (t.id, False, v[1])
+        res = [ (None if t.is_virtual_input else t.id, seg) ]
+        while seg in self._segment_inout_consumers:
+            w = self._segment_inout_consumers[seg]
+            if len(w) > 1:
+                raise ModuloSchedulingException(f"Segment {seg} overwritten twice")
+            wt = self._nodes_by_id[w[0]]
+            idx = next(i for i, src in enumerate(wt.src_in_out) if self._segment_of(src) == seg)
+            seg = (wt.id, True, idx)
+            res.append((wt.id, seg))
+        return res
+
+    def _readers(self, seg):
+        return [ r for r in self._segment_consumers.get(seg, []) if self._real(r) ]
+
+    def _setup_dependencies(self):
+        nodes = self.tree.nodes
+        self._preds = { t.id : [] for t in nodes }
+        self._succs = { t.id : [] for t in nodes }
+
+        # Data dependencies within an iteration. Those between iterations
+        # are added along with the register allocation, see _allocate_fixed().
+        self._segment_src = {}
+        for t in self.tree.nodes_all:
+            for src in t.src_in + t.src_in_out:
+                self._segment_src[self._segment_of(src)] = src
+                if t.is_virtual or src.src.is_virtual:
+                    continue
+                self._add_edge(src.src.id, t.id, self._get_latency(src, t))
+
+        for t0, t1, distance in self._ordering:
+            self._add_edge(t0.id, t1.id, None, distance)
+
+    def _add_timeline_edges(self, values, loop_carried):
+        """Add dependencies for a list of values which share a register, in the order
+        they occupy it within an iteration. If loop_carried is set, the first value is
+        a global input which the last value overwrites for the next iteration."""
+        segments = [ s for v in values for s in self._segments(v) ]
+        writers = [ (w, seg) for (w, seg) in segments if w is not None ]
+        if len(writers) == 0:
+            return
+
+        # Within an iteration, segments are overwritten in order
+        for (_, seg0), (w1, _) in zip(segments, segments[1:]):
+            if w1 is None:
+                raise ModuloSchedulingException(f"Global input {seg0} is not the first "\
+                                                "value in its register")
+            for r in self._readers(seg0):
+                self._add_edge(r, w1, None)
+        for (w0, _), (w1, _) in zip(writers, writers[1:]):
+            self._add_edge(w0, w1, None)
+
+        # Across iterations: The last value needs to die before the first is written
+        # again, and is the input to the next iteration if the register is loop-carried.
+        first, (last, last_seg) = writers[0][0], writers[-1]
+        for r in self._readers(last_seg):
+            self._add_edge(r, first, None, 1)
+        self._add_edge(last, first, None, 1)
+        if not loop_carried:
+            return
+        src = self._segment_src[last_seg]
+        for r in self._readers(segments[0][1]):
+            self._add_edge(last, r, self._get_latency(src, self._nodes_by_id[r]), 1)
+
+    def _reaches_output(self, v):
+        return any(self._nodes_by_id[c].is_virtual_output for c in self._consumers[v])
+
+    def _allocate_fixed(self):
+        """Allocate registers which are occupied throughout the loop: Those of
+        global inputs and outputs, and those of values which can only use a single
+        register. Add dependencies ensuring they are used in order."""
+        self._register_of = {}
+        self._fixed = {}
+
+        def assign(values, reg):
+            for v in values:
+                self._register_of[v] = reg
+            self._fixed.setdefault(reg, []).extend(values)
+
+        # Global inputs need to stay in the register of the matching output
+        inputs = { t.inst.orig_reg : t for t in self.tree.nodes_input }
+        groups = []
+        # The order of the outputs depends on set iteration order, so sort
+        # them to make the allocation independent of the hash seed
+        for t_out in sorted(self.tree.nodes_output, key=lambda t: t.inst.orig_reg):
+            values = []
+            t_in = inputs.pop(t_out.inst.orig_reg, None)
+            if t_in is not None:
+                values.append((t_in.id, 0))
+            v = self._value_of(t_out.src_in[0])
+            if v not in values:
+                values.append(v)
+            groups.append(values)
+        if len(inputs) > 0:
+            raise ModuloSchedulingException(f"Inputs {list(inputs)} are not outputs")
+
+        def allowed(values):
+            regs = self._preference(values[0])
+            for v in values[1:]:
+                regs = [ r for r in regs if r in self._allowed[v] ]
+            return regs
+
+        groups.sort(key=lambda values: len(allowed(values)))
+        for values in groups:
+            free = [ r for r in allowed(values) if r not in self._fixed ]
+            if len(free) == 0:
+                raise ModuloSchedulingException(f"No register available for {values}")
+            assign(values, free[0])
+
+        for v, regs in self._allowed.items():
+            if len(regs) == 1 and v not in self._register_of:
+                assign([v], regs[0])
+
+        def order(v):
+            t = self._nodes_by_id[v[0]]
+            return -1 if t.is_virtual_input else t.orig_pos
+
+        for reg, values in self._fixed.items():
+            values.sort(key=order)
+            for v in values[:-1]:
+                if self._reaches_output(v):
+                    raise ModuloSchedulingException(
+                        f"Register {reg} needed for {values[-1]} holds global output {v}")
+            loop_carried = self._nodes_by_id[values[0][0]].is_virtual_input and \
+                self._reaches_output(values[-1])
+            self._add_timeline_edges(values, loop_carried)
+
+        # All other values need to die before they are produced again
+        for v in self._allowed:
+            if v not in self._register_of and not self._nodes_by_id[v[0]].is_virtual:
+                self._add_timeline_edges([v], False)
+
+    # Scheduling
+
+    def _violates(self, t0, t1, latency, distance):
+        ii = self._ii
+        p = ii * self.target.issue_rate
+        if self._pos[t1] + distance * p <= self._pos[t0]:
+            return True
+        return latency is not None and \
+            self._time[t1] + distance * ii < self._time[t0] + latency
+
+    def _compute_heights(self, ii):
+        nodes = self.tree.nodes
+        height = { t.id : 0 for t in nodes }
+        for _ in range(len(nodes) + 1):
+            changed = False
+            for t in reversed(nodes):
+                for (s, lat, dist) in self._succs[t.id]:
+                    h = height[s] + (lat or 0) - dist * ii
+                    if h > height[t.id]:
+                        height[t.id] = h
+                        changed = True
+            if not changed:
+                return height
+        return None
+
+    def _rec_mii(self, lower):
+        """Smallest initiation interval not below `lower` respecting all
+        dependencies between iterations"""
+        def feasible(ii):
+            if ii < 0:
+                return False
+            return self._compute_heights(ii) is not None
+        high = max(lower, 1)
+        while not feasible(high):
+            high *= 2
+        low = lower - 1
+        while high - low > 1:
+            mid = (low + high) // 2
+            if feasible(mid):
+                high = mid
+            else:
+                low = mid
+        return high
+
+    def _res_mii(self):
+        occupancy = {}
+        for t in self.tree.nodes:
+            cycles, unit_choices = self._get_units(t)
+            if len(unit_choices) == 1:
+                for u in unit_choices[0]:
+                    occupancy[u] = occupancy.get(u, 0) + cycles
+        return max(occupancy.values(), default=0)
+
+    def _stage_labels(self):
+        sw = self.config.sw_pipelining
+        labels = []
+        if sw.allow_pre:
+            labels.append("pre")
+        labels.append("core")
+        if sw.allow_post:
+            labels.append("post")
+        return labels
+
+    def _allowed_labels(self, t):
+        sw = self.config.sw_pipelining
+        allowed = set(self._stage_labels())
+        for label in ["pre", "core", "post"]:
+            force = t.inst.source_line.tags.get(label, None)
+            if force is True:
+                allowed &= { label }
+            elif force is False:
+                allowed.discard(label)
+        if sw.max_pre < 1.0 and sw.max_pre < t.orig_pos / len(self.tree.nodes) < 1:
+            allowed.discard("pre")
+        return allowed
+
+    def _place(self, tid, time, slot, units, occupancy):
+        ii = self._ii
+        row = time % ii
+        self._time[tid] = time
+        self._pos[tid] = time * self.target.issue_rate + slot
+        self._slots[(row, slot)] = tid
+        self._units_of[tid] = (units, occupancy)
+        for u in units:
+            for k in range(occupancy):
+                self._unit_table[(u, (row + k) % ii)] = tid
+
+    def _unplace(self, tid):
+        ii = self._ii
+        time = self._time.pop(tid)
+        pos = self._pos.pop(tid)
+        row = time % ii
+        del self._slots[(row, pos % self.target.issue_rate)]
+        units, occupancy = self._units_of.pop(tid)
+        for u in units:
+            for k in range(occupancy):
+                del self._unit_table[(u, (row + k) % ii)]
+        heapq.heappush(self._queue, (-self._height[tid], self._nodes_by_id[tid].orig_pos, tid))
+
+    def _earliest(self, tid):
+        ii = self._ii
+        p = ii * self.target.issue_rate
+        time, pos = 0, 0
+        for (s, lat, dist) in self._preds[tid]:
+            if s not in self._time:
+                continue
+            if lat is not None:
+                time = max(time, self._time[s] + lat - dist * ii)
+            pos = max(pos, self._pos[s] - dist * p + 1)
+        return time, pos
+
+    def _slots_at(self, time, pos):
+        ir = self.target.issue_rate
+        return [ s for s in range(ir) if time * ir + s >= pos ]
+
+    def _time_ok(self, tid, time, occupancy, max_time):
+        if time > max_time:
+            return False
+        # The functional units need to be freed at the end of the kernel's
+        # second copy in the constraint model
+        if time % self._ii + occupancy > self._ii + 1:
+            return False
+        return self._labels[time // self._ii] in self._allowed_labels_of[tid]
+
+    def _attempt(self, ii, labels):
+        self._ii = ii
+        self._labels = labels
+        nodes = self.tree.nodes
+        max_time = len(labels) * ii - 1
+        self._time, self._pos = {}, {}
+        self._slots, self._unit_table, self._units_of = {}, {}, {}
+        last_time = {}
+
+        for t in nodes:
+            if len(self._allowed_labels_of[t.id] & set(labels)) == 0:
+                return False
+            for (s, lat, dist) in self._succs[t.id]:
+                if s == t.id and lat is not None and lat > dist * ii:
+                    return False
+
+        self._height = self._compute_heights(ii)
+        if self._height is None:
+            return False
+        self._queue = [ (-self._height[t.id], t.orig_pos, t.id) for t in nodes ]
+        heapq.heapify(self._queue)
+
+        budget = self.BUDGET_RATIO * len(nodes)
+        while len(self._queue) > 0:
+            _, _, tid = heapq.heappop(self._queue)
+            if tid in self._time:
+                continue
+            if budget == 0:
+                return False
+            budget -= 1
+            t = self._nodes_by_id[tid]
+            occupancy, unit_choices = self._get_units(t)
+            min_time, min_pos = self._earliest(tid)
+            min_time = max(min_time, min_pos // self.target.issue_rate)
+
+            placement = None
+            for time in range(min_time, min_time + ii):
+                if not self._time_ok(tid, time, occupancy, max_time):
+                    continue
+                row = time % ii
+                slot = next((s for s in self._slots_at(time, min_pos)
+                             if (row, s) not in self._slots), None)
+                if slot is None:
+                    continue
+                units = next((us for us in unit_choices
+                              if all((u, (row + k) % ii) not in self._unit_table
+                                     for u in us for k in range(occupancy))), None)
+                if len(unit_choices) > 0 and units is None:
+                    continue
+                placement = (time, slot, units or [])
+                break
+
+            if placement is None:
+                # Place anyway, evicting conflicting instructions
+                time = max(min_time, last_time.get(tid, -1) + 1)
+                while time <= max_time and (not self._time_ok(tid, time, occupancy, max_time)
+                                            or len(self._slots_at(time, min_pos)) == 0):
+                    time += 1
+                if time > max_time:
+                    return False
+                row = time % ii
+                slot = self._slots_at(time, min_pos)[0]
+                units = unit_choices[0] if len(unit_choices) > 0 else []
+                evict = { self._slots.get((row, slot), None) }
+                evict |= { self._unit_table.get((u, (row + k) % ii), None)
+                           for u in units for k in range(occupancy) }
+                for s in evict - { None }:
+                    self._unplace(s)
+                placement = (time, slot, units)
+
+            time, slot, units = placement
+            self._place(tid, time, slot, units, occupancy)
+            last_time[tid] = time
+
+            for (s, lat, dist) in self._succs[tid]:
+                if s != tid and s in self._time and self._violates(tid, s, lat, dist):
+                    self._unplace(s)
+            for (s, lat, dist) in self._preds[tid]:
+                if s != tid and s in self._time and self._violates(s, tid, lat, dist):
+                    self._unplace(s)
+
+        return True
+
+    # Register allocation
+
+    def _arc(self, v):
+        """The positions in the kernel a temporary value occupies its register, as a bitmask"""
+        p = self._ii * self.target.issue_rate
+        segments = self._segments(v)
+        start = self._pos[segments[0][0]]
+        end = self._pos[segments[-1][0]] + 1
+        for (_, seg) in segments:
+            end = max([end] + [ self._pos[r] for r in self._readers(seg) ])
+        length = end - start
+        assert 0 < length <= p
+        mask = ((1 << length) - 1) << (start % p)
+        return (mask | (mask >> p)) & ((1 << p) - 1)
+
+    def _allocate_temporaries(self):
+        p = self._ii * self.target.issue_rate
+        occupied = { reg : (1 << p) - 1 for reg in self._fixed }
+        register_of = dict(self._register_of)
+        choice = {}
+
+        different = {}
+        for t in self.tree.nodes:
+            pairs = [ ((t.id, i), self._value_of(t.src_in[j]))
+                      for (i, j) in (t.inst.args_in_out_different or []) ]
+            pairs += [ (self._value_of(t.src_in_out[i]), self._value_of(t.src_in[j]))
+                       for (i, j) in (t.inst.args_in_inout_different or []) ]
+            for (a, b) in pairs:
+                different.setdefault(a, []).append(b)
+                different.setdefault(b, []).append(a)
+
+        arcs = { v : self._arc(v) for v in self._allowed if v not in register_of
+                 and not self._nodes_by_id[v[0]].is_virtual }
+
+        def fits(v, reg, taken):
+            if reg not in self._allowed[v] or occupied.get(reg, 0) & arcs[v]:
+                return False
+            if any(register_of.get(w, None) == reg or taken.get(w, None) == reg
+                   for w in different.get(v, [])):
+                return False
+            return all(taken.get(w, None) != reg or arcs[w] & arcs[v] == 0 for w in taken)
+
+        def try_register(v, reg):
+            taken = { v : reg }
+            for group in self._groups_of[v]:
+                if id(group) in choice:
+                    comb = choice[id(group)]
+                    if comb[group["values"].index(v)] != reg:
+                        return None
+                    continue
+                for comb in group["combinations"]:
+                    cur = dict(taken)
+                    ok = True
+                    for w, r in zip(group["values"], comb):
+                        if w in register_of:
+                            ok = register_of[w] == r
+                        elif w in cur:
+                            ok = cur[w] == r
+                        else:
+                            ok = fits(w, r, cur)
+                            cur[w] = r
+                        if not ok:
+                            break
+                    if ok:
+                        taken = cur
+                        break
+                else:
+                    return None
+            return taken
+
+        order = sorted(arcs, key=lambda v: self._pos[self._segments(v)[0][0]])
+        for v in order:
+            if v in register_of:
+                continue
+            for reg in self._preference(v):
+                if not fits(v, reg, {}):
+                    continue
+                taken = try_register(v, reg)
+                if taken is not None:
+                    break
+            else:
+                return False
+            for w, r in taken.items():
+                register_of[w] = r
+                occupied[r] = occupied.get(r, 0) | arcs[w]
+            for group in self._groups_of[v]:
+                choice.setdefault(id(group), [ register_of[w] for w in group["values"] ])
+
+        self._register_of = register_of
+        return True
+
+    def schedule(self):
+        """Compute a modulo schedule with the smallest initiation interval found
+
+        Raises:
+            ModuloSchedulingException: If no schedule could be found.
+
+        Returns:
+            The scheduler itself, with the fields describing the schedule set."""
+        if not self.config.inputs_are_outputs:
+            raise ModuloSchedulingException("Modulo scheduling requires inputs_are_outputs")
+        nodes = self.tree.nodes
+        issue_rate = self.target.issue_rate
+
+        self._setup_values()
+        self._setup_dependencies()
+        self._allocate_fixed()
+        self._allowed_labels_of = { t.id : self._allowed_labels(t) for t in nodes }
+
+        min_cycles = math.ceil(len(nodes) / issue_rate)
+        max_occupancy = max((self._get_units(t)[0] for t in nodes), default=0)
+        mii = max(min_cycles, self._res_mii(), max_occupancy - 1, 1)
+        mii = self._rec_mii(mii)
+        max_ii = min_cycles + self.config.constraints.stalls_maximum_attempt
+        self.logger.debug("Minimum initiation interval: %d", mii)
+
+        # Try to get away with as few stages as possible
+        labels = self._stage_labels()
+        windows = [ ("core",) ]
+        if "pre" in labels:
+            windows.append(("pre", "core"))
+        if "post" in labels:
+            windows.append(("core", "post"))
+        windows = list(dict.fromkeys(windows + [ tuple(labels) ]))
+
+        for ii in range(mii, max_ii + 1):
+            for window in windows:
+                if not self._attempt(ii, window):
+                    continue
+                if not self._allocate_temporaries():
+                    self.logger.debug("Register allocation failed for II=%d, stages %s",
+                                      ii, window)
+                    continue
+                self._finish(ii, window)
+                return self
+            self.logger.debug("No modulo schedule for II=%d", ii)
+        raise ModuloSchedulingException(f"No modulo schedule with at most {max_ii} cycles")
+
+    def _finish(self, ii, labels):
+        p = ii * self.target.issue_rate
+        self.ii = ii
+        self.num_cycles = ii
+        self.positions = { tid : pos % p for tid, pos in self._pos.items() }
+        self.cycles = { tid : time % ii for tid, time in self._time.items() }
+        self.stages = {}
+        for tid, time in self._time.items():
+            label = labels[time // ii]
+            self.stages[tid] = (label == "pre", label == "core", label == "post")
+        self.allocation = { t.id : [ self._register_of[(t.id, i)]
+                                     for i in range(t.inst.num_out) ]
+                            for t in self.tree.nodes_all }
+        self.logger.debug("Modulo schedule: II=%d, stages %s", ii, labels)
@@ -0,0 +1,374 @@
+#
+# Copyright (c) 2024 Arm Limited
+# Copyright (c) 2024 Hanno Becker
+# SPDX-License-Identifier: MIT
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# Author: Hanno Becker <hannobecker@posteo.de>
+#
+
+"""
+SLOTHY jobs and optimization server
+
+A job describes a single invocation of slothy-cli: The source code, the architecture
+and target, configuration options, and what to optimize. Jobs are run via
+load_job() and run_job(), both by slothy-cli itself and by OptimizationServer.
+
+Every invocation of slothy-cli pays for importing SLOTHY, OR-Tools, and all
+architecture and target models. OptimizationServer avoids this by keeping them
+loaded in a long-running process listening on a UNIX socket, see
+`slothy-cli --serve` and `slothy-cli --remote`. Every job is run in a worker
+process forked from the server, so jobs start warm but are isolated from
+each other.
+
+The protocol is line-based, with every message being a single line of JSON.
+The client sends a single job per connection. The server responds with any
+number of log messages `{"log": [name, level, message]}`, followed by either
+`{"result": source}` or `{"error": message}`.
+"""
+
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+import threading
+
+from slothy.core.core import SlothyException
+from slothy.core.slothy import Slothy
+from slothy.helper import ForkedTask
+from slothy.targets.query import Archery
+
+class ConfigOptionException(Exception):
+    """Exception thrown when a configuration option cannot be parsed or set"""
+
+def parse_config_value_as(val, ty, arch, logger):
+    """Parse the string representation of a configuration value
+
+    Args:
+        val: The value to parse.
+        ty: The expected type of the value, or None if any type is fine.
+        arch: The architecture model, for parsing register types.
+        logger: The logger to use.
+    """
+    def parse_as_float(val):
+        try:
+            res = float(val)
+            return res
+        except ValueError:
+            return None
+    def check_ty(ty_real):
+        if ty is None or ty == type(None) or ty == ty_real:
+            return
+        raise ConfigOptionException(f"Configuration value {val} isn't correctly typed -- " \
+                        f"expected {ty}, but got {ty_real}")
+    if val == "":
+        raise ConfigOptionException("Invalid configuration value")
+    logger.debug("Parsing configuration value %s with expected type %s", val, ty)
+    if val.isdigit():
+        check_ty(int)
+        logger.debug("Value %s parsed as integer", val)
+        return int(val)
+    if val.lower() == "true":
+        check_ty(bool)
+        logger.debug("Value %s parsed as Boolean", val)
+        return True
+    if val.lower() == "false":
+        check_ty(bool)
+        logger.debug("Value %s parsed as Boolean", val)
+        return False
+    # Try to parse as RegisterType
+    ty = arch.RegisterType.from_string(val)
+    if ty is not None:
+        logger.debug("Value %s parsed as RegisterType", val)
+        return ty
+    f = parse_as_float(val)
+    if f is not None:
+        check_ty(float)
+        logger.debug("Value %s parsed as float", val)
+        return f
+    if val[0] == '[' and val[-1] == ']':
+        check_ty(list)
+        val = val[1:-1].split(',')
+        val = list(map(str.strip, val))
+        # Find numeric suffix (e.g. x30 -> ('x', 30))
+        def split_numeric_suffix(v):
+            # Find first digit
+            i = next((i for (i,c) in enumerate(v) if c.isdigit()), len(v))
+            return v[:i], v[i:]
+        # Check for range entries (e.g. 'x10--x18')
+        def unfold_range(v):
+            if not "--" in v:
+                return [v]
+            vs = v.split("--")
+            if not len(vs) == 2:
+                logger.debug("Invalid range entry %s -- ignore", v)
+                return [v]
+            # Find numeric suffix
+            v0, v1 = vs
+            v0, v0i = split_numeric_suffix(v0)
+            v1, v1i = split_numeric_suffix(v1)
+            if v0 != v1:
+                logger.debug("Invalid range expression %s -- ignore", v)
+                return [v]
+            # Ranges are inclusive
+            res = [f"{v0}{i}" for i in range(int(v0i), int(v1i)+1)]
+            logger.debug("Decoded range entry %s to %s", v, res)
+            return res
+        val = [ r for v in val for r in unfold_range(v) ]
+        logger.debug("Parsing %s is a list -- parse recursively", val)
+        return [ parse_config_value_as(v, None, arch, logger) for v in val ]
+    if val[0] == '{' and val[-1] == '}':
+        check_ty(dict)
+        kvs = val[1:-1].split(',')
+        kvs = [ kv.split(':')  for kv in kvs ]
+        for kv in kvs:
+            if not len(kv) == 2:
+                raise ConfigOptionException("Invalid dictionary entry")
+        logger.debug("Parsing %s is a dictionary -- parse recursively", val)
+        return { parse_config_value_as(k, None, arch, logger) :
+                 parse_config_value_as(v, None, arch, logger) for k,v in kvs }
+    logger.debug("Parsing %s as string", val)
+    return val
+
+def set_config_options(config, options, arch, logger):
+    """Set configuration options given as strings, as for `slothy-cli -c`
+
+    Args:
+        config: The configuration to modify.
+        options: List of strings of the form "OPTION=VALUE". As a shorthand for
+            Boolean options, "OPTION" means "OPTION=True" and "/OPTION" means
+            "OPTION=False".
+        arch: The architecture model, for parsing register types.
+        logger: The logger to use.
+    """
+    def setattr_recursive(obj, attr,val):
+        attr.strip()
+        # If attr starts with
+        attrs = attr.split('.')
+        while len(attrs) > 1:
+            obj = getattr(obj,attrs.pop(0))
+        attr = attrs.pop(0)
+        val = parse_config_value_as(val, type(getattr(obj,attr)), arch, logger)
+        logger.info("Setting configuration option %s to value %s", attr, val)
+        setattr(obj,attr,val)
+
+    config_kv_pairs = [ c.split('=') for c in options ]
+    for kv in config_kv_pairs:
+        # We allow shorthands for boolean configurations
+        # "-c config.options" as a shorthand for "-c config.options=True"
+        # "-c /config.options" as a shorthand for "-c config.options=False"
+        # '!' would be more intuitive, but this confuses some shells.
+        negate_char = '/'
+        if len(kv) == 1:
+            kv[0] = kv[0].strip()
+            if kv[0][0] == negate_char:
+                val = False
+                kv[0] = kv[0][1:]
+            else:
+                val = True
+            setattr_recursive(config, kv[0], str(val))
+        elif len(kv) == 2:
+            setattr_recursive(config, kv[0], kv[1])
+        else:
+            raise ConfigOptionException(f"Invalid configuration {kv}")
+
+def load_job(job, logger):
+    """Create a Slothy instance for a job, with configuration and source code set
+
+    A job is a dictionary with the following entries, mirroring the command line
+    arguments of slothy-cli. All entries except for arch, target and source are optional.
+
+    - arch, target: The names of architecture and target, see Archery.
+    - source: The source code, as a multi-line string.
+    - config: List of configuration options, see set_config_options().
+    - profile_file: If set, the value of Config.profile_file.
+    - loop: List of labels of loops to optimize.
+    - start, end: Start and end of the code to optimize if no loop is given.
+    - previous: Pair of previous input and output, as multi-line strings,
+      see Slothy.optimize().
+    - unfold, unfold_macros, unfold_aliases: Only unfold, see Slothy.unfold().
+    - fusion, fusion_only: Apply fusion to the loops, see Slothy.fusion_loop().
+    - rename_function: Pair of old and new function name.
+    """
+    arch   = Archery.get_arch(job["arch"])
+    target = Archery.get_target(job["target"])
+    slothy = Slothy(arch, target, logger=logger)
+    set_config_options(slothy.config, job.get("config", []), arch, logger)
+    if job.get("profile_file", None) is not None:
+        slothy.config.profile_file = job["profile_file"]
+    slothy.load_source_raw(job["source"])
+    return slothy
+
+def run_job(slothy, job):
+    """Run a job loaded via load_job(), and return the resulting source code
+    as a multi-line string"""
+    loops = job.get("loop", [])
+    done = False
+
+    # Unfold only?
+    if job.get("unfold", False):
+        slothy.unfold(start=job.get("start", None), end=job.get("end", None),
+                      macros=job.get("unfold_macros", True),
+                      aliases=job.get("unfold_aliases", False))
+        done = True
+
+    # Fusion
+    if done is False and job.get("fusion", False):
+        for l in loops:
+            slothy.fusion_loop(l)
+        if job.get("fusion_only", False):
+            done = True
+
+    # Optimize
+    if done is False:
+        if len(loops) > 0:
+            slothy.optimize_loops(loops)
+        else:
+            slothy.optimize(start=job.get("start", None), end=job.get("end", None),
+                            previous=job.get("previous", None))
+
+    # Rename
+    rename = job.get("rename_function", None)
+    if rename is not None:
+        slothy.rename_function(rename[0], rename[1])
+        slothy.rename_function("_" + rename[0], "_" + rename[1])
+
+    return slothy.get_source_as_string()
+
+def _send(sock, msg):
+    sock.sendall((json.dumps(msg) + "\n").encode("utf-8"))
+
+class _SocketLogHandler(logging.Handler):
+    """Forward log records to the client of a job"""
+
+    def __init__(self, sock):
+        super().__init__()
+        self._sock = sock
+
+    def emit(self, record):
+        try:
+            _send(self._sock, { "log" : [record.name, record.levelno, self.format(record)] })
+        except Exception: # pylint:disable=broad-exception-caught
+            self.handleError(record)
+
+class OptimizationServer:
+    """Server running SLOTHY jobs submitted via a UNIX socket
+
+    Up to `jobs` jobs are run concurrently, each in a forked worker process;
+    further jobs wait until a worker becomes available. If threads_per_job is set,
+    each job is limited to that many threads, see Config.thread_budget."""
+
+    def __init__(self, path, logger, jobs=1, threads_per_job=None):
+        """Create a server
+
+        Args:
+            path: The path of the UNIX socket to listen on.
+            logger: The logger to use.
+            jobs: The maximum number of jobs to run concurrently.
+            threads_per_job: The maximum number of threads a job may use,
+                or None for no limit.
+        """
+        if not ForkedTask.supported():
+            raise SlothyException("The optimization server requires fork()")
+        self.path = path
+        self.logger = logger
+        self.jobs = jobs
+        self.threads_per_job = threads_per_job
+        self._slots = threading.BoundedSemaphore(jobs)
+        self._server = None
+
+    def _run_job(self, sock, job):
+        """Run a job in a forked worker process, forwarding log output to the client"""
+        root = logging.getLogger()
+        for h in list(root.handlers):
+            root.removeHandler(h)
+        root.addHandler(_SocketLogHandler(sock))
+        root.setLevel(logging.DEBUG if job.get("debug", False) else logging.INFO)
+
+        slothy = load_job(job, logging.getLogger("slothy-cli"))
+        if self.threads_per_job is not None:
+            budget = slothy.config.thread_budget
+            if budget is None or budget > self.threads_per_job:
+                slothy.config.thread_budget = self.threads_per_job
+        return run_job(slothy, job)
+
+    def _handle(self, sock):
+        with sock.makefile("rb") as f:
+            line = f.readline()
+        if len(line) == 0:
+            return
+        try:
+            job = json.loads(line)
+        except json.JSONDecodeError as e:
+            _send(sock, { "error" : f"Invalid job: {e}" })
+            return
+
+        with self._slots:
+            self.logger.info("Running job for %s/%s", job.get("arch"), job.get("target"))
+            task = ForkedTask(self._run_job, sock, job)
+            try:
+                msg = { "result" : task.result() }
+            except Exception as e: # pylint:disable=broad-exception-caught
+                self.logger.warning("Job failed: %s", e)
+                msg = { "error" : f"{type(e).__name__}: {e}" }
+        try:
+            _send(sock, msg)
+        except OSError as e:
+            self.logger.warning("Could not send result to client: %s", e)
+
+    def _remove_stale_socket(self):
+        if not os.path.exists(self.path):
+            return
+        if not stat.S_ISSOCK(os.stat(self.path).st_mode):
+            raise SlothyException(f"{self.path} exists and is not a socket")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            try:
+                s.connect(self.path)
+            except OSError:
+                os.unlink(self.path)
+                return
+        raise SlothyException(f"Another server is listening on {self.path}")
+
+    def serve_forever(self):
+        """Accept and run jobs until shutdown() is called"""
+        server = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            """Handle a single client connection"""
+            def handle(self):
+                server._handle(self.request) # pylint:disable=protected-access
+
+        self._remove_stale_socket()
+        self._server = socketserver.ThreadingUnixStreamServer(self.path, Handler)
+        self._server.daemon_threads = True
+        self.logger.info("Listening on %s (%d concurrent jobs, %s threads per job)",
+                         self.path, self.jobs, self.threads_per_job or "unlimited")
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            os.unlink(self.path)
+
+    def shutdown(self):
+        """Stop serve_forever(). This must be called from a different thread."""
+        if self._server is not None:
+            self._server.shutdown()
@@ -55,6 +55,7 @@ from slothy.core.heuristics import Heuristics
 from slothy.helper import CPreprocessor, SourceLine
 from slothy.helper import AsmAllocation, AsmMacro, AsmHelper
 from slothy.helper import CPreprocessor, LLVM_Mca, LLVM_Mca_Error
+from slothy.helper import ForkedTask, parallel_map
 
 class Slothy:
     """SLOTHY optimizer
@@ -206,7 +207,38 @@ class Slothy:
             stats = []
         return stats
 
-    def optimize(self, start=None, end=None, loop_synthesis_cb=None, logname=None):
+    def _extract_body(self, source, start, end):
+        """Extract the code between two labels and unfold preprocessor directives,
+        macros and register aliases in it.
+
+        Returns:
+            Tuple (pre, body, post, config, indentation) of the code before, within
+            and after the region, a copy of the configuration extended by the register
+            aliases defined before the region, and the dominant indentation of the region."""
+        pre, body, post = AsmHelper.extract(source, start, end)
+
+        aliases = AsmAllocation.parse_allocs(pre)
+        c = self.config.copy()
+        c.add_aliases(aliases)
+
+        # Check if the body has a dominant indentation
+        indentation = AsmHelper.find_indentation(body)
+
+        if c.with_preprocessor:
+            self.logger.info("Apply C preprocessor...")
+            body = CPreprocessor.unfold(pre, body, post, c.compiler_binary,
+                                        include=c.compiler_include_paths)
+            self.logger.debug("Code after preprocessor:")
+            Slothy._dump("preprocessed", body, self.logger, err=False)
+
+        body = SourceLine.split_semicolons(body)
+        body = AsmMacro.unfold_all_macros(pre, body, inherit_comments=c.inherit_macro_comments)
+        body = AsmAllocation.unfold_all_aliases(c.register_aliases, body)
+        body = SourceLine.apply_indentation(body, indentation)
+        return pre, body, post, c, indentation
+
+    def optimize(self, start=None, end=None, loop_synthesis_cb=None, logname=None,
+                 previous=None):
         """Optimize all or part of the currently loaded source code
 
         Note: It is OK to use this in software pipelining mode. In this case, the
@@ -222,8 +254,16 @@ class Slothy:
                   This cannot be used together with the 'loop' argument.
              loop_synthesis_cb: Optional (None by default) callback synthesis final source code
                   from tuple of (preamble, kernel, postamble, # exceptional iterations).
+             previous: Optional (None by default) pair (source, optimized) of a previous
+                  version of the source code and the output of SLOTHY for it, each as a
+                  multi-line string or list of SourceLine objects. If provided, only a
+                  window of config.reoptimize_window instructions around the lines which
+                  changed since the previous version is re-optimized, while the rest of the
+                  previous optimization result is kept. If the previous result cannot be
+                  reused, the code is optimized from scratch. This is only supported for
+                  straightline optimization.
         """
-        # pylint:disable=too-many-locals
+        # pylint:disable=too-many-locals,too-many-branches
 
         if logname is None and start is not None:
             logname = start
@@ -231,32 +271,34 @@ class Slothy:
             logname = end
 
         logger = self.logger.getChild(logname) if logname is not None else self.logger
-        pre, body, post = AsmHelper.extract(self.source, start, end)
-
-        aliases = AsmAllocation.parse_allocs(pre)
-        c = self.config.copy()
-        c.add_aliases(aliases)
-
-        # Check if the body has a dominant indentation
-        indentation = AsmHelper.find_indentation(body)
-
-        if c.with_preprocessor:
-            self.logger.info("Apply C preprocessor...")
-            body = CPreprocessor.unfold(pre, body, post, c.compiler_binary,
-                                        include=c.compiler_include_paths)
-            self.logger.debug("Code after preprocessor:")
-            Slothy._dump("preprocessed", body, self.logger, err=False)
-
-        body = SourceLine.split_semicolons(body)
-        body = AsmMacro.unfold_all_macros(pre, body, inherit_comments=c.inherit_macro_comments)
-        body = AsmAllocation.unfold_all_aliases(c.register_aliases, body)
-        body = SourceLine.apply_indentation(body, indentation)
+        pre, body, post, c, indentation = self._extract_body(self.source, start, end)
+        if c.thread_budget is not None:
+            c.limit_threads(c.thread_budget)
+        c.start_time_budget()
         self.logger.info("Instructions in body: %d", len(list(filter(None, body))))
 
         if self.config.with_llvm_mca_before is True:
             orig_stats = self._make_llvm_mca_stats(pre, body, post, "ORIGINAL", indentation)
 
-        early, core, late, num_exceptional = Heuristics.periodic(body, logger, c)
+        core = None
+        if previous is not None and c.sw_pipelining.enabled:
+            logger.warning("Re-optimization is not supported with software pipelining "
+                           "-- optimizing from scratch")
+        elif previous is not None:
+            prev_source, prev_opt = [ SourceLine.read_multiline(s, reduce=not c.ignore_tags)
+                                      if isinstance(s, str) else s
+                                      for s in previous ]
+            _, prev_body, _, _, _ = self._extract_body(prev_source, start, end)
+            _, prev_opt, _, _, _  = self._extract_body(prev_opt, start, end)
+            core = Heuristics.reoptimize(body, prev_body, prev_opt, logger, c)
+            if core is None:
+                logger.warning("Could not reuse previous optimization "
+                               "-- optimizing from scratch")
+
+        if core is not None:
+            early, late, num_exceptional = [], [], 0
+        else:
+            early, core, late, num_exceptional = Heuristics.periodic(body, logger, c)
 
         if self.config.with_llvm_mca_before is True:
             core = core + orig_stats
@@ -394,18 +436,91 @@ class Slothy:
 
     def optimize_loop(self, loop_lbl, postamble_label=None):
         """Optimize the loop starting at a given label"""
+        c = self.config.copy()
+        if c.thread_budget is not None:
+            c.limit_threads(c.thread_budget)
+        c.start_time_budget()
+        res = self._optimize_loop(self.source, loop_lbl, postamble_label, c)
+        self._splice_loop(loop_lbl, res)
+
+    def optimize_loops(self, loop_lbls):
+        """Optimize the loops starting at the given labels
+
+        This is equivalent to calling optimize_loop() for every label in turn, but
+        optimizes loops whose code does not overlap concurrently, according to
+        config.loops_parallel_workers and config.thread_budget. If config.time_budget
+        is set, it applies to all loops together."""
+        conf = self.config.copy()
+        conf.start_time_budget()
+        workers = conf.loops_parallel_workers
+        if conf.thread_budget is not None:
+            workers = min(workers, conf.thread_budget)
+        if workers <= 1 or len(loop_lbls) <= 1 or not ForkedTask.supported():
+            for i, l in enumerate(loop_lbls):
+                c = conf.copy()
+                if c.thread_budget is not None:
+                    c.limit_threads(c.thread_budget)
+                c.share_deadline(1 / (len(loop_lbls) - i))
+                self._splice_loop(l, self._optimize_loop(self.source, l, None, c))
+            return
+
+        # Group the loops into waves of pairwise non-overlapping loops, such that
+        # overlapping loops are optimized in the order given.
+        waves = []
+        for l in loop_lbls:
+            early, body, _, _, _ = \
+                self.arch.Loop.extract(SourceLine.copy_source(self.source), l)
+            region = (len(early), len(early) + len(body))
+            idx = 1 + max((i for i, wave in enumerate(waves)
+                           if any(r[0] < region[1] and region[0] < r[1] for _, r in wave)),
+                          default=-1)
+            if idx == len(waves):
+                waves.append([])
+            waves[idx].append((l, region))
+
+        for i, wave in enumerate(waves):
+            lbls = [ l for (l, _) in wave ]
+            cur_workers = min(workers, len(lbls))
+            c = conf.copy()
+            if c.thread_budget is not None:
+                c.limit_threads(max(1, c.thread_budget // cur_workers))
+            c.share_deadline(1 / (len(waves) - i))
+            self.logger.info("Optimizing loops %s using %d workers ...", lbls, cur_workers)
+            source = self.source
+            results = parallel_map(
+                lambda l, c=c, source=source: self._optimize_loop(source, l, None, c.copy()),
+                lbls, cur_workers)
+            for l, res in zip(lbls, results):
+                self._splice_loop(l, res)
+
+    def _splice_loop(self, loop_lbl, res):
+        """Replace the loop starting at a given label by its optimized version,
+        as returned by _optimize_loop()"""
+        optimized_code, kernel_input_output = res
+        early, _, late, _, _ = self.arch.Loop.extract(self.source, loop_lbl)
+
+        self.last_result = SimpleNamespace()
+        self.last_result.kernel_input_output = kernel_input_output
+
+        self.source = early + optimized_code + late
+        self.success = True
+
+    def _optimize_loop(self, source, loop_lbl, postamble_label, c):
+        """Optimize the loop starting at a given label in the given source code.
+
+        Returns a pair of the optimized loop and the dependencies of its kernel."""
 
         logger = self.logger.getChild(loop_lbl)
 
+        # Extraction modifies the source, which is left to _splice_loop()
         early, body, late, _, other_data = \
-            self.arch.Loop.extract(self.source, loop_lbl)
+            self.arch.Loop.extract(SourceLine.copy_source(source), loop_lbl)
         (loop_cnt, _, _) = other_data
 
         # Check if the body has a dominant indentation
         indentation = AsmHelper.find_indentation(body)
 
         aliases = AsmAllocation.parse_allocs(early)
-        c = self.config.copy()
         c.add_aliases(aliases)
 
         if c.with_preprocessor:
@@ -497,11 +612,8 @@ class Slothy:
                     optimized_code += indented(self.arch.Branch.unconditional(loop_lbl_end))
             optimized_code += [SourceLine(f"{loop_lbl_end}:")]
 
-        self.last_result = SimpleNamespace()
         dfgc = DFGConfig(c)
         dfgc.inputs_are_outputs = True
-        self.last_result.kernel_input_output = \
+        kernel_input_output = \
             list(DFG(kernel_code, logger.getChild("dfg_kernel_deps"), dfgc).inputs)
-
-        self.source = early + optimized_code + late
-        self.success = True
+        return optimized_code, kernel_input_output
@@ -28,6 +28,8 @@
 import re
 import subprocess
 import logging
+import multiprocessing
+import multiprocessing.connection
 
 class SourceLine:
     """Representation of a single line of source code"""
@@ -237,11 +239,21 @@ class SourceLine:
     def reduce_source(src):
         """Extract metadata (e.g. indentation, tags, comments) from source lines"""
         assert SourceLine.is_source(src)
+        return list(SourceLine.reduce_source_iter(src))
+
+    @staticmethod
+    def reduce_source_iter(src):
+        """Extract metadata (e.g. indentation, tags, comments) from source lines
+
+        In contrast to SourceLine.reduce_source(), this processes one line at a time
+        and thereby also accepts source given as a generator of SourceLine instances."""
         for l in src:
+            assert isinstance(l, SourceLine)
             l.reduce()
-        return [ l for l in src if l.has_text() and
-                 not AsmHelper.is_alignment_directive(l) and
-                 not AsmHelper.is_allocation_directive(l) ]
+            if l.has_text() and \
+               not AsmHelper.is_alignment_directive(l) and \
+               not AsmHelper.is_allocation_directive(l):
+                yield l
 
     @staticmethod
     def log(name, s, logger=None, err=False):
@@ -693,6 +705,7 @@ class AsmAllocation():
 class BinarySearchLimitException(Exception):
     """Binary search has exceeded its limit without finding a solution"""
 
+
 def binary_search(func, threshold=256, minimum=-1, start=0, precision=1,
                   timeout_below_precision=None):
     """Conduct a binary search"""
@@ -730,6 +743,175 @@ def binary_search(func, threshold=256, minimum=-1, start=0, precision=1,
             last_failure = val
     return last_success, last_success_core
 
+class ForkedTaskException(Exception):
+    """A worker process evaluating a ForkedTask died unexpectedly"""
+
+class ForkedTask:
+    """A function call evaluated in a forked worker process
+
+    Forking means that the function need not be picklable; in particular,
+    it may be a closure. Its return value, however, must be picklable."""
+
+    @staticmethod
+    def supported():
+        """Indicates whether forked tasks can be used on this platform."""
+        return "fork" in multiprocessing.get_all_start_methods()
+
+    def __init__(self, func, *args, **kwargs):
+        ctx = multiprocessing.get_context("fork")
+        # Each task gets its own pipe, so terminating one can't affect the others.
+        self._conn, conn_send = ctx.Pipe(duplex=False)
+        self._process = ctx.Process(target=ForkedTask._run, daemon=True,
+                                    args=(conn_send, func, args, kwargs))
+        self._process.start()
+        conn_send.close()
+
+    @staticmethod
+    def _run(conn, func, args, kwargs):
+        try:
+            res = (func(*args, **kwargs), None)
+        except Exception as e: # pylint:disable=broad-exception-caught
+            res = (None, e)
+        conn.send(res)
+        conn.close()
+
+    def result(self):
+        """Wait for the task to finish, and return the result of the function call.
+        Exceptions raised by the function are re-raised."""
+        try:
+            res, exc = self._conn.recv()
+        except EOFError as e:
+            raise ForkedTaskException(
+                f"Worker died with exit code {self._process.exitcode}") from e
+        finally:
+            self._process.join()
+            self._conn.close()
+        if exc is not None:
+            raise exc
+        return res
+
+    def terminate(self):
+        """Abort the task"""
+        self._process.terminate()
+        self._process.join()
+        self._conn.close()
+
+    @staticmethod
+    def wait(tasks):
+        """Wait until at least one of the given tasks has finished,
+        and return the list of finished tasks."""
+        conns = { t._conn : t for t in tasks }
+        ready = multiprocessing.connection.wait(list(conns.keys()))
+        return [ conns[c] for c in ready ]
+
+def parallel_map(func, args_lst, workers):
+    """Apply a function to a list of arguments using multiple forked worker processes
+
+    The results are returned in the order of the arguments. The function may be a closure,
+    but its return values must be picklable."""
+    if workers <= 1 or not ForkedTask.supported():
+        return list(map(func, args_lst))
+
+    results = [None] * len(args_lst)
+    pending = list(enumerate(args_lst))
+    running = {}
+    try:
+        while len(pending) > 0 or len(running) > 0:
+            while len(pending) > 0 and len(running) < workers:
+                idx, args = pending.pop(0)
+                running[ForkedTask(func, args)] = idx
+            for task in ForkedTask.wait(running.keys()):
+                results[running.pop(task)] = task.result()
+    finally:
+        for task in running:
+            task.terminate()
+    return results
+
+def parallel_binary_search(func, workers, threshold=256, minimum=-1, start=0, precision=1,
+                           timeout_below_precision=None):
+    """Conduct a binary search using multiple concurrent worker processes
+
+    This has the same semantics as binary_search(), assuming that func is monotone.
+    While no success has been found, the values start, 2*start, 4*start, ... are
+    tried concurrently. Afterwards, idle workers repeatedly split the largest
+    remaining gap between the known failures, pending values, and known successes.
+    Workers whose value is dominated by a smaller success or larger failure are
+    terminated.
+
+    In contrast to binary_search(), func(val, timeout=None) runs in a forked worker
+    process (see ForkedTask), and the second component of its return value must
+    be picklable."""
+
+    def double_val(val):
+        if val == 0:
+            return 1
+        return 2*val
+
+    start = max(start,minimum)
+    last_failure = minimum
+    last_success = None
+    last_success_result = None
+    next_val = start
+    # Map from values currently being tried to the corresponding tasks
+    running = {}
+
+    def launch(val, timeout=None):
+        running[val] = ForkedTask(func, val, timeout=timeout)
+
+    def next_gap():
+        points = sorted([last_failure] + list(running.keys()) + [last_success])
+        gaps = [ (b - a, a) for (a,b) in zip(points, points[1:]) if b - a > 1 ]
+        if len(gaps) == 0:
+            return None
+        width, base = max(gaps)
+        return base + width // 2
+
+    try:
+        while True:
+            if last_success is not None:
+                if last_success - last_failure <= 1:
+                    break
+                timeout = None
+                if last_success - last_failure <= precision:
+                    if timeout_below_precision is None:
+                        break
+                    timeout = timeout_below_precision
+                while len(running) < workers:
+                    val = next_gap()
+                    if val is None:
+                        break
+                    launch(val, timeout=timeout)
+            else:
+                while len(running) < workers and next_val <= threshold:
+                    launch(next_val)
+                    next_val = double_val(next_val)
+                if len(running) == 0:
+                    raise BinarySearchLimitException
+
+            if len(running) == 0:
+                break
+
+            task = ForkedTask.wait(running.values())[0]
+            val = next(v for (v,t) in running.items() if t is task)
+            del running[val]
+            success, result = task.result()
+
+            if success and (last_success is None or val < last_success):
+                last_success = val
+                last_success_result = result
+            elif not success:
+                last_failure = max(last_failure, val)
+
+            # Terminate workers whose outcome is known already
+            for v in list(running.keys()):
+                if v <= last_failure or (last_success is not None and v >= last_success):
+                    running.pop(v).terminate()
+    finally:
+        for task in running.values():
+            task.terminate()
+
+    return last_success, last_success_result
+
 class AsmMacro():
     """Helper class for parsing and applying assembly macros"""
 
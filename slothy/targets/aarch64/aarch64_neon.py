@@ -530,9 +530,11 @@ class Instruction:
 
         src = src_line.text.strip()
 
-        # Iterate through all derived classes and call their parser
-        # until one of them hopefully succeeds
-        for inst_class in Instruction.all_subclass_leaves:
+        # Iterate through all derived classes whose mnemonic matches, and
+        # call their parser until one of them hopefully succeeds
+        candidates = Instruction.parser_index.get(src.split(' ')[0],
+                                                  Instruction.parser_fallback)
+        for inst_class in candidates:
             try:
                 inst = inst_class.make(src)
                 instnames = [inst_class.__name__]
@@ -3131,11 +3133,18 @@ def iter_aarch64_instructions():
     yield from all_subclass_leaves(Instruction)
 
 def find_class(src):
+    # The result only depends on the type of the source, so remember it
+    inst_class = _find_class_cache.get(type(src), None)
+    if inst_class is not None:
+        return inst_class
     for inst_class in iter_aarch64_instructions():
         if isinstance(src,inst_class):
+            _find_class_cache[type(src)] = inst_class
             return inst_class
     raise UnknownInstruction(f"Couldn't find instruction class for {src} (type {type(src)})")
 
+_find_class_cache = {}
+
 def is_dt_form_of(instr_class, dts=None):
     if not isinstance(instr_class, list):
         instr_class = [instr_class]
@@ -3146,6 +3155,9 @@ def is_dt_form_of(instr_class, dts=None):
             if dts is None or _intersects(src.datatype, dts):
                 return True
         return False
+    # The predicate only depends on the shape of an instruction,
+    # so lookup_multidict() may cache its result
+    _check_instr_dt.shape_only = True
     return _check_instr_dt
 
 def is_dform_form_of(instr_class):
@@ -3189,8 +3201,37 @@ def all_subclass_leaves(c):
 
 Instruction.all_subclass_leaves = all_subclass_leaves(Instruction)
 
-def lookup_multidict(d, inst, default=None):
-    instclass = find_class(inst)
+# Builds an index from mnemonics to the instruction classes which can parse them
+#
+# Instructions defined via a pattern only ever parse sources whose mnemonic matches
+# that of the pattern, so they can be indexed. Other instructions decide on the
+# mnemonic in their make(), so they have to be tried for every source line. The
+# candidates for a mnemonic retain the order of all_subclass_leaves, so that the
+# first successful parse is the same as when trying all classes in turn.
+def build_parser_index(classes):
+    indexed = {}
+    unindexed = []
+    for c in classes:
+        if issubclass(c, AArch64Instruction) and hasattr(c, "pattern"):
+            indexed.setdefault(c.pattern.split(' ')[0], []).append(c)
+        else:
+            unindexed.append(c)
+    position = { c : i for i, c in enumerate(classes) }
+    index = { mnemonic : sorted(cs + unindexed, key=position.get)
+              for mnemonic, cs in indexed.items() }
+    return index, unindexed
+
+Instruction.parser_index, Instruction.parser_fallback = \
+    build_parser_index(Instruction.all_subclass_leaves)
+
+def instruction_shape(inst):
+    """Returns a hashable description of the class and datatype(s) of an instruction"""
+    dt = getattr(inst, "datatype", None)
+    if isinstance(dt, list):
+        dt = tuple(dt)
+    return (type(inst), dt)
+
+def _lookup_multidict_core(d, inst):
     for l,v in d.items():
         # Multidict entries can be the following:
         # - An instruction class. It matches any instruction of that class.
@@ -3208,6 +3249,43 @@ def lookup_multidict(d, inst, default=None):
         for lp in l:
             if match(lp):
                 return v
+    return None
+
+def _multidict_is_shape_only(d):
+    def shape_only(x):
+        return inspect.isclass(x) or getattr(x, "shape_only", False)
+    return all(shape_only(x) for l in d.keys()
+               for x in (l if isinstance(l, tuple) else [l]))
+
+# Lookup tables compiled from multidicts, indexed by the ID of the multidict
+#
+# If a multidict only uses instruction classes and predicates depending on the
+# shape of an instruction (see instruction_shape()), the result of a lookup is
+# remembered per shape, so that every predicate is evaluated once per distinct
+# shape only. Multidicts must not be modified after their first lookup.
+_multidict_tables = {}
+
+def lookup_multidict(d, inst, default=None):
+    table = _multidict_tables.get(id(d), None)
+    if table is None:
+        # Keep a reference to the multidict so its ID cannot be reused
+        table = (d, {} if _multidict_is_shape_only(d) else None)
+        _multidict_tables[id(d)] = table
+    _, results = table
+
+    if results is None:
+        v = _lookup_multidict_core(d, inst)
+    else:
+        shape = instruction_shape(inst)
+        if shape in results:
+            v = results[shape]
+        else:
+            v = _lookup_multidict_core(d, inst)
+            results[shape] = v
+
+    if v is not None:
+        return v
     if default is None:
+        instclass = find_class(inst)
         raise UnknownInstruction(f"Couldn't find {instclass} for {inst}")
     return default
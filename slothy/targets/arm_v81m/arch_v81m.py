@@ -258,11 +258,13 @@ class Instruction:
     def is_stack_load(self):
         return self._is_instance_of([ qrestore, restored, restore ])
 
-    def parse(self, src):
-        """Assumes format 'mnemonic [in]out0, .., [in]outN, in0, .., inM"""
-        src = re.sub("//.*$","",src)
+    def _template_regexp(self):
+        """The regular expression for the basic instruction template used by parse().
 
-        have_dt = ( "<dt>" in self.mnemonic ) or ( "<fdt>" in self.mnemonic )
+        It only depends on the instruction class, so it is compiled once per class."""
+        regexp = type(self).__dict__.get("template_regexp", None)
+        if regexp is not None:
+            return regexp
 
         # Replace <dt> by list of all possible datatypes
         mnemonic = Instruction.unfold_abbrevs(self.mnemonic)
@@ -274,10 +276,20 @@ class Instruction:
         regexp_txt += ','.join([r"\s*(\w+)\s*" for _ in range(expected_args)])
         regexp = re.compile(regexp_txt)
 
+        type(self).template_regexp = regexp
+        return regexp
+
+    def parse(self, src):
+        """Assumes format 'mnemonic [in]out0, .., [in]outN, in0, .., inM"""
+        src = re.sub("//.*$","",src)
+
+        have_dt = ( "<dt>" in self.mnemonic ) or ( "<fdt>" in self.mnemonic )
+
+        regexp = self._template_regexp()
         p = regexp.match(src)
         if p is None:
             raise Instruction.ParsingException(
-                f"Doesn't match basic instruction template {regexp_txt}")
+                f"Doesn't match basic instruction template {regexp.pattern}")
 
         operands = list(p.groups())
         if have_dt:
@@ -314,9 +326,9 @@ class Instruction:
 
         src = src_line.text.strip()
 
-        # Iterate through all derived classes and call their parser
-        # until one of them hopefully succeeds
-        for inst_class in Instruction.__subclasses__():
+        # Iterate through all derived classes which can parse the mnemonic,
+        # and collect the ones whose parser succeeds
+        for inst_class in Instruction.parser_candidates(src):
             inst = inst_class()
             try:
                 inst.parse(src)
@@ -335,6 +347,31 @@ class Instruction:
         logging.debug("Parsing result for %s: %s", src, instnames)
         return insts
 
+    @staticmethod
+    def _parser_prefix(inst_class):
+        """Returns a string which every source line parsed by inst_class starts with"""
+        if "parse" in vars(inst_class):
+            regexp = vars(inst_class).get("regexp", None)
+            if regexp is None:
+                return ""
+        else:
+            regexp = inst_class()._template_regexp()
+        return re.match(r"(?:\^|\\s\*)*(\w*)", regexp.pattern).group(1)
+
+    @staticmethod
+    def parser_candidates(src):
+        """Returns the instruction classes which might be able to parse src,
+        in the order in which they are defined.
+
+        The candidates are looked up by the leading word of src, and cached."""
+        mnemonic = re.match(r"\w*", src).group(0)
+        candidates = Instruction.parser_index.get(mnemonic, None)
+        if candidates is None:
+            candidates = [ c for (c, prefix) in Instruction.parser_prefixes
+                           if mnemonic.startswith(prefix) ]
+            Instruction.parser_index[mnemonic] = candidates
+        return candidates
+
     def __repr__(self):
         return self.write()
 
@@ -479,7 +516,16 @@ class vqdmulh_vv(Instruction):
                          arg_types_in=[RegisterType.MVE, RegisterType.MVE],
                          arg_types_out=[RegisterType.MVE])
 
+# Regular expressions for the addressing modes of scalar and vector loads and stores
+addr_regexp_txt    = r"\[\s*(?P<addr>\w+)\s*(?:,\s*#(?P<addroffset>[^\]]*))?\](?P<writeback>!?)"
+postinc_regexp_txt = r"\s*(?:,\s*#(?P<postinc>.*))?"
+
 class ldrd(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"\s*ldrd\s+"
+        r"(?P<dest0>\w+),\s*(?P<dest1>\w+),\s*"
+        + addr_regexp_txt + postinc_regexp_txt))
+
     def __init__(self):
         super().__init__(mnemonic="ldrd",
                          arg_types_in=[RegisterType.GPR],
@@ -494,18 +540,7 @@ class ldrd(Instruction):
             self.pre_index = simplify(self.pre_index)
 
     def parse(self, src):
-
-        addr_regexp_txt    = r"\[\s*(?P<addr>\w+)\s*(?:,\s*#(?P<addroffset>[^\]]*))?\](?P<writeback>!?)"
-        postinc_regexp_txt = r"\s*(?:,\s*#(?P<postinc>.*))?"
-
-        ldrd_regexp_txt  = r"\s*ldrd\s+"
-        ldrd_regexp_txt += r"(?P<dest0>\w+),\s*(?P<dest1>\w+),\s*"
-        ldrd_regexp_txt += addr_regexp_txt
-        ldrd_regexp_txt += postinc_regexp_txt
-        ldrd_regexp_txt  = Instruction.unfold_abbrevs(ldrd_regexp_txt)
-        ldrd_regexp      = re.compile(ldrd_regexp_txt)
-
-        p = ldrd_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Doesn't match pattern")
 
@@ -550,6 +585,11 @@ class ldrd(Instruction):
         return f"{self.mnemonic} {self.args_out[0]}, {self.args_out[1]}, {addr}{inc} {post}"
 
 class ldr(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"\s*ldr\s+"
+        r"(?P<dest>\w+),\s*"
+        + addr_regexp_txt + postinc_regexp_txt))
+
     def __init__(self):
         super().__init__(mnemonic="ldr",
                          arg_types_in=[RegisterType.GPR],
@@ -564,18 +604,7 @@ class ldr(Instruction):
             self.pre_index = simplify(self.pre_index)
 
     def parse(self, src):
-
-        addr_regexp_txt    = r"\[\s*(?P<addr>\w+)\s*(?:,\s*#(?P<addroffset>[^\]]*))?\](?P<writeback>!?)"
-        postinc_regexp_txt = r"\s*(?:,\s*#(?P<postinc>.*))?"
-
-        ldr_regexp_txt  = r"\s*ldr\s+"
-        ldr_regexp_txt += r"(?P<dest>\w+),\s*"
-        ldr_regexp_txt += addr_regexp_txt
-        ldr_regexp_txt += postinc_regexp_txt
-        ldr_regexp_txt  = Instruction.unfold_abbrevs(ldr_regexp_txt)
-        ldr_regexp      = re.compile(ldr_regexp_txt)
-
-        p = ldr_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Doesn't match pattern")
 
@@ -620,6 +649,11 @@ class ldr(Instruction):
         return f"{self.mnemonic} {self.args_out[0]}, {addr}{inc} {post}"
 
 class strd(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"\s*strd\s+"
+        r"(?P<dest0>\w+),\s*(?P<dest1>\w+),\s*"
+        + addr_regexp_txt + postinc_regexp_txt))
+
     def __init__(self):
         super().__init__(mnemonic="strd",
                          arg_types_in=[RegisterType.GPR, RegisterType.GPR, RegisterType.GPR])
@@ -633,18 +667,7 @@ class strd(Instruction):
             self.pre_index = simplify(self.pre_index)
 
     def parse(self, src):
-
-        addr_regexp_txt    = r"\[\s*(?P<addr>\w+)\s*(?:,\s*#(?P<addroffset>[^\]]*))?\](?P<writeback>!?)"
-        postinc_regexp_txt = r"\s*(?:,\s*#(?P<postinc>.*))?"
-
-        strd_regexp_txt  = r"\s*strd\s+"
-        strd_regexp_txt += r"(?P<dest0>\w+),\s*(?P<dest1>\w+),\s*"
-        strd_regexp_txt += addr_regexp_txt
-        strd_regexp_txt += postinc_regexp_txt
-        strd_regexp_txt  = Instruction.unfold_abbrevs(strd_regexp_txt)
-        strd_regexp      = re.compile(strd_regexp_txt)
-
-        p = strd_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Doesn't match pattern")
 
@@ -689,16 +712,16 @@ class strd(Instruction):
         return f"{self.mnemonic} {self.args_in[1]}, {self.args_in[2]}, {addr}{inc} {post}"
 
 class vrshr(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"vrshr\.<dt>\s+(?P<dst>\w+)\s*,\s*(?P<src>\w+)\s*,\s*(?P<shift>#.*)"))
+
     def __init__(self):
         super().__init__(mnemonic="vrshr.<dt>",
                          arg_types_in=[RegisterType.MVE],
                          arg_types_out=[RegisterType.MVE])
 
     def parse(self, src):
-        vrshr_regexp_txt = r"vrshr\.<dt>\s+(?P<dst>\w+)\s*,\s*(?P<src>\w+)\s*,\s*(?P<shift>#.*)"
-        vrshr_regexp_txt = Instruction.unfold_abbrevs(vrshr_regexp_txt)
-        vrshr_regexp = re.compile(vrshr_regexp_txt)
-        p = vrshr_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
         self.args_in     = [ p.group("src") ]
@@ -711,16 +734,16 @@ class vrshr(Instruction):
         return f"vrshr.{self.datatype} {self.args_out[0]}, {self.args_in[0]}, {self.shift}"
 
 class vrshl(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"vrshl\.<dt>\s+(?P<vec>\w+)\s*,\s*(?P<src>\w+)"))
+
     def __init__(self):
         super().__init__(mnemonic="vrshl.<dt>",
                          arg_types_in_out=[RegisterType.MVE],
                          arg_types_in=[RegisterType.GPR])
 
     def parse(self, src):
-        vrshl_regexp_txt = r"vrshl\.<dt>\s+(?P<vec>\w+)\s*,\s*(?P<src>\w+)"
-        vrshl_regexp_txt = Instruction.unfold_abbrevs(vrshl_regexp_txt)
-        vrshl_regexp = re.compile(vrshl_regexp_txt)
-        p = vrshl_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
         self.args_out = []
@@ -734,15 +757,15 @@ class vrshl(Instruction):
 
 
 class vshlc(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"vshlc\s+(?P<vec>\w+)\s*,\s*(?P<gpr>\w+)\s*,\s*(?P<shift>#.*)"))
+
     def __init__(self):
         super().__init__(mnemonic="vshlc",
                 arg_types_in_out=[RegisterType.MVE, RegisterType.GPR])
 
     def parse(self, src):
-        vshlc_regexp_txt = r"vshlc\s+(?P<vec>\w+)\s*,\s*(?P<gpr>\w+)\s*,\s*(?P<shift>#.*)"
-        vshlc_regexp_txt = Instruction.unfold_abbrevs(vshlc_regexp_txt)
-        vshlc_regexp = re.compile(vshlc_regexp_txt)
-        p = vshlc_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
         self.args_in_out = [ p.group("vec"), p.group("gpr") ]
@@ -756,16 +779,16 @@ class vshlc(Instruction):
 
 
 class vmov_imm(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"vmov\.<dt>\s+(?P<dst>\w+)\s*,\s*#(?P<immediate>\w*)"))
+
     def __init__(self):
         super().__init__(mnemonic="vmov.<dt>",
                          arg_types_in=[],
                          arg_types_out=[RegisterType.MVE])
 
     def parse(self, src):
-        vmov_regexp_txt = r"vmov\.<dt>\s+(?P<dst>\w+)\s*,\s*#(?P<immediate>\w*)"
-        vmov_regexp_txt = Instruction.unfold_abbrevs(vmov_regexp_txt)
-        vmov_regexp = re.compile(vmov_regexp_txt)
-        p = vmov_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
         self.args_out    = [ p.group("dst") ]
@@ -779,16 +802,16 @@ class vmov_imm(Instruction):
         return f"vmov.{self.datatype} {self.args_out[0]}, #{self.immediate}"
 
 class vmullbt(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"vmull(?P<bt>\w+)\.<dt>\s+(?P<dst>\w+)\s*,\s*(?P<src0>\w+),\s*(?P<src1>\w*)"))
+
     def __init__(self):
         super().__init__(mnemonic="vmull.<dt>",
                          arg_types_in=[RegisterType.MVE, RegisterType.MVE],
                          arg_types_out=[RegisterType.MVE])
 
     def parse(self, src):
-        vmullbt_regexp_txt = r"vmull(?P<bt>\w+)\.<dt>\s+(?P<dst>\w+)\s*,\s*(?P<src0>\w+),\s*(?P<src1>\w*)"
-        vmullbt_regexp_txt = Instruction.unfold_abbrevs(vmullbt_regexp_txt)
-        vmullbt_regexp = re.compile(vmullbt_regexp_txt)
-        p = vmullbt_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
         self.args_out    = [ p.group("dst") ]
@@ -805,16 +828,16 @@ class vmullbt(Instruction):
 
 
 class vdup(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"vdup\.<dt>\s+(?P<dst>\w+)\s*,\s*(?P<gpr0>\w*)"))
+
     def __init__(self):
         super().__init__(mnemonic="vdup.<dt>",
                          arg_types_in=[RegisterType.GPR],
                          arg_types_out=[RegisterType.MVE])
 
     def parse(self, src):
-        vdup_regexp_txt = r"vdup\.<dt>\s+(?P<dst>\w+)\s*,\s*(?P<gpr0>\w*)"
-        vdup_regexp_txt = Instruction.unfold_abbrevs(vdup_regexp_txt)
-        vdup_regexp = re.compile(vdup_regexp_txt)
-        p = vdup_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
         self.args_out    = [ p.group("dst") ]
@@ -828,16 +851,16 @@ class vdup(Instruction):
         return f"vdup.{self.datatype} {self.args_out[0]}, {self.args_in[0]}"
 
 class vmov_double_v2r(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"vmov\s+(?P<gpr0>\w+)\s*,\s*(?P<gpr1>\w+)\s*,\s*(?P<vec0>\w+)\s*\[\s*(?P<idx0>[23])\s*\]\s*,\s*(?P<vec1>\w+)\s*\[\s*(?P<idx1>[01])\s*\]\s*"))
+
     def __init__(self):
         super().__init__(mnemonic="vmov",
                          arg_types_in=[RegisterType.MVE],
                          arg_types_out=[RegisterType.GPR, RegisterType.GPR])
 
     def parse(self, src):
-        vmov_regexp_txt = r"vmov\s+(?P<gpr0>\w+)\s*,\s*(?P<gpr1>\w+)\s*,\s*(?P<vec0>\w+)\s*\[\s*(?P<idx0>[23])\s*\]\s*,\s*(?P<vec1>\w+)\s*\[\s*(?P<idx1>[01])\s*\]\s*"
-        vmov_regexp_txt = Instruction.unfold_abbrevs(vmov_regexp_txt)
-        vmov_regexp = re.compile(vmov_regexp_txt)
-        p = vmov_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
 
@@ -860,15 +883,16 @@ class vmov_double_v2r(Instruction):
         return f"vmov {self.args_out[0]}, {self.args_out[1]}, {self.args_in[0]}[{self.idxs[0]}], {self.args_in[0]}[{self.idxs[1]}]"
 
 class mov_imm(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"mov\s+(?P<dst>\w+)\s*,\s*#(?P<immediate>\w*)"))
+
     def __init__(self):
         super().__init__(mnemonic="mov",
                          arg_types_in=[],
                          arg_types_out=[RegisterType.GPR])
 
     def parse(self, src):
-        mov_regexp_txt = r"mov\s+(?P<dst>\w+)\s*,\s*#(?P<immediate>\w*)"
-        mov_regexp = re.compile(mov_regexp_txt)
-        p = mov_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
         self.args_out    = [ p.group("dst") ]
@@ -880,15 +904,16 @@ class mov_imm(Instruction):
         return f"mov {self.args_out[0]}, #{self.immediate}"
 
 class mvn_imm(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"mvn\s+(?P<dst>\w+)\s*,\s*#(?P<immediate>\w*)"))
+
     def __init__(self):
         super().__init__(mnemonic="mvn",
                          arg_types_in=[],
                          arg_types_out=[RegisterType.GPR])
 
     def parse(self, src):
-        mvn_regexp_txt = r"mvn\s+(?P<dst>\w+)\s*,\s*#(?P<immediate>\w*)"
-        mvn_regexp = re.compile(mvn_regexp_txt)
-        p = mvn_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
         self.args_out    = [ p.group("dst") ]
@@ -900,16 +925,16 @@ class mvn_imm(Instruction):
         return f"mvn {self.args_out[0]}, #{self.immediate}"
 
 class pkhbt(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"pkhbt\s+(?P<dst>\w+)\s*,\s*(?P<src0>\w+)\s*,\s*(?P<src1>\w+)\s*,\s*lsl\s*#(?P<shift>.*)"))
+
     def __init__(self):
         super().__init__(mnemonic="pkhbt",
                          arg_types_in=[RegisterType.GPR, RegisterType.GPR],
                          arg_types_out=[RegisterType.GPR])
 
     def parse(self, src):
-        pkhbt_regexp_txt = r"pkhbt\s+(?P<dst>\w+)\s*,\s*(?P<src0>\w+)\s*,\s*(?P<src1>\w+)\s*,\s*lsl\s*#(?P<shift>.*)"
-        pkhbt_regexp_txt = Instruction.unfold_abbrevs(pkhbt_regexp_txt)
-        pkhbt_regexp = re.compile(pkhbt_regexp_txt)
-        p = pkhbt_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
         self.args_in     = [ p.group("src0"), p.group("src1") ]
@@ -929,16 +954,16 @@ class mov(Instruction):
                 arg_types_out=[RegisterType.GPR])
 
 class add_imm(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"add\s+(?P<dst>\w+)\s*,\s*(?P<src>\w+)\s*,\s*#(?P<shift>.*)"))
+
     def __init__(self):
         super().__init__(mnemonic="add",
                          arg_types_in=[RegisterType.GPR],
                          arg_types_out=[RegisterType.GPR])
 
     def parse(self, src):
-        add_imm_regexp_txt = r"add\s+(?P<dst>\w+)\s*,\s*(?P<src>\w+)\s*,\s*#(?P<shift>.*)"
-        add_imm_regexp_txt = Instruction.unfold_abbrevs(add_imm_regexp_txt)
-        add_imm_regexp = re.compile(add_imm_regexp_txt)
-        p = add_imm_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
         self.args_in     = [ p.group("src") ]
@@ -951,16 +976,16 @@ class add_imm(Instruction):
         return f"add {self.args_out[0]}, {self.args_in[0]}, #{self.shift}"
 
 class sub_imm(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"sub\s+(?P<dst>\w+)\s*,\s*(?P<src>\w+)\s*,\s*#(?P<shift>.*)"))
+
     def __init__(self):
         super().__init__(mnemonic="sub",
                          arg_types_in=[RegisterType.GPR],
                          arg_types_out=[RegisterType.GPR])
 
     def parse(self, src):
-        sub_imm_regexp_txt = r"sub\s+(?P<dst>\w+)\s*,\s*(?P<src>\w+)\s*,\s*#(?P<shift>.*)"
-        sub_imm_regexp_txt = Instruction.unfold_abbrevs(sub_imm_regexp_txt)
-        sub_imm_regexp = re.compile(sub_imm_regexp_txt)
-        p = sub_imm_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
         self.args_in     = [ p.group("src") ]
@@ -973,16 +998,16 @@ class sub_imm(Instruction):
         return f"sub {self.args_out[0]}, {self.args_in[0]}, #{self.shift}"
 
 class vshr(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"vshr\.<dt>\s+(?P<dst>\w+)\s*,\s*(?P<src>\w+)\s*,\s*(?P<shift>#.*)"))
+
     def __init__(self):
         super().__init__(mnemonic="vshr.<dt>",
                          arg_types_in=[RegisterType.MVE],
                          arg_types_out=[RegisterType.MVE])
 
     def parse(self, src):
-        vshr_regexp_txt = r"vshr\.<dt>\s+(?P<dst>\w+)\s*,\s*(?P<src>\w+)\s*,\s*(?P<shift>#.*)"
-        vshr_regexp_txt = Instruction.unfold_abbrevs(vshr_regexp_txt)
-        vshr_regexp = re.compile(vshr_regexp_txt)
-        p = vshr_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
         self.args_in     = [ p.group("src") ]
@@ -996,16 +1021,16 @@ class vshr(Instruction):
         return f"vshr.{self.datatype} {self.args_out[0]}, {self.args_in[0]}, {self.shift}"
 
 class vshrnbt(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"v(?P<round>r)?shrn(?P<bt>\w+)\.<dt>\s+(?P<vec>\w+)\s*,\s*(?P<src>\w+)\s*,\s*(?P<shift>#.*)"))
+
     def __init__(self):
         super().__init__(mnemonic="vshrnbt.<dt>",
                          arg_types_in=[RegisterType.MVE],
                          arg_types_in_out=[RegisterType.MVE])
 
     def parse(self, src):
-        vshrn_regexp_txt = r"v(?P<round>r)?shrn(?P<bt>\w+)\.<dt>\s+(?P<vec>\w+)\s*,\s*(?P<src>\w+)\s*,\s*(?P<shift>#.*)"
-        vshrn_regexp_txt = Instruction.unfold_abbrevs(vshrn_regexp_txt)
-        vshrn_regexp = re.compile(vshrn_regexp_txt)
-        p = vshrn_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
         self.args_out = []
@@ -1021,16 +1046,16 @@ class vshrnbt(Instruction):
         return f"v{self.round}shrn{self.bt}.{self.datatype} {self.args_in_out[0]}, {self.args_in[0]}, {self.shift}"
 
 class vshllbt(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"vshll(?P<bt>\w+)\.<dt>\s+(?P<vec>\w+)\s*,\s*(?P<src>\w+)\s*,\s*(?P<shift>#.*)"))
+
     def __init__(self):
         super().__init__(mnemonic="vshllbt.<dt>",
                          arg_types_in=[RegisterType.MVE],
                          arg_types_in_out=[RegisterType.MVE])
 
     def parse(self, src):
-        vshll_regexp_txt = r"vshll(?P<bt>\w+)\.<dt>\s+(?P<vec>\w+)\s*,\s*(?P<src>\w+)\s*,\s*(?P<shift>#.*)"
-        vshll_regexp_txt = Instruction.unfold_abbrevs(vshll_regexp_txt)
-        vshll_regexp = re.compile(vshll_regexp_txt)
-        p = vshll_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
         self.args_out = []
@@ -1046,16 +1071,16 @@ class vshllbt(Instruction):
 
 
 class vmovlbt(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"vmovl(?P<bt>\w+)\.<dt>\s+(?P<vec>\w+)\s*,\s*(?P<src>\w+)\s*"))
+
     def __init__(self):
         super().__init__(mnemonic="vmovl.<dt>",
                          arg_types_in=[RegisterType.MVE],
                          arg_types_in_out=[RegisterType.MVE])
 
     def parse(self, src):
-        vmovl_regexp_txt = r"vmovl(?P<bt>\w+)\.<dt>\s+(?P<vec>\w+)\s*,\s*(?P<src>\w+)\s*"
-        vmovl_regexp_txt = Instruction.unfold_abbrevs(vmovl_regexp_txt)
-        vmovl_regexp = re.compile(vmovl_regexp_txt)
-        p = vmovl_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
         self.args_out = []
@@ -1070,16 +1095,16 @@ class vmovlbt(Instruction):
 
 
 class vrev(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"vrev(?P<dt0>\w+)\.(?P<dt1>\w+)\s+(?P<dst>\w+)\s*,\s*(?P<src>\w+)"))
+
     def __init__(self):
         super().__init__(mnemonic="vrev.<dt>",
                          arg_types_in=[RegisterType.MVE],
                          arg_types_out=[RegisterType.MVE])
 
     def parse(self, src):
-        vrev_regexp_txt = r"vrev(?P<dt0>\w+)\.(?P<dt1>\w+)\s+(?P<dst>\w+)\s*,\s*(?P<src>\w+)"
-        vrev_regexp_txt = Instruction.unfold_abbrevs(vrev_regexp_txt)
-        vrev_regexp = re.compile(vrev_regexp_txt)
-        p = vrev_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
         self.args_in     = [ p.group("src") ]
@@ -1094,16 +1119,16 @@ class vrev(Instruction):
 
 
 class vshl(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"vshl\.<dt>\s+(?P<dst>\w+)\s*,\s*(?P<src>\w+)\s*,\s*(?P<shift>#.*)"))
+
     def __init__(self):
         super().__init__(mnemonic="vshl.<dt>",
                          arg_types_in=[RegisterType.MVE],
                          arg_types_out=[RegisterType.MVE])
 
     def parse(self, src):
-        vshl_regexp_txt = "vshl\.<dt>\s+(?P<dst>\w+)\s*,\s*(?P<src>\w+)\s*,\s*(?P<shift>#.*)"
-        vshl_regexp_txt = Instruction.unfold_abbrevs(vshl_regexp_txt)
-        vshl_regexp = re.compile(vshl_regexp_txt)
-        p = vshl_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
         self.args_in     = [ p.group("src") ]
@@ -1117,16 +1142,16 @@ class vshl(Instruction):
         return f"vshl.{self.datatype} {self.args_out[0]}, {self.args_in[0]}, {self.shift}"
 
 class vshl_T3(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"vshl\.<dt>\s+(?P<dst>\w+)\s*,\s*(?P<src0>\w+)\s*,\s*(?P<src1>\w+)"))
+
     def __init__(self):
         super().__init__(mnemonic="vshl.<dt>",
                          arg_types_in=[RegisterType.MVE, RegisterType.MVE],
                          arg_types_out=[RegisterType.MVE])
 
     def parse(self, src):
-        vshl_regexp_txt = r"vshl\.<dt>\s+(?P<dst>\w+)\s*,\s*(?P<src0>\w+)\s*,\s*(?P<src1>\w+)"
-        vshl_regexp_txt = Instruction.unfold_abbrevs(vshl_regexp_txt)
-        vshl_regexp = re.compile(vshl_regexp_txt)
-        p = vshl_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
         self.args_in     = [ p.group("src0"), p.group("src1")]
@@ -1140,16 +1165,16 @@ class vshl_T3(Instruction):
 
 
 class vfma(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"vfma\.<fdt>\s+(?P<dst>\w+)\s*,\s*(?P<src0>\w+)\s*,\s*(?P<src1>\w+)"))
+
     def __init__(self):
         super().__init__(mnemonic="vfma.<fdt>",
                 arg_types_in=[RegisterType.MVE, RegisterType.MVE],
                 arg_types_in_out=[RegisterType.MVE])
 
     def parse(self, src):
-        vfma_regexp_txt = r"vfma\.<fdt>\s+(?P<dst>\w+)\s*,\s*(?P<src0>\w+)\s*,\s*(?P<src1>\w+)"
-        vfma_regexp_txt = Instruction.unfold_abbrevs(vfma_regexp_txt)
-        vfma_regexp = re.compile(vfma_regexp_txt)
-        p = vfma_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
 
@@ -1226,6 +1251,11 @@ class nop(Instruction):
         super().__init__(mnemonic="nop")
 
 class vstr(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"\s*vstr(?P<width>[bB]|[hH]|[wW])\.<dt>\s+"
+        r"(?P<dest>\w+),\s*"
+        + addr_regexp_txt + postinc_regexp_txt))
+
     def __init__(self):
         super().__init__(mnemonic="vstrw.u32",
                 arg_types_in=[RegisterType.MVE, RegisterType.GPR])
@@ -1240,19 +1270,7 @@ class vstr(Instruction):
 
     def parse(self, src):
         src = re.sub("//.*$","",src)
-
-        addr_regexp_txt = r"\[\s*(?P<addr>\w+)\s*(?:,\s*#(?P<addroffset>[^\]]*))?\](?P<writeback>!?)"
-        postinc_regexp_txt = r"\s*(?:,\s*#(?P<postinc>.*))?"
-
-        vldr_regexp_txt  = r"\s*vstr(?P<width>[bB]|[hH]|[wW])\.<dt>\s+"
-        vldr_regexp_txt += r"(?P<dest>\w+),\s*"
-        vldr_regexp_txt += addr_regexp_txt
-        vldr_regexp_txt += postinc_regexp_txt
-        vldr_regexp_txt = Instruction.unfold_abbrevs(vldr_regexp_txt)
-
-        vldr_regexp = re.compile(vldr_regexp_txt)
-
-        p = vldr_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Doesn't match pattern")
 
@@ -1313,6 +1331,11 @@ class vstr(Instruction):
         return f"{self.mnemonic} {self.args_in[0]}, {addr}{inc} {post}{warning}"
 
 class vldr(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"\s*vldr(?P<width>[bB]|[hH]|[wW])\.<dt>\s+"
+        r"(?P<dest>\w+),\s*"
+        + addr_regexp_txt + postinc_regexp_txt))
+
     def __init__(self):
         super().__init__(mnemonic="vldr",
                 arg_types_in=[RegisterType.GPR],
@@ -1328,19 +1351,7 @@ class vldr(Instruction):
 
     def parse(self, src):
         src = re.sub("//.*$","",src)
-
-        addr_regexp_txt = r"\[\s*(?P<addr>\w+)\s*(?:,\s*#(?P<addroffset>[^\]]*))?\](?P<writeback>!?)"
-        postinc_regexp_txt = r"\s*(?:,\s*#(?P<postinc>.*))?"
-
-        vldr_regexp_txt  = r"\s*vldr(?P<width>[bB]|[hH]|[wW])\.<dt>\s+"
-        vldr_regexp_txt += r"(?P<dest>\w+),\s*"
-        vldr_regexp_txt += addr_regexp_txt
-        vldr_regexp_txt += postinc_regexp_txt
-        vldr_regexp_txt = Instruction.unfold_abbrevs(vldr_regexp_txt)
-
-        vldr_regexp = re.compile(vldr_regexp_txt)
-
-        p = vldr_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Doesn't match pattern")
 
@@ -1400,6 +1411,13 @@ class vldr(Instruction):
         return f"vldr{self.width}.{self.datatype} {self.args_out[0]}, {addr}{inc} {post}{warning}"
 
 class vldr_gather(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"\s*vldr(?P<width>[bB]|[hH]|[wW])\.<dt>\s+"
+        r"(?P<dest>\w+),\s*"
+        r"\[\s*(?P<addr>\w+)\s*,\s*(?P<addrvec>\w+)?\s*"
+        r"(?:,\s*(?:uxtw|UXTW)\s+#(?P<uxtw>\w+))?\]"
+        r"$"))
+
     def __init__(self):
         super().__init__(mnemonic="vldrw.<dt>",
                          arg_types_in=[RegisterType.GPR, RegisterType.MVE],
@@ -1415,22 +1433,7 @@ class vldr_gather(Instruction):
 
     def parse(self, src):
         src = re.sub("//.*$","",src).strip()
-
-        dest   = r"(?P<dest>\w+),\s*"
-        adrgpr = r"(?P<addr>\w+)"
-        ofsvec = r",\s*(?P<addrvec>\w+)?"
-        uxtw   = r"(?:,\s*(?:uxtw|UXTW)\s+#(?P<uxtw>\w+))?"
-        addr_regexp_txt = rf"\[\s*{adrgpr}\s*{ofsvec}\s*{uxtw}\]"
-
-        vldr_regexp_txt  = r"\s*vldr(?P<width>[bB]|[hH]|[wW])\.<dt>\s+"
-        vldr_regexp_txt += dest
-        vldr_regexp_txt += addr_regexp_txt
-        vldr_regexp_txt += "$"
-        vldr_regexp_txt = Instruction.unfold_abbrevs(vldr_regexp_txt)
-
-        vldr_regexp = re.compile(vldr_regexp_txt)
-
-        p = vldr_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Doesn't match pattern")
 
@@ -1463,18 +1466,17 @@ class vldr_gather(Instruction):
         return f"vldr{self.width}.{self.datatype} {self.args_out[0]}, {addr}"
 
 class vld2(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"\s*(?P<variant>vld2(?P<idx>[0-1])\.<dt>)\s+"
+        r"{\s*(?P<out0>\w+)\s*,"
+        r"\s*(?P<out1>\w+)\s*}"
+        r"\s*,\s*\[\s*(?P<reg>\w+)\s*\](?P<writeback>!?)\s*"))
+
     def __init__(self):
         pass
 
     def parse(self, src):
-
-        regexp = r"\s*(?P<variant>vld2(?P<idx>[0-1])\.<dt>)\s+"\
-                r"{\s*(?P<out0>\w+)\s*,"\
-                 r"\s*(?P<out1>\w+)\s*}"\
-                 r"\s*,\s*\[\s*(?P<reg>\w+)\s*\](?P<writeback>!?)\s*"
-        regexp = Instruction.unfold_abbrevs(regexp)
-
-        p = re.compile(regexp).match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException( "Didn't match regexp" )
 
@@ -1545,20 +1547,19 @@ class vld2(Instruction):
 
 
 class vld4(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"\s*(?P<variant>vld4(?P<idx>[0-3])\.<dt>)\s+"
+        r"{\s*(?P<out0>\w+)\s*,"
+        r"\s*(?P<out1>\w+)\s*,"
+        r"\s*(?P<out2>\w+)\s*,"
+        r"\s*(?P<out3>\w+)\s*}"
+        r"\s*,\s*\[\s*(?P<reg>\w+)\s*\](?P<writeback>!?)\s*"))
+
     def __init__(self):
         pass
 
     def parse(self, src):
-
-        regexp = r"\s*(?P<variant>vld4(?P<idx>[0-3])\.<dt>)\s+"\
-                r"{\s*(?P<out0>\w+)\s*,"\
-                 r"\s*(?P<out1>\w+)\s*,"\
-                 r"\s*(?P<out2>\w+)\s*,"\
-                 r"\s*(?P<out3>\w+)\s*}"\
-                 r"\s*,\s*\[\s*(?P<reg>\w+)\s*\](?P<writeback>!?)\s*"
-        regexp = Instruction.unfold_abbrevs(regexp)
-
-        p = re.compile(regexp).match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException( "Didn't match regexp" )
 
@@ -1638,20 +1639,19 @@ class vld4(Instruction):
             return f"{self.variant} {{{','.join(self.args_in_out)}}}, {addr}{inc}"
 
 class vst2(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"\s*(?P<variant>vst2(?P<idx>[0-1])\.<dt>)\s+"
+        r"{\s*(?P<out0>\w+)\s*,"
+        r"\s*(?P<out1>\w+)\s*}"
+        r"\s*,\s*\[\s*(?P<reg>\w+)\s*\](?P<writeback>!?)\s*"))
+
     def __init__(self):
         super().__init__(mnemonic="vst2",
                 arg_types_in=[RegisterType.GPR,
                               RegisterType.MVE, RegisterType.MVE])
 
     def parse(self, src):
-
-        regexp = r"\s*(?P<variant>vst2(?P<idx>[0-1])\.<dt>)\s+"\
-                r"{\s*(?P<out0>\w+)\s*,"\
-                 r"\s*(?P<out1>\w+)\s*}"\
-                 r"\s*,\s*\[\s*(?P<reg>\w+)\s*\](?P<writeback>!?)\s*"
-        regexp = Instruction.unfold_abbrevs(regexp)
-
-        p = re.compile(regexp).match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException( "Didn't match regexp" )
         idx = int(p.group("idx"))
@@ -1719,22 +1719,21 @@ class vst2(Instruction):
 
 
 class vst4(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"\s*(?P<variant>vst4(?P<idx>[0-3])\.<dt>)\s+"
+        r"{\s*(?P<out0>\w+)\s*,"
+        r"\s*(?P<out1>\w+)\s*,"
+        r"\s*(?P<out2>\w+)\s*,"
+        r"\s*(?P<out3>\w+)\s*}"
+        r"\s*,\s*\[\s*(?P<reg>\w+)\s*\](?P<writeback>!?)\s*"))
+
     def __init__(self):
         super().__init__(mnemonic="vst4",
                 arg_types_in=[RegisterType.GPR,
                               RegisterType.MVE, RegisterType.MVE, RegisterType.MVE, RegisterType.MVE])
 
     def parse(self, src):
-
-        regexp = r"\s*(?P<variant>vst4(?P<idx>[0-3])\.<dt>)\s+"\
-                 r"{\s*(?P<out0>\w+)\s*,"\
-                 r"\s*(?P<out1>\w+)\s*,"\
-                 r"\s*(?P<out2>\w+)\s*,"\
-                 r"\s*(?P<out3>\w+)\s*}"\
-                 r"\s*,\s*\[\s*(?P<reg>\w+)\s*\](?P<writeback>!?)\s*"
-        regexp = Instruction.unfold_abbrevs(regexp)
-
-        p = re.compile(regexp).match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException( "Didn't match regexp" )
         idx = int(p.group("idx"))
@@ -1827,16 +1826,16 @@ class vaddf(Instruction):
         return f"vadd.{self.datatype} {self.args_out[0]}, {self.args_in[0]}, {self.args_in[1]}"
 
 class vcmla(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"vcmla\.<fdt>\s+(?P<dst>\w+)\s*,\s*(?P<src0>\w+)\s*,\s*(?P<src1>\w+)\s*,\s*(?P<rotation>#.*)"))
+
     def __init__(self):
         super().__init__(mnemonic="vcmla.<fdt>",
                          arg_types_in=[RegisterType.MVE, RegisterType.MVE],
                          arg_types_in_out=[RegisterType.MVE])
 
     def parse(self, src):
-        vcmla_regexp_txt = r"vcmla\.<fdt>\s+(?P<dst>\w+)\s*,\s*(?P<src0>\w+)\s*,\s*(?P<src1>\w+)\s*,\s*(?P<rotation>#.*)"
-        vcmla_regexp_txt = Instruction.unfold_abbrevs(vcmla_regexp_txt)
-        vcmla_regexp = re.compile(vcmla_regexp_txt)
-        p = vcmla_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
         self.args_in     = [ p.group("src0"), p.group("src1") ]
@@ -1853,16 +1852,16 @@ class vcmla(Instruction):
         return f"vcmla.{self.datatype} {self.args_in_out[0]}, {self.args_in[0]}, {self.args_in[1]}, {self.rotation}"
 
 class vcmul(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"vcmul\.<fdt>\s+(?P<dst>\w+)\s*,\s*(?P<src0>\w+)\s*,\s*(?P<src1>\w+)\s*,\s*(?P<rotation>#.*)"))
+
     def __init__(self):
         super().__init__(mnemonic="vcmul.<fdt>",
                          arg_types_in=[RegisterType.MVE, RegisterType.MVE],
                          arg_types_out=[RegisterType.MVE])
 
     def parse(self, src):
-        vcmul_regexp_txt = r"vcmul\.<fdt>\s+(?P<dst>\w+)\s*,\s*(?P<src0>\w+)\s*,\s*(?P<src1>\w+)\s*,\s*(?P<rotation>#.*)"
-        vcmul_regexp_txt = Instruction.unfold_abbrevs(vcmul_regexp_txt)
-        vcmul_regexp = re.compile(vcmul_regexp_txt)
-        p = vcmul_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
         self.args_in     = [ p.group("src0"), p.group("src1") ]
@@ -1880,16 +1879,16 @@ class vcmul(Instruction):
         return f"vcmul.{self.datatype} {self.args_out[0]}, {self.args_in[0]}, {self.args_in[1]}, {self.rotation}"
 
 class vcadd(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"vcadd\.<dt>\s+(?P<dst>\w+)\s*,\s*(?P<src0>\w+)\s*,\s*(?P<src1>\w+)\s*,\s*(?P<rotation>#.*)"))
+
     def __init__(self):
         super().__init__(mnemonic="vcadd.<dt>",
                          arg_types_in=[RegisterType.MVE, RegisterType.MVE],
                          arg_types_out=[RegisterType.MVE])
 
     def parse(self, src):
-        vcadd_regexp_txt = r"vcadd\.<dt>\s+(?P<dst>\w+)\s*,\s*(?P<src0>\w+)\s*,\s*(?P<src1>\w+)\s*,\s*(?P<rotation>#.*)"
-        vcadd_regexp_txt = Instruction.unfold_abbrevs(vcadd_regexp_txt)
-        vcadd_regexp = re.compile(vcadd_regexp_txt)
-        p = vcadd_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
         self.args_in     = [ p.group("src0"), p.group("src1") ]
@@ -1908,16 +1907,16 @@ class vcadd(Instruction):
         return f"vcadd.{self.datatype} {self.args_out[0]}, {self.args_in[0]}, {self.args_in[1]}, {self.rotation}"
 
 class vhcadd(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"vhcadd\.<dt>\s+(?P<dst>\w+)\s*,\s*(?P<src0>\w+)\s*,\s*(?P<src1>\w+)\s*,\s*(?P<rotation>#.*)"))
+
     def __init__(self):
         super().__init__(mnemonic="vhcadd.<dt>",
                          arg_types_in=[RegisterType.MVE, RegisterType.MVE],
                          arg_types_out=[RegisterType.MVE])
 
     def parse(self, src):
-        vhcadd_regexp_txt = r"vhcadd\.<dt>\s+(?P<dst>\w+)\s*,\s*(?P<src0>\w+)\s*,\s*(?P<src1>\w+)\s*,\s*(?P<rotation>#.*)"
-        vhcadd_regexp_txt = Instruction.unfold_abbrevs(vhcadd_regexp_txt)
-        vhcadd_regexp = re.compile(vhcadd_regexp_txt)
-        p = vhcadd_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
         self.args_in     = [ p.group("src0"), p.group("src1") ]
@@ -1935,16 +1934,16 @@ class vhcadd(Instruction):
         return f"vhcadd.{self.datatype} {self.args_out[0]}, {self.args_in[0]}, {self.args_in[1]}, {self.rotation}"
 
 class vhcsub(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"vhcsub\.<dt>\s+(?P<dst>\w+)\s*,\s*(?P<src0>\w+)\s*,\s*(?P<src1>\w+)\s*,\s*(?P<rotation>#.*)"))
+
     def __init__(self):
         super().__init__(mnemonic="vhcsub.<dt>",
                          arg_types_in=[RegisterType.MVE, RegisterType.MVE],
                          arg_types_out=[RegisterType.MVE])
 
     def parse(self, src):
-        vhcsub_regexp_txt = r"vhcsub\.<dt>\s+(?P<dst>\w+)\s*,\s*(?P<src0>\w+)\s*,\s*(?P<src1>\w+)\s*,\s*(?P<rotation>#.*)"
-        vhcsub_regexp_txt = Instruction.unfold_abbrevs(vhcsub_regexp_txt)
-        vhcsub_regexp = re.compile(vhcsub_regexp_txt)
-        p = vhcsub_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
         self.args_in     = [ p.group("src0"), p.group("src1") ]
@@ -1962,16 +1961,16 @@ class vhcsub(Instruction):
         return f"vhcsub.{self.datatype} {self.args_out[0]}, {self.args_in[0]}, {self.args_in[1]}, {self.rotation}"
 
 class vcaddf(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"vcadd\.<fdt>\s+(?P<dst>\w+)\s*,\s*(?P<src0>\w+)\s*,\s*(?P<src1>\w+)\s*,\s*(?P<rotation>#.*)"))
+
     def __init__(self):
         super().__init__(mnemonic="vcaddf.<fdt>",
                          arg_types_in=[RegisterType.MVE, RegisterType.MVE],
                          arg_types_out=[RegisterType.MVE])
 
     def parse(self, src):
-        vcaddf_regexp_txt = r"vcadd\.<fdt>\s+(?P<dst>\w+)\s*,\s*(?P<src0>\w+)\s*,\s*(?P<src1>\w+)\s*,\s*(?P<rotation>#.*)"
-        vcaddf_regexp_txt = Instruction.unfold_abbrevs(vcaddf_regexp_txt)
-        vcaddf_regexp = re.compile(vcaddf_regexp_txt)
-        p = vcaddf_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
         self.args_in     = [ p.group("src0"), p.group("src1") ]
@@ -1991,17 +1990,17 @@ class vcaddf(Instruction):
             f"{self.args_in[0]}, {self.args_in[1]}, {self.rotation}"
 
 class vcsubf(Instruction):
+    regexp = re.compile(Instruction.unfold_abbrevs(
+        r"vcsub\.<fdt>\s+(?P<dst>\w+)\s*,\s*(?P<src0>\w+)\s*,"
+        r"\s*(?P<src1>\w+)\s*,\s*(?P<rotation>#.*)"))
+
     def __init__(self):
         super().__init__(mnemonic="vcsubf.<fdt>",
                          arg_types_in=[RegisterType.MVE, RegisterType.MVE],
                          arg_types_out=[RegisterType.MVE])
 
     def parse(self, src):
-        vhcsub_regexp_txt = r"vcsub\.<fdt>\s+(?P<dst>\w+)\s*,\s*(?P<src0>\w+)\s*,"\
-            r"\s*(?P<src1>\w+)\s*,\s*(?P<rotation>#.*)"
-        vhcsub_regexp_txt = Instruction.unfold_abbrevs(vhcsub_regexp_txt)
-        vhcsub_regexp = re.compile(vhcsub_regexp_txt)
-        p = vhcsub_regexp.match(src)
+        p = self.regexp.match(src)
         if p is None:
             raise Instruction.ParsingException("Does not match pattern")
         self.args_in     = [ p.group("src0"), p.group("src1") ]
@@ -2077,8 +2076,11 @@ def vqdmlsdh_vqdmladhx_parsing_cb(this_class, other_class):
 vqdmlsdh.global_parsing_cb  = vqdmlsdh_vqdmladhx_parsing_cb(vqdmlsdh, vqdmladhx)
 vqdmladhx.global_parsing_cb = vqdmlsdh_vqdmladhx_parsing_cb(vqdmladhx, vqdmlsdh)
 
-def lookup_multidict(d, inst, default=None):
-    instclass = find_class(inst)
+Instruction.parser_prefixes = [ (c, Instruction._parser_prefix(c))
+                                for c in Instruction.__subclasses__() ]
+Instruction.parser_index = {}
+
+def _lookup_multidict_core(d, inst):
     for l,v in d.items():
         # Multidict entries can be the following:
         # - An instruction class. It matches any instruction of that class.
@@ -2096,12 +2098,50 @@ def lookup_multidict(d, inst, default=None):
         for lp in l:
             if match(lp):
                 return v
+    return None
+
+# Lookup tables compiled from multidicts, indexed by the ID of the multidict
+#
+# If a multidict only uses instruction classes as keys, the result of a lookup
+# only depends on the class of the instruction and is remembered per class.
+# Multidicts must not be modified after their first lookup.
+_multidict_tables = {}
+
+def lookup_multidict(d, inst, default=None):
+    table = _multidict_tables.get(id(d), None)
+    if table is None:
+        class_only = all(inspect.isclass(x) for l in d.keys()
+                         for x in (l if isinstance(l, tuple) else [l]))
+        # Keep a reference to the multidict so its ID cannot be reused
+        table = (d, {} if class_only else None)
+        _multidict_tables[id(d)] = table
+    _, results = table
+
+    if results is None:
+        v = _lookup_multidict_core(d, inst)
+    else:
+        inst_class = type(inst)
+        if inst_class in results:
+            v = results[inst_class]
+        else:
+            v = _lookup_multidict_core(d, inst)
+            results[inst_class] = v
+
+    if v is not None:
+        return v
     if default is None:
-        raise Exception(f"Couldn't find {k}")
+        raise Exception(f"Couldn't find {find_class(inst)} for {inst}")
     return default
 
 def find_class(src):
+    # The result only depends on the type of the source, so remember it
+    inst_class = _find_class_cache.get(type(src), None)
+    if inst_class is not None:
+        return inst_class
     for inst_class in Instruction.__subclasses__():
         if isinstance(src,inst_class):
+            _find_class_cache[type(src)] = inst_class
             return inst_class
     raise Exception("Couldn't find instruction class")
+
+_find_class_cache = {}